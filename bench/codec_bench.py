@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+from sssweep import fanout
+
+
+def make_messages(filename, messages, seed):
+  """
+  This writes a synthetic message log (one message, packet and flit records
+  with increasing timestamps)
+  """
+  rng = random.Random(seed)
+  time_ = 0
+  with open(filename, 'w') as fd:
+    for msg in range(messages):
+      src = rng.randrange(1024)
+      dst = rng.randrange(1024)
+      time_ += rng.randrange(1, 20)
+      fd.write('+M,{0},{1},{2},0,{3}\n'.format(msg, src, dst, time_))
+      for pkt in range(rng.randrange(1, 4)):
+        fd.write('+P,{0},{1}\n'.format(pkt, rng.randrange(1, 12)))
+        for flit in range(rng.randrange(1, 8)):
+          fd.write('F,{0},{1},{2}\n'.format(
+            flit, time_ + rng.randrange(10, 500),
+            time_ + rng.randrange(500, 5000)))
+      fd.write('-M\n')
+
+
+def run_codec(source, out_dir, codec):
+  """
+  This encodes and decodes source with a codec through fanout
+
+  Returns:
+    (dict) : write and read wall times and the encoded size
+  """
+  filename = os.path.join(out_dir, 'messages.mpf' + fanout.CODECS[codec])
+  start = time.perf_counter()
+  with fanout.open_codec(filename, 'wb') as fd_out:
+    for block in fanout.read_file(source):
+      fd_out.write(block)
+  write = time.perf_counter() - start
+
+  start = time.perf_counter()
+  size = 0
+  for block in fanout.read_file(filename):
+    size += len(block)
+  read = time.perf_counter() - start
+  assert size == os.path.getsize(source), 'codec {0} is lossy'.format(codec)
+
+  return {
+    'codec': codec,
+    'write_s': write,
+    'read_s': read,
+    'bytes': os.path.getsize(filename),
+    'ratio': os.path.getsize(source) / max(1, os.path.getsize(filename)),
+  }
+
+
+def main():
+  ap = argparse.ArgumentParser(
+    description='Benchmark of the message log codecs')
+  ap.add_argument('--input', type=str, default=None,
+                  help='message log to use (default is synthetic)')
+  ap.add_argument('--messages', type=int, default=200000,
+                  help='messages of the synthetic log')
+  ap.add_argument('--codecs', nargs='+', default=sorted(fanout.CODECS),
+                  choices=sorted(fanout.CODECS), help='codecs to compare')
+  ap.add_argument('--seed', type=int, default=12345,
+                  help='seed of the synthetic log')
+  ap.add_argument('--json', type=str, default=None,
+                  help='write the results to this JSON file')
+  args = ap.parse_args()
+
+  out_dir = tempfile.mkdtemp(prefix='sssweep_codec_')
+  try:
+    source = os.path.join(out_dir, 'source.mpf')
+    if args.input is None:
+      make_messages(source, args.messages, args.seed)
+    else:
+      with open(source, 'wb') as fd:
+        for block in fanout.read_file(args.input):
+          fd.write(block)
+    print('log: {0} bytes'.format(os.path.getsize(source)))
+
+    results = []
+    for codec in args.codecs:
+      if shutil.which(codec) is None and codec in ['zstd', 'lz4']:
+        print('  {0}: not installed, skipped'.format(codec))
+        continue
+      results.append(run_codec(source, out_dir, codec))
+  finally:
+    shutil.rmtree(out_dir)
+
+  print('  {0:<6} {1:>10} {2:>10} {3:>12} {4:>7}'.format(
+    'codec', 'write (s)', 'read (s)', 'bytes', 'ratio'))
+  for res in results:
+    print('  {0:<6} {1:>10.3f} {2:>10.3f} {3:>12} {4:>7.2f}'.format(
+      res['codec'], res['write_s'], res['read_s'], res['bytes'],
+      res['ratio']))
+  if args.json:
+    with open(args.json, 'w') as fd:
+      json.dump(results, fd, indent=2)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import argparse
+import collections
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+import sssweep
+
+ALL_PLOTS = ['load-latency', 'load-latency-compare', 'load-rate',
+             'load-percent-minimal', 'load-average-hops', 'load-rate-percent',
+             'latency-pdf', 'latency-percentile', 'latency-cdf',
+             'time-latency-scatter', 'time-latency', 'time-percent-minimal',
+             'time-average-hops']
+TIME_PLOTS = ['time-latency', 'time-percent-minimal', 'time-average-hops']
+
+
+class StubTask(object):
+  """
+  This is a task that only records its dependencies
+  """
+  __slots__ = ('manager', 'name', 'stage', 'priority', 'conditions')
+
+  def __init__(self, manager, name, stage):
+    self.manager = manager
+    self.name = name
+    self.stage = stage
+    self.priority = 0
+    self.conditions = 0
+    manager.add_task(self)
+
+  def get_dependencies(self):
+    return ()
+
+  def add_dependency(self, task):
+    self.manager.edges[self.stage] += 1
+
+  def add_condition(self, condition):
+    self.conditions += 1
+
+
+class StubTaskManager(object):
+  """
+  This is a task manager that counts tasks and edges per stage
+  """
+
+  def __init__(self):
+    self.tasks = collections.Counter()
+    self.edges = collections.Counter()
+    self.waves = 0
+
+  def add_task(self, task):
+    self.tasks[task.stage] += 1
+
+  def add_observer(self, observer):
+    pass
+
+  def run_tasks(self):
+    self.waves += 1
+    return True
+
+
+def create_task(tm, name, cmd, console_out, task_type, config):
+  return StubTask(tm, name, task_type)
+
+
+def set_command(value, config):
+  return '/sweep/value=string={0}'.format(value)
+
+
+def run_case(args):
+  """
+  This builds one sweep and returns its measurements
+  """
+  out_dir = tempfile.mkdtemp(prefix='sssweep_bench_')
+  try:
+    # the stub tasks never complete, the command recorder would keep them
+    sweeper = sssweep.Sweeper(
+      'supersim', 'settings.json', 'ssparse', 'transient.py', create_task,
+      out_dir, check_paths=False, latency_units='ns', viewer=args.viewer,
+      cmd_hash=False)
+    for var in range(args.variables):
+      sweeper.add_variable('Variable{0}'.format(var), 'v{0}'.format(var),
+                           list(range(args.values)), set_command)
+    sweeper.add_loads('Load', 'l', 0, args.loads, 1, set_command)
+    for plot_type in args.plots:
+      if plot_type in TIME_PLOTS:
+        sweeper.add_plot(plot_type, 'trans')
+      else:
+        sweeper.add_plot(plot_type, 'all')
+
+    tm = StubTaskManager()
+    start = time.perf_counter()
+    if args.wave_size is None:
+      sweeper.create_tasks(tm)
+    else:
+      sweeper.stream_tasks(tm, wave_size=args.wave_size)
+    wall = time.perf_counter() - start
+  finally:
+    shutil.rmtree(out_dir)
+
+  return {
+    'variables': args.variables,
+    'values': args.values,
+    'loads': args.loads,
+    'configs': args.values ** args.variables * args.loads,
+    'wall_s': wall,
+    'peak_rss_mib': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss /
+                     1024.0),
+    'waves': tm.waves,
+    'tasks': dict(tm.tasks),
+    'edges': dict(tm.edges),
+  }
+
+
+def print_report(results):
+  for res in results:
+    print('variables={0} values={1} loads={2} configs={3} waves={4}'.format(
+      res['variables'], res['values'], res['loads'], res['configs'],
+      res['waves']))
+    print('  wall time : {0:.3f} s'.format(res['wall_s']))
+    print('  peak RSS  : {0:.1f} MiB'.format(res['peak_rss_mib']))
+    print('  {0:<14} {1:>10} {2:>10}'.format('stage', 'tasks', 'edges'))
+    for stage in sorted(res['tasks']):
+      print('  {0:<14} {1:>10} {2:>10}'.format(
+        stage, res['tasks'][stage], res['edges'].get(stage, 0)))
+    print('  {0:<14} {1:>10} {2:>10}'.format(
+      'total', sum(res['tasks'].values()), sum(res['edges'].values())))
+
+
+def main():
+  ap = argparse.ArgumentParser(
+    description='Benchmark of Sweeper.create_tasks graph construction')
+  ap.add_argument('--variables', type=int, default=3,
+                  help='number of sweep variables (besides the load)')
+  ap.add_argument('--values', type=int, nargs='+', default=[4, 8, 16],
+                  help='values per variable, one case per entry')
+  ap.add_argument('--loads', type=int, default=10,
+                  help='number of load points')
+  ap.add_argument('--plots', nargs='+', default=ALL_PLOTS,
+                  choices=ALL_PLOTS, help='plot types to create')
+  ap.add_argument('--viewer', default='off', choices=['off', 'dev', 'prod'],
+                  help='also generate the web viewer')
+  ap.add_argument('--wave_size', type=int, default=None,
+                  help='use stream_tasks with this wave size')
+  ap.add_argument('--json', type=str, default=None,
+                  help='write the results to this JSON file')
+  ap.add_argument('--single', action='store_true',
+                  help=argparse.SUPPRESS)
+  args = ap.parse_args()
+
+  if args.single:
+    # one case in this process, results on stdout
+    args.values = args.values[0]
+    res = run_case(args)
+    print(json.dumps(res))
+    return
+
+  # each case runs in its own process to get a clean peak RSS
+  results = []
+  for values in args.values:
+    cmd = [sys.executable, os.path.abspath(__file__), '--single',
+           '--variables', str(args.variables), '--values', str(values),
+           '--loads', str(args.loads), '--viewer', args.viewer,
+           '--plots'] + args.plots
+    if args.wave_size is not None:
+      cmd += ['--wave_size', str(args.wave_size)]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, check=True)
+    results.append(json.loads(proc.stdout.decode('utf-8').splitlines()[-1]))
+
+  print_report(results)
+  if args.json:
+    with open(args.json, 'w') as fd:
+      json.dump(results, fd, indent=2)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,209 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import math
+import os
+
+import handycsv
+import taskrun
+
+class AdaptiveLoads(object):
+  """
+  This stops the load sweep of a configuration at saturation. The tasks of a
+  load are cancelled (bypassed) when a lower load of the same configuration
+  saturated, which is checked on the stats file of that load once it exists.
+  The loads don't wait for each other: the decision is taken when the first
+  task of a load is dispatched, a load dispatched before the stats of the
+  saturated load exist still runs.
+  The 'latency' criterion compares the mean latency to the one of the first
+  load, the 'rate' criterion compares the mean accepted rate to the offered
+  load. Flat indices are in C-order with the load last, so the loads of a
+  configuration are consecutive.
+  """
+
+  CRITERIA = {'latency': 3.0, 'rate': 0.1}
+
+  def __init__(self, loads, stats, criterion='latency', threshold=None,
+               row='Packet'):
+    """
+    Constructs an AdaptiveLoads object
+
+    Args:
+      loads        : load values
+      stats        : function returning the stats file of a flat index
+                     (latency csv or rates csv)
+      criterion    : latency (mean latency above threshold times the one of
+                     the first load) or rate (mean accepted rate below
+                     1 - threshold of the offered load)
+      threshold    : saturation threshold (see CRITERIA for the defaults)
+      row          : latency row of the latency csv
+    """
+    assert criterion in self.CRITERIA, \
+      'Invalid saturation criterion: {0}'.format(criterion)
+    self._loads = loads
+    self._stats = stats
+    self._criterion = criterion
+    self._threshold = threshold
+    if self._threshold is None:
+      self._threshold = self.CRITERIA[criterion]
+    self._row = row
+    self._saturated = {}
+    self._cancelled = {}
+
+  def _mean_latency(self, filename):
+    return handycsv.GridStats.read(filename).get(self._row, 'Mean')
+
+  def _mean_rate(self, filename):
+    grid = handycsv.GridStats.read(filename)
+    # the last row is the aggregate of the terminals
+    terms = range(len(grid.row_names()) - 1)
+    return sum(grid.get(term, 'delivered') * 100 for term in terms) / \
+      max(1, len(terms))
+
+  def stats(self, flat):
+    """
+    Returns:
+      (str) : the stats file checked for the load of flat
+    """
+    return self._stats(flat)
+
+  def check(self, filename, base, load):
+    """
+    Returns:
+      (bool) : True if a load saturated (False if its stats file doesn't
+               exist)
+
+    Args:
+      filename     : stats file of the load
+      base         : stats file of the first load of the configuration
+      load         : load value
+    """
+    if not os.path.isfile(filename):
+      return False
+    if self._criterion == 'latency':
+      if filename == base or not os.path.isfile(base):
+        return False
+      latency = self._mean_latency(filename)
+      zero_load = self._mean_latency(base)
+      return (math.isnan(latency) or
+              latency > self._threshold * zero_load > 0)
+    rate = self._mean_rate(filename)
+    return math.isnan(rate) or rate < (1 - self._threshold) * load
+
+  def saturated(self, flat):
+    """
+    Returns:
+      (bool) : True if the load of flat saturated
+    """
+    if flat in self._saturated:
+      return self._saturated[flat]
+    load = flat % len(self._loads)
+    stats = self.stats(flat)
+    base = self.stats(flat - load)
+    saturated = self.check(stats, base, self._loads[load])
+    # an unknown load is checked again
+    if os.path.isfile(stats) and os.path.isfile(base):
+      self._saturated[flat] = saturated
+    return saturated
+
+  def cancelled(self, flat):
+    """
+    Returns:
+      (bool) : True if a lower load of the configuration of flat saturated
+               (or was cancelled), kept from the first call on
+    """
+    if flat not in self._cancelled:
+      first = flat - flat % len(self._loads)
+      self._cancelled[flat] = any(
+        self._cancelled.get(lower, False) or self.saturated(lower)
+        for lower in range(first, flat))
+    return self._cancelled[flat]
+
+  def condition(self, flat, condition):
+    """
+    Returns:
+      (Condition) : condition of a task of flat, bypassed if cancelled
+    """
+    return _CancelCondition(self, flat, condition)
+
+  @staticmethod
+  def gaps(condition):
+    """
+    Returns:
+      (Condition) : condition of a task over the loads ignoring the missing
+                    inputs (cancelled loads)
+    """
+    return _GapsCondition(condition)
+
+class _CancelCondition(taskrun.Condition):
+  """
+  This bypasses a task of a cancelled load
+  """
+
+  def __init__(self, adaptive, flat, condition):
+    super().__init__()
+    self._adaptive = adaptive
+    self._flat = flat
+    self._condition = condition
+
+  @property
+  def inputs(self):
+    return self._condition.inputs
+
+  @property
+  def outputs(self):
+    return self._condition.outputs
+
+  def check(self):
+    if self._adaptive.cancelled(self._flat):
+      return False
+    return self._condition.check()
+
+class _GapsCondition(taskrun.Condition):
+  """
+  This checks a FileModificationCondition without its missing inputs
+  """
+
+  def __init__(self, condition):
+    super().__init__()
+    self._condition = condition
+
+  @property
+  def inputs(self):
+    return self._condition.inputs
+
+  @property
+  def outputs(self):
+    return self._condition.outputs
+
+  def check(self):
+    return taskrun.FileModificationCondition(
+      [f for f in self.inputs if os.path.isfile(f)],
+      self.outputs).check()
@@ -0,0 +1,142 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import collections
+import contextlib
+import json
+import time
+import tracemalloc
+
+class BuildReport(object):
+  """
+  This records the wall time, number of tasks, number of dependency edges and
+  memory allocations of each phase of the task graph construction. Phases
+  with the same name (e.g. one per wave when streaming) are accumulated.
+  """
+
+  def __init__(self, trace_memory=True):
+    """
+    Constructs a BuildReport object
+
+    Args:
+      trace_memory : trace python allocations with tracemalloc
+    """
+    self._trace_memory = trace_memory
+    self._phases = collections.OrderedDict()
+    self._tasks = collections.Counter()
+    self._edges = 0
+
+  def add_task(self, task_type):
+    """
+    This counts a created task
+    """
+    self._tasks[task_type] += 1
+
+  def add_edge(self):
+    """
+    This counts a created dependency
+    """
+    self._edges += 1
+
+  @contextlib.contextmanager
+  def phase(self, name):
+    """
+    This measures the code run inside of the context as the phase name
+    """
+    started = False
+    if self._trace_memory:
+      if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started = True
+      tracemalloc.reset_peak()
+      mem_start = tracemalloc.get_traced_memory()[0]
+    tasks_start = collections.Counter(self._tasks)
+    edges_start = self._edges
+    time_start = time.perf_counter()
+    try:
+      yield
+    finally:
+      wall = time.perf_counter() - time_start
+      if name not in self._phases:
+        self._phases[name] = {'wall_s': 0.0, 'tasks': collections.Counter(),
+                              'edges': 0, 'alloc_kib': 0.0, 'peak_kib': 0.0}
+      record = self._phases[name]
+      record['wall_s'] += wall
+      record['tasks'].update(self._tasks - tasks_start)
+      record['edges'] += self._edges - edges_start
+      if self._trace_memory:
+        mem_end, mem_peak = tracemalloc.get_traced_memory()
+        record['alloc_kib'] += (mem_end - mem_start) / 1024.0
+        record['peak_kib'] = max(record['peak_kib'],
+                                 (mem_peak - mem_start) / 1024.0)
+        if started:
+          tracemalloc.stop()
+
+  @property
+  def phases(self):
+    """
+    Returns:
+      (OrderedDict) : records of each phase by name
+    """
+    return self._phases
+
+  def to_dict(self):
+    """
+    Returns:
+      (dict) : the report as plain types
+    """
+    phases = collections.OrderedDict()
+    for name, record in self._phases.items():
+      phases[name] = dict(record)
+      phases[name]['tasks'] = dict(record['tasks'])
+    return {
+      'phases': phases,
+      'total': {
+        'wall_s': sum(rec['wall_s'] for rec in self._phases.values()),
+        'tasks': dict(self._tasks),
+        'edges': self._edges,
+      }
+    }
+
+  def write(self, filename):
+    """
+    This writes the report as JSON
+    """
+    with open(filename, 'w') as fd_json:
+      json.dump(self.to_dict(), fd_json, indent=2)
+
+  def __str__(self):
+    lines = ['{0:<32} {1:>10} {2:>9} {3:>9} {4:>11}'.format(
+      'phase', 'wall (s)', 'tasks', 'edges', 'alloc (KiB)')]
+    for name, record in self._phases.items():
+      lines.append('{0:<32} {1:>10.3f} {2:>9} {3:>9} {4:>11.1f}'.format(
+        name, record['wall_s'], sum(record['tasks'].values()),
+        record['edges'], record['alloc_kib']))
+    return '\n'.join(lines)
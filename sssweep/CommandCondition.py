@@ -0,0 +1,143 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import hashlib
+import os
+
+import taskrun
+
+class CommandCondition(taskrun.Condition):
+  """
+  This wraps a FileModificationCondition to also run the task when its
+  command changed. The hash of the command that generated the outputs is
+  kept in a file next to the first output (written by CommandRecorder once
+  the task completes). Outputs without a recorded hash (e.g. from a sweep
+  that didn't record them) were generated by an unknown command, so the task
+  runs again.
+  """
+
+  def __init__(self, condition, cmd):
+    """
+    Constructs a CommandCondition object
+
+    Args:
+      condition    : FileModificationCondition of the task
+      cmd          : command of the task
+    """
+    super().__init__()
+    assert len(condition.outputs) > 0, 'the task must have an output file'
+    self._condition = condition
+    self._hash = hashlib.sha1(cmd.encode('utf-8')).hexdigest()
+    self._filename = condition.outputs[0] + '.cmdhash'
+
+  @property
+  def inputs(self):
+    return self._condition.inputs
+
+  @property
+  def outputs(self):
+    return self._condition.outputs
+
+  @property
+  def cmd_hash(self):
+    return self._hash
+
+  @property
+  def hash_file(self):
+    return self._filename
+
+  def _stored(self):
+    try:
+      with open(self._filename, 'r') as fd_hash:
+        return fd_hash.read().strip()
+    except OSError:
+      return None
+
+  def changed(self):
+    """
+    Returns:
+      (bool) : True if the outputs were generated by another (or an
+               unknown) command
+    """
+    stored = self._stored()
+    if stored is None:
+      return os.path.isfile(self.outputs[0])
+    return stored != self._hash
+
+  def check(self):
+    """
+    Returns:
+      (bool) : True if the command or the input files changed
+    """
+    return self.changed() or self._condition.check()
+
+  def record(self):
+    """
+    This writes the hash of the command next to the outputs (if the task
+    generated them, a cancelled task doesn't)
+    """
+    if not os.path.isfile(self.outputs[0]):
+      return
+    if self._stored() != self._hash:
+      with open(self._filename, 'w') as fd_hash:
+        print(self._hash, file=fd_hash)
+
+class CommandRecorder(taskrun.Observer):
+  """
+  This records the command hash of each CommandCondition when its task
+  completes. A bypassed task already has the hash of its command (otherwise
+  it would have run), nothing is recorded for it.
+  """
+
+  def __init__(self):
+    """
+    Constructs a CommandRecorder object
+    """
+    self._conditions = {}
+
+  def add(self, task, condition):
+    """
+    This records condition when task finishes
+    """
+    self._conditions[task.name] = condition
+
+  def task_bypassed(self, task):
+    self._conditions.pop(task.name, None)
+
+  def task_completed(self, task):
+    condition = self._conditions.pop(task.name, None)
+    if condition is not None:
+      condition.record()
+
+  def task_failed(self, task, errors):
+    self._conditions.pop(task.name, None)
+
+  def task_killed(self, task):
+    self._conditions.pop(task.name, None)
@@ -0,0 +1,123 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+class Config(object):
+  """
+  This is an immutable configuration (or sub-configuration) of the sweep
+  variables. It only stores the value index of each of its dimensions and
+  points back to the shared variable table. Iterating or indexing it yields the
+  same variable dicts (name, short_name, value, command, compare) that the
+  set_command callbacks have always received.
+  """
+
+  __slots__ = ('_variables', '_dims', '_idx')
+
+  def __init__(self, variables, dims, idx):
+    """
+    Constructs a Config object
+
+    Args:
+      variables    : shared table of sweep variables
+      dims         : dimensions (variable indices) of this config
+      idx          : value index of each dimension
+    """
+    assert len(dims) == len(idx)
+    object.__setattr__(self, '_variables', variables)
+    object.__setattr__(self, '_dims', dims)
+    object.__setattr__(self, '_idx', idx)
+
+  def __setattr__(self, name, value):
+    raise AttributeError('Config is immutable')
+
+  def _entry(self, dim, value):
+    variable = self._variables[dim]
+    return {
+      'name': variable['name'],
+      'short_name': variable['short_name'],
+      'value': variable['values'][value],
+      'command': variable['command'],
+      'compare': variable['compare']
+    }
+
+  def __len__(self):
+    return len(self._dims)
+
+  def __iter__(self):
+    for dim, value in zip(self._dims, self._idx):
+      yield self._entry(dim, value)
+
+  def __getitem__(self, key):
+    if isinstance(key, slice):
+      return [self._entry(dim, value) for dim, value in
+              zip(self._dims[key], self._idx[key])]
+    return self._entry(self._dims[key], self._idx[key])
+
+  def __eq__(self, other):
+    if not isinstance(other, Config):
+      return NotImplemented
+    return (self._variables is other._variables and
+            self._dims == other._dims and self._idx == other._idx)
+
+  def __hash__(self):
+    return hash((self._dims, self._idx))
+
+  def __repr__(self):
+    return 'Config({0})'.format(', '.join(
+      '{0}={1}'.format(self._variables[dim]['short_name'],
+                       self._variables[dim]['values'][value])
+      for dim, value in zip(self._dims, self._idx)))
+
+  @property
+  def dims(self):
+    """
+    Returns:
+      (tuple) : dimensions of this config
+    """
+    return self._dims
+
+  @property
+  def idx(self):
+    """
+    Returns:
+      (tuple) : value index of each dimension
+    """
+    return self._idx
+
+  def value(self, name):
+    """
+    This returns the value of a variable given its name or short name, None
+    if the variable is not part of this config
+    """
+    for dim, value in zip(self._dims, self._idx):
+      variable = self._variables[dim]
+      if variable['name'] == name or variable['short_name'] == name:
+        return variable['values'][value]
+    return None
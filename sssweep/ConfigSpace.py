@@ -0,0 +1,178 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import numpy
+
+from .Config import Config
+
+class ConfigSpace(object):
+  """
+  This holds the cartesian product of the sweep variables without building
+  it. Configurations are addressed by their flat index into the product, where
+  the last variable varies the fastest (the same order _dim_iter used to
+  yield), their value indices and ids are computed from it on demand.
+  """
+
+  def __init__(self, variables):
+    """
+    Constructs a ConfigSpace object
+
+    Args:
+      variables    : list of sweep variables (shared, not copied)
+    """
+    assert len(variables) > 0, 'at least one variable is needed'
+    self._variables = variables
+    self._names = [var['name'] for var in variables]
+    self._dims = {}
+    for dim, var in enumerate(variables):
+      self._dims[var['name']] = dim
+    self._widths = tuple(len(var['values']) for var in variables)
+
+    # strides of each dimension into the flat index
+    strides = [1] * len(self._widths)
+    for dim in reversed(range(len(self._widths) - 1)):
+      strides[dim] = strides[dim + 1] * self._widths[dim + 1]
+    self._strides = tuple(strides)
+    self._size = strides[0] * self._widths[0]
+
+    # value strings used to build ids
+    self._strs = [[str(value) for value in var['values']] for var in variables]
+
+  @property
+  def size(self):
+    """
+    Returns:
+      (int) : number of configurations in the full product
+    """
+    return self._size
+
+  @property
+  def variables(self):
+    return self._variables
+
+  def width(self, dim):
+    """
+    Returns the number of values of a dimension
+    """
+    return self._widths[dim]
+
+  def dim(self, name):
+    """
+    Returns the dimension of a variable given its name
+    """
+    return self._dims[name]
+
+  def dims(self, do_vars=None, dont=None):
+    """
+    This returns the dimensions selected by name, in variable order
+
+    Args:
+      do_vars      : variables to keep (str or list), None for all
+      dont         : variables to remove (str or list)
+    """
+    if isinstance(do_vars, str):
+      do_vars = [do_vars]
+    if isinstance(dont, str):
+      dont = [dont]
+    dims = []
+    for dim, name in enumerate(self._names):
+      if do_vars is not None and name not in do_vars:
+        continue
+      if dont is not None and name in dont:
+        continue
+      dims.append(dim)
+    return tuple(dims)
+
+  def iterate(self, dims):
+    """
+    This yields the value indices of every sub-configuration over dims
+
+    Args:
+      dims         : dimensions to iterate through
+    """
+    return numpy.ndindex(*[self._widths[dim] for dim in dims])
+
+  def select(self, dims, idx, vary):
+    """
+    This returns the flat indices of the configurations that have dims fixed
+    to idx while the vary dimensions iterate. Every dimension must be in
+    either dims or vary.
+
+    Args:
+      dims         : fixed dimensions
+      idx          : value indices of the fixed dimensions
+      vary         : dimensions to vary
+    """
+    assert len(dims) + len(vary) == len(self._widths)
+    base = 0
+    for dim, value in zip(dims, idx):
+      base += value * self._strides[dim]
+    flats = numpy.full(1, base, dtype=numpy.int64)
+    for dim in vary:
+      offsets = numpy.arange(self._widths[dim]) * self._strides[dim]
+      flats = (flats[:, None] + offsets).ravel()
+    return flats
+
+  def flat(self, dims, idx):
+    """
+    This returns the flat index of a full configuration
+    """
+    return int(self.select(dims, idx, ())[0])
+
+  def index(self, flat):
+    """
+    This returns the value indices of a full configuration
+    """
+    flat = int(flat)
+    return tuple((flat // stride) % width
+                 for stride, width in zip(self._strides, self._widths))
+
+  def make_id(self, flat):
+    """
+    This returns the id of a full configuration
+    """
+    return '_'.join([strs[value] for strs, value in
+                     zip(self._strs, self.index(flat))])
+
+  def partial_id(self, dims, idx):
+    """
+    This returns the id of a sub-configuration
+    """
+    return '_'.join([self._strs[dim][value] for dim, value in zip(dims, idx)])
+
+  def config(self, dims, idx):
+    """
+    This returns the config record of a sub-configuration
+
+    Args:
+      dims         : dimensions of the sub-configuration
+      idx          : value indices of the dimensions
+    """
+    return Config(self._variables, dims, tuple(idx))
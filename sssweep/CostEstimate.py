@@ -0,0 +1,272 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import collections
+import json
+import os
+
+from .DiskBudget import DiskBudget
+from . import fanout
+
+STAGES = ['sim', 'parse', 'tparse', 'plot']
+
+def _stage(task_type):
+  return task_type if task_type in STAGES else 'plot'
+
+class DryTask(object):
+  """
+  This is a task of a dry run, it only records its dependencies and condition
+  """
+
+  def __init__(self, name, task_type, console_out):
+    self.name = name
+    self.task_type = task_type
+    self.console_out = console_out
+    self.resources = {}
+    self.priority = 0
+    self.dependencies = []
+    self.condition = None
+
+  def get_dependencies(self):
+    return self.dependencies
+
+  def add_dependency(self, task):
+    self.dependencies.append(task)
+
+  def add_condition(self, condition):
+    # like taskrun, only the first condition is checked
+    if self.condition is None:
+      self.condition = condition
+
+class CostEstimate(object):
+  """
+  This estimates what a sweep costs before it runs, from the tasks of a dry
+  run (see Sweeper.estimate_cost): the number of tasks and dependency edges
+  of each stage, the tasks that would run (their outputs are missing or out
+  of date, or a task they depend on runs and generates their inputs), the
+  CPU time of each stage and the disk footprint of each artifact class.
+  Runtimes come from the runtime histories of previous sweeps, scaled by the
+  cpus resource of the tasks.
+  File sizes come from the existing outputs, the tombstones of reclaimed
+  logs, the sim cache, or else the mean size of the files of the same kind
+  in the output directory. What has no history is counted as unknown.
+  """
+
+  def __init__(self, classify, histories=()):
+    """
+    Constructs a CostEstimate object
+
+    Args:
+      classify     : function returning the artifact class of an output file
+      histories    : RuntimeHistory objects of previous sweeps
+    """
+    self._classify = classify
+    self._histories = list(histories)
+    self._tasks = []
+    self._configs = {}
+    self._cached = {}
+    self._patterns = {}
+    self._missing_shards = []
+
+  def create_task(self, name, task_type, config, console_out):
+    """
+    Returns:
+      (DryTask) : a task of the dry run
+    """
+    task = DryTask(name, task_type, console_out)
+    self._tasks.append(task)
+    self._configs[name] = config
+    return task
+
+  def add_cached(self, task, files, entry_files):
+    """
+    This marks a sim whose results are in the sim cache: it costs no CPU time
+    and its result files are the files of the cache entry
+    """
+    self._cached[task.name] = {
+      path: os.path.getsize(entry) for path, entry in zip(files, entry_files)
+      if os.path.isfile(entry)}
+
+  def set_missing_shards(self, missing):
+    """
+    This records the shards a merge waits for (not finished yet)
+    """
+    self._missing_shards = list(missing)
+
+  def _runs(self):
+    # a task runs if its condition says so or a task it depends on runs and
+    #  generates one of its inputs, dependencies are resolved first (without
+    #  recursion, the chains can be long)
+    runs = {}
+    for task in self._tasks:
+      stack = [(task, False)]
+      while len(stack) > 0:
+        node, resolved = stack.pop()
+        if node.name in runs:
+          continue
+        if not resolved:
+          stack.append((node, True))
+          stack.extend((dep, False) for dep in node.dependencies
+                       if dep.name not in runs)
+          continue
+        if node.condition is None:
+          runs[node.name] = True
+          continue
+        inputs = set(node.condition.inputs)
+        runs[node.name] = (
+          any(runs[dep.name] and dep.condition is not None and
+              not inputs.isdisjoint(dep.condition.outputs)
+              for dep in node.dependencies) or
+          bool(node.condition.check()))
+    return runs
+
+  def _runtime(self, task):
+    for history in self._histories:
+      seconds = history.estimate(task.name, task.task_type,
+                                 self._configs[task.name])
+      if seconds is not None:
+        return seconds
+    return None
+
+  def _typical(self, path):
+    # mean size of the files of the same kind (prefix and extension)
+    base = os.path.basename(path)
+    codec = ''
+    for ext in fanout.CODECS.values():
+      if len(ext) > 0 and base.endswith(ext):
+        codec = ext
+        base = base[:-len(ext)]
+    pattern = os.path.join(os.path.dirname(path), '{0}_*{1}{2}'.format(
+      base.split('_')[0], os.path.splitext(base)[1], codec))
+    if pattern not in self._patterns:
+      self._patterns[pattern] = DiskBudget.estimate(pattern)
+    return self._patterns[pattern]
+
+  def to_dict(self):
+    """
+    Returns:
+      (dict) : the estimate as plain types
+    """
+    runs = self._runs()
+    stages = collections.OrderedDict(
+      (stage, {'tasks': 0, 'run': 0, 'edges': 0, 'cpu_hours': 0.0,
+               'unknown': 0}) for stage in STAGES)
+    disk = collections.OrderedDict()
+    known = collections.defaultdict(list)
+    seen = set()
+    for task in self._tasks:
+      stage = _stage(task.task_type)
+      record = stages[stage]
+      record['tasks'] += 1
+      record['edges'] += len(task.dependencies)
+      # disk
+      outputs = []
+      if task.condition is not None:
+        outputs.extend(task.condition.outputs)
+      if task.console_out is not None:
+        outputs.append(task.console_out)
+      cached = self._cached.get(task.name, {})
+      for path in outputs:
+        if path in seen:
+          continue
+        seen.add(path)
+        artifact = disk.setdefault(self._classify(path), {
+          'files': 0, 'bytes': 0, 'unknown': 0})
+        artifact['files'] += 1
+        size = cached.get(path)
+        if size is None:
+          size = DiskBudget.size(path)
+        if size is None:
+          size = self._typical(path)
+        if size is None:
+          artifact['unknown'] += 1
+        else:
+          artifact['bytes'] += int(size)
+      # cpu
+      if not runs[task.name]:
+        continue
+      record['run'] += 1
+      if task.name in self._cached:
+        continue
+      seconds = self._runtime(task)
+      if seconds is None:
+        record['unknown'] += 1
+      else:
+        known[stage].append(seconds * task.resources.get('cpus', 1))
+    # the tasks without history cost the mean of their stage
+    for stage, record in stages.items():
+      if len(known[stage]) > 0:
+        mean = sum(known[stage]) / len(known[stage])
+        record['cpu_hours'] = (sum(known[stage]) +
+                               record['unknown'] * mean) / 3600.0
+    return {
+      'stages': stages,
+      'disk': disk,
+      'total': {
+        'tasks': sum(rec['tasks'] for rec in stages.values()),
+        'run': sum(rec['run'] for rec in stages.values()),
+        'edges': sum(rec['edges'] for rec in stages.values()),
+        'cpu_hours': sum(rec['cpu_hours'] for rec in stages.values()),
+        'bytes': sum(rec['bytes'] for rec in disk.values()),
+      },
+      'missing_shards': self._missing_shards
+    }
+
+  def write(self, filename):
+    """
+    This writes the estimate as JSON
+    """
+    with open(filename, 'w') as fd_json:
+      json.dump(self.to_dict(), fd_json, indent=2)
+
+  def __str__(self):
+    est = self.to_dict()
+    lines = ['{0:<12} {1:>9} {2:>9} {3:>9} {4:>11} {5:>9}'.format(
+      'stage', 'tasks', 'run', 'edges', 'cpu-hours', 'unknown')]
+    for stage, rec in est['stages'].items():
+      lines.append('{0:<12} {1:>9} {2:>9} {3:>9} {4:>11.2f} {5:>9}'.format(
+        stage, rec['tasks'], rec['run'], rec['edges'], rec['cpu_hours'],
+        rec['unknown']))
+    total = est['total']
+    lines.append('{0:<12} {1:>9} {2:>9} {3:>9} {4:>11.2f}'.format(
+      'total', total['tasks'], total['run'], total['edges'],
+      total['cpu_hours']))
+    lines.append('{0:<12} {1:>9} {2:>11} {3:>9}'.format(
+      'artifact', 'files', 'MiB', 'unknown'))
+    for artifact, rec in est['disk'].items():
+      lines.append('{0:<12} {1:>9} {2:>11.1f} {3:>9}'.format(
+        artifact, rec['files'], rec['bytes'] / 1048576.0, rec['unknown']))
+    lines.append('{0:<12} {1:>9} {2:>11.1f}'.format(
+      'total', sum(rec['files'] for rec in est['disk'].values()),
+      total['bytes'] / 1048576.0))
+    if len(est['missing_shards']) > 0:
+      lines.append('missing shards: {0}'.format(
+        ', '.join(est['missing_shards'])))
+    return '\n'.join(lines)
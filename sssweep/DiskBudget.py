@@ -0,0 +1,225 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import glob
+import os
+import shutil
+
+import taskrun
+
+class DiskBudget(taskrun.Observer):
+  """
+  This reclaims the message logs of the simulations once every task reading
+  them (their consumers) has finished. A log is deleted, or moved to the
+  archive directory, and replaced by a tombstone file holding its size, so
+  the finished simulation and parsings are still up to date on the next run.
+  The sizes of reclaimed logs estimate how many simulations can run ahead of
+  the parsings (see window). A simulation whose log was reclaimed runs again
+  when a task reading the log has to run (e.g. to parse a new filter), as
+  when its tombstone is deleted.
+  """
+
+  TOMBSTONE = '.reclaimed'
+
+  def __init__(self, budget, archive=None, log_size=None):
+    """
+    Constructs a DiskBudget object
+
+    Args:
+      budget       : bytes of message logs on disk at once
+      archive      : directory the logs are moved to (None deletes them)
+      log_size     : bytes of a typical log until logs were measured
+    """
+    assert budget > 0, 'the disk budget must be > 0'
+    assert log_size is None or log_size > 0, 'the log size must be > 0'
+    self._budget = budget
+    self._archive = archive
+    self._log_size = log_size
+    if self._archive is not None:
+      os.makedirs(self._archive, exist_ok=True)
+    self._consumers = {}
+    self._refs = {}
+    self._producers = {}
+    self._readers = {}
+
+  @classmethod
+  def reclaimed(cls, path):
+    """
+    Returns:
+      (bool) : True if the file was reclaimed
+    """
+    return os.path.isfile(path + cls.TOMBSTONE)
+
+  @classmethod
+  def size(cls, path):
+    """
+    Returns:
+      (int) : size of the file (or of the file reclaimed), None if missing
+    """
+    if os.path.isfile(path):
+      return os.path.getsize(path)
+    if cls.reclaimed(path):
+      with open(path + cls.TOMBSTONE, 'r') as fd_tomb:
+        return int(fd_tomb.read().strip() or 0)
+    return None
+
+  @classmethod
+  def estimate(cls, pattern):
+    """
+    Returns:
+      (float) : mean size of the files matching pattern (reclaimed or not),
+                None without any
+    """
+    sizes = []
+    for path in glob.glob(pattern + cls.TOMBSTONE):
+      with open(path, 'r') as fd_tomb:
+        sizes.append(int(fd_tomb.read().strip() or 0))
+    sizes.extend(os.path.getsize(path) for path in glob.glob(pattern))
+    if len(sizes) == 0:
+      return None
+    return sum(sizes) / len(sizes)
+
+  def window(self, pattern):
+    """
+    Returns:
+      (int) : number of simulations whose logs fit in the budget, None if
+              unknown (no log measured nor log_size)
+    """
+    size = self.estimate(pattern)
+    if size is None or size <= 0:
+      size = self._log_size
+    if size is None:
+      return None
+    return max(1, int(self._budget // size))
+
+  def condition(self, condition):
+    """
+    Returns:
+      (Condition) : condition ignoring the reclaimed files of condition
+    """
+    return _ReclaimedCondition(condition, self)
+
+  def needed(self, path):
+    """
+    Returns:
+      (bool) : True if the log path was reclaimed and a task reading it has
+               to run
+    """
+    if not self.reclaimed(path):
+      return False
+    return any(condition.check() for task in self._readers.get(path, [])
+               for condition in task.conditions)
+
+  def add_producer(self, task, path):
+    """
+    This registers the task generating the log path
+    """
+    self._producers[task.name] = path
+
+  def add_consumer(self, task, path):
+    """
+    This registers a task reading the log path
+    """
+    self._consumers.setdefault(task.name, []).append(path)
+    self._refs[path] = self._refs.get(path, 0) + 1
+    self._readers.setdefault(path, []).append(task)
+
+  def _reclaim(self, path):
+    if not os.path.isfile(path):
+      return
+    size = os.path.getsize(path)
+    if self._archive is not None:
+      shutil.move(path, os.path.join(self._archive, os.path.basename(path)))
+    else:
+      os.remove(path)
+    with open(path + self.TOMBSTONE, 'w') as fd_tomb:
+      print(size, file=fd_tomb)
+
+  def _release(self, task):
+    paths = self._consumers.pop(task.name, [])
+    for path in paths:
+      readers = self._readers.get(path, [])
+      if task in readers:
+        readers.remove(task)
+      if len(readers) == 0:
+        self._readers.pop(path, None)
+    return paths
+
+  def _finish(self, task):
+    for path in self._release(task):
+      self._refs[path] -= 1
+      if self._refs[path] == 0:
+        del self._refs[path]
+        self._reclaim(path)
+
+  def task_started(self, task):
+    # a new log replaces the reclaimed one
+    path = self._producers.pop(task.name, None)
+    if path is not None and self.reclaimed(path):
+      os.remove(path + self.TOMBSTONE)
+
+  def task_bypassed(self, task):
+    self._finish(task)
+
+  def task_completed(self, task):
+    self._finish(task)
+
+  def task_failed(self, task, errors):
+    # the log is kept to parse again
+    self._release(task)
+
+  def task_killed(self, task):
+    self._release(task)
+
+class _ReclaimedCondition(taskrun.Condition):
+  """
+  This checks a FileModificationCondition without its reclaimed files, a
+  reclaimed output is needed again if a task reading it has to run
+  """
+
+  def __init__(self, condition, budget):
+    super().__init__()
+    self._condition = condition
+    self._budget = budget
+
+  @property
+  def inputs(self):
+    return self._condition.inputs
+
+  @property
+  def outputs(self):
+    return self._condition.outputs
+
+  def check(self):
+    if any(self._budget.needed(f) for f in self.outputs):
+      return True
+    return taskrun.FileModificationCondition(
+      [f for f in self.inputs if not DiskBudget.reclaimed(f)],
+      [f for f in self.outputs if not DiskBudget.reclaimed(f)]).check()
@@ -0,0 +1,127 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import hashlib
+import json
+import os
+
+import taskrun
+
+from .DiskBudget import DiskBudget
+
+class Manifest(taskrun.Observer):
+  """
+  This remembers the tasks of previous sweeps into the same output directory
+  that finished (completed or were already up to date). Each entry holds the
+  hash of the task command and its output files, keyed by the task name (which
+  holds the configuration id). A task whose command is unchanged and whose
+  inputs were not regenerated doesn't need to be created again.
+  """
+
+  def __init__(self, filename):
+    """
+    Constructs a Manifest object, loading the previous sweep if it exists
+
+    Args:
+      filename     : path of the manifest file
+    """
+    self._filename = filename
+    self._done = {}
+    self._pending = {}
+    if os.path.isfile(self._filename):
+      with open(self._filename, 'r') as fd_man:
+        self._done = json.load(fd_man)['tasks']
+
+  @staticmethod
+  def hash_cmd(cmd):
+    """
+    Returns:
+      (str) : the hash of a command
+    """
+    return hashlib.sha1(cmd.encode('utf-8')).hexdigest()
+
+  def current(self, name, cmd):
+    """
+    Returns:
+      (bool) : True if the task finished before with the same command
+    """
+    entry = self._done.get(name)
+    return entry is not None and entry['cmd'] == self.hash_cmd(cmd)
+
+  def add(self, name, cmd):
+    """
+    This adds a created task, recorded once it finishes
+    """
+    self._done.pop(name, None)
+    self._pending[name] = {'cmd': self.hash_cmd(cmd), 'outputs': []}
+
+  def add_outputs(self, name, outputs):
+    """
+    This adds output files of a created task (relative to the manifest)
+    """
+    base = os.path.dirname(self._filename)
+    self._pending[name]['outputs'].extend(
+      os.path.relpath(output, base) for output in outputs)
+
+  def save(self):
+    """
+    This writes the manifest (atomically)
+    """
+    tmp = self._filename + '.tmp'
+    with open(tmp, 'w') as fd_man:
+      json.dump({'tasks': self._done}, fd_man, separators=(',', ':'))
+    os.replace(tmp, self._filename)
+
+  def _finish(self, task):
+    entry = self._pending.pop(task.name, None)
+    if entry is None:
+      return
+    # a bypassed task without its outputs (a cancelled load) isn't done
+    base = os.path.dirname(self._filename)
+    for output in entry['outputs']:
+      path = os.path.join(base, output)
+      if not os.path.isfile(path) and not DiskBudget.reclaimed(path):
+        return
+    self._done[task.name] = entry
+
+  def task_bypassed(self, task):
+    self._finish(task)
+
+  def task_completed(self, task):
+    self._finish(task)
+
+  def task_failed(self, task, errors):
+    self._pending.pop(task.name, None)
+
+  def task_killed(self, task):
+    self._pending.pop(task.name, None)
+
+  def run_complete(self):
+    self.save()
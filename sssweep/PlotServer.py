@@ -0,0 +1,252 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import argparse
+import fcntl
+import io
+import json
+import os
+import shlex
+import signal
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+class PlotServer(object):
+  """
+  This renders ssplot commands inside a long-lived server instead of starting
+  a python interpreter and importing matplotlib for every plot. The server
+  imports ssplot once then forks a worker for each plot, so plots render
+  concurrently and don't share any matplotlib state. Plot tasks run a light
+  client (standard library only) that sends the ssplot arguments over a unix
+  socket, starting the server if it isn't running. The server exits after
+  being idle for idle seconds. The sockets live in a directory only the user
+  can access (see socket_dir).
+  """
+
+  def __init__(self, socket_path, idle=60):
+    """
+    Constructs a PlotServer object
+
+    Args:
+      socket_path  : path of the unix socket of the server
+      idle         : seconds without plots before the server exits
+    """
+    self._socket_path = socket_path
+    self._idle = idle
+
+  @staticmethod
+  def socket_dir():
+    """
+    This creates the directory of the sockets of the user if needed
+
+    Returns:
+      (str) : path of the directory
+
+    Raises:
+      OSError : if the directory isn't a directory only the user can access
+    """
+    path = os.path.join(tempfile.gettempdir(),
+                        'sssweep-{0}'.format(os.getuid()))
+    try:
+      os.mkdir(path, 0o700)
+    except FileExistsError:
+      pass
+    # someone else may have created it (or a link) first
+    info = os.lstat(path)
+    if (not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or
+        stat.S_IMODE(info.st_mode) & 0o077 != 0):
+      raise OSError('{0} is not a private directory'.format(path))
+    return path
+
+  def command(self, plot_cmd):
+    """
+    Returns:
+      (str) : the command rendering an 'ssplot ...' command with the server
+    """
+    assert plot_cmd.startswith('ssplot '), 'not an ssplot command'
+    return '{0} {1} run {2} --idle {3} --{4}'.format(
+      shlex.quote(sys.executable), shlex.quote(os.path.abspath(__file__)),
+      shlex.quote(self._socket_path), self._idle, plot_cmd[len('ssplot'):])
+
+  def serve(self):
+    """
+    This runs the server until it is idle
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import ssplot
+
+    # the same parser as the ssplot script
+    ap = argparse.ArgumentParser(prog='ssplot')
+    sp = ap.add_subparsers(title='plotting commands', dest='cmd')
+    sp.required = True
+    for cls in ssplot.CommandLine.command_lines():
+      cls.create_parser(sp)
+
+    # workers are reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    tmp = '{0}.{1}'.format(self._socket_path, os.getpid())
+    server.bind(tmp)
+    os.rename(tmp, self._socket_path)
+    inode = os.stat(self._socket_path).st_ino
+    server.listen(128)
+    server.settimeout(self._idle)
+    while True:
+      try:
+        conn, _ = server.accept()
+      except socket.timeout:
+        break
+      if os.fork() == 0:
+        server.close()
+        conn.settimeout(None)
+        os._exit(self._render(conn, ap, plt))
+      conn.close()
+
+    # remove the socket unless another server replaced it
+    try:
+      if os.stat(self._socket_path).st_ino == inode:
+        os.remove(self._socket_path)
+    except OSError:
+      pass
+    server.close()
+
+  def _render(self, conn, ap, plt):
+    with conn, conn.makefile('rw') as fd_conn:
+      argv = json.loads(fd_conn.readline())
+      output = io.StringIO()
+      sys.stdout = sys.stderr = output
+      try:
+        args = ap.parse_args(argv)
+        args.func(args, plt)
+        code = 0
+      except SystemExit as ex:
+        code = ex.code if isinstance(ex.code, int) else 1
+      except Exception:
+        traceback.print_exc()
+        code = 1
+      plt.close('all')
+      fd_conn.write(json.dumps({'code': code, 'output': output.getvalue()}))
+      fd_conn.write('\n')
+    return code
+
+  def run(self, argv, timeout=300):
+    """
+    This renders a plot with the server, starting it if needed
+
+    Returns:
+      (int) : exit code of the plot
+    """
+    # retry once if the server exited while connecting
+    for _ in range(2):
+      try:
+        with self._connect(timeout) as conn, conn.makefile('rw') as fd_conn:
+          fd_conn.write(json.dumps(argv) + '\n')
+          fd_conn.flush()
+          result = json.loads(fd_conn.readline())
+      except (OSError, ValueError):
+        continue
+      sys.stdout.write(result['output'])
+      return result['code']
+    print('unable to render with the plot server', file=sys.stderr)
+    return 1
+
+  def _try_connect(self):
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+      conn.connect(self._socket_path)
+    except OSError:
+      conn.close()
+      return None
+    return conn
+
+  def _connect(self, timeout):
+    conn = self._try_connect()
+    if conn is not None:
+      return conn
+    # only one client starts the server, the lock file is never truncated
+    #  nor followed if it's a link
+    with open(self._socket_path + '.lock', 'a',
+              opener=_lock_opener) as fd_lock:
+      fcntl.flock(fd_lock, fcntl.LOCK_EX)
+      conn = self._try_connect()
+      if conn is not None:
+        return conn
+      if os.path.lexists(self._socket_path):
+        os.remove(self._socket_path)
+      with open(os.devnull, 'w') as fd_null:
+        subprocess.Popen(
+          [sys.executable, os.path.abspath(__file__), 'serve',
+           self._socket_path, '--idle', str(self._idle)],
+          stdin=fd_null, stdout=fd_null, stderr=fd_null,
+          start_new_session=True)
+      deadline = time.time() + timeout
+      while time.time() < deadline:
+        conn = self._try_connect()
+        if conn is not None:
+          return conn
+        time.sleep(0.05)
+    raise OSError('the plot server did not start')
+
+def _lock_opener(path, flags):
+  return os.open(path, flags | os.O_NOFOLLOW, 0o600)
+
+def main():
+  # the ssplot arguments follow --
+  argv = sys.argv[1:]
+  plot_argv = []
+  if '--' in argv:
+    plot_argv = argv[argv.index('--') + 1:]
+    argv = argv[:argv.index('--')]
+
+  ap = argparse.ArgumentParser(description='ssplot rendering server',
+                               usage='%(prog)s [-h] {serve,run} socket '
+                               '[--idle IDLE] [-- ssplot arguments]')
+  ap.add_argument('action', choices=['serve', 'run'],
+                  help='run the server or render a plot')
+  ap.add_argument('socket', help='unix socket of the server')
+  ap.add_argument('--idle', type=float, default=60,
+                  help='seconds without plots before the server exits')
+  args = ap.parse_args(argv)
+
+  server = PlotServer(args.socket, args.idle)
+  if args.action == 'serve':
+    server.serve()
+    return 0
+  return server.run(plot_argv)
+
+if __name__ == '__main__':
+  sys.exit(main())
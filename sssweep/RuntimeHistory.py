@@ -0,0 +1,170 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import bisect
+import json
+import math
+import os
+import time
+
+import taskrun
+
+class RuntimeHistory(taskrun.Observer):
+  """
+  This records the runtime of every task that ran in the output directory,
+  with its type and variable values, and estimates the runtime of new tasks.
+  A task that ran before is estimated by its last runtime, others by a model
+  fitted on the tasks of the same type where the log of the runtime is the
+  sum of an effect per variable value. The estimates order the tasks of a
+  stage longest first (see levels). The tasks served by the sim cache don't
+  run their command, their runtime isn't recorded.
+  """
+
+  def __init__(self, filename):
+    """
+    Constructs a RuntimeHistory object, loading the previous runs if they
+    exist
+
+    Args:
+      filename     : path of the runtime file
+    """
+    self._filename = filename
+    self._tasks = {}
+    if os.path.isfile(self._filename):
+      with open(self._filename, 'r') as fd_run:
+        self._tasks = json.load(fd_run)['tasks']
+    self._pending = {}
+    self._served = {}
+    self._started = {}
+    self._models = {}
+
+  def add(self, task, task_type, config):
+    """
+    This adds a created task, recorded once it completes
+    """
+    self._pending[task.name] = {
+      'type': task_type,
+      'config': {var['name']: str(var['value']) for var in config}}
+
+  def set_served(self, task, served):
+    """
+    This sets a function returning True if a created task is served without
+    running its command (a sim cache hit), checked when it starts. The
+    runtime of a served task isn't recorded.
+    """
+    self._served[task.name] = served
+
+  def _fit(self, task_type):
+    samples = [entry for entry in self._tasks.values()
+               if entry['type'] == task_type and entry['seconds'] > 0]
+    if len(samples) == 0:
+      return None
+    logs = [math.log(entry['seconds']) for entry in samples]
+    mean = sum(logs) / len(logs)
+    sums = {}
+    for entry, log in zip(samples, logs):
+      for item in entry['config'].items():
+        total, count = sums.get(item, (0.0, 0))
+        sums[item] = (total + log - mean, count + 1)
+    effects = {item: total / count for item, (total, count) in sums.items()}
+    return mean, effects
+
+  def estimate(self, name, task_type, config):
+    """
+    Returns:
+      (float) : estimated runtime of a task in seconds, None without any
+                history of its type
+    """
+    entry = self._tasks.get(name)
+    if entry is not None and entry['type'] == task_type:
+      return entry['seconds']
+    if task_type not in self._models:
+      self._models[task_type] = self._fit(task_type)
+    model = self._models[task_type]
+    if model is None:
+      return None
+    mean, effects = model
+    return math.exp(mean + sum(
+      effects.get((var['name'], str(var['value'])), 0.0) for var in config))
+
+  @staticmethod
+  def levels(estimates, low, high):
+    """
+    This spreads runtime estimates over the priority levels low to high by
+    rank, the longest get high. Unknown estimates (None) get the middle.
+
+    Returns:
+      (list) : priority level of each estimate
+    """
+    known = sorted(est for est in estimates if est is not None)
+    levels = []
+    for est in estimates:
+      if est is None or len(known) < 2:
+        levels.append((low + high) // 2)
+        continue
+      rank = bisect.bisect_left(known, est)
+      levels.append(low + rank * (high - low) // (len(known) - 1))
+    return levels
+
+  def save(self):
+    """
+    This writes the runtimes (atomically)
+    """
+    tmp = self._filename + '.tmp'
+    with open(tmp, 'w') as fd_run:
+      json.dump({'tasks': self._tasks}, fd_run, separators=(',', ':'))
+    os.replace(tmp, self._filename)
+
+  def task_started(self, task):
+    served = self._served.pop(task.name, None)
+    if served is not None and served():
+      self._pending.pop(task.name, None)
+      return
+    self._started[task.name] = time.monotonic()
+
+  def task_completed(self, task):
+    start = self._started.pop(task.name, None)
+    entry = self._pending.pop(task.name, None)
+    if start is not None and entry is not None:
+      entry['seconds'] = time.monotonic() - start
+      self._tasks[task.name] = entry
+
+  def task_failed(self, task, errors):
+    self._served.pop(task.name, None)
+    self._started.pop(task.name, None)
+    self._pending.pop(task.name, None)
+
+  def task_killed(self, task):
+    self._served.pop(task.name, None)
+    self._started.pop(task.name, None)
+    self._pending.pop(task.name, None)
+
+  def run_complete(self):
+    self.save()
@@ -0,0 +1,156 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import heapq
+import json
+import os
+
+import taskrun
+
+class ShardPlan(object):
+  """
+  This splits the configurations of a sweep into shards of about the same
+  estimated cost (longest processing time first: the most expensive
+  configuration goes to the cheapest shard). The first shard job to start
+  writes the plan next to the outputs and the others read it, so every job
+  owns the same disjoint slice even if the estimates change in between. A
+  plan is only read by the jobs of the same sweep (same key).
+  """
+
+  def __init__(self, filename, count, size, key):
+    """
+    Constructs a ShardPlan object
+
+    Args:
+      filename     : path of the plan file
+      count        : number of shards
+      size         : number of configurations (flat indices)
+      key          : hash of the configurations of the sweep
+    """
+    assert count > 0, 'the shard count must be > 0'
+    self._filename = filename
+    self._count = count
+    self._size = size
+    self._key = key
+    self._shards = None
+
+  @staticmethod
+  def assign(costs, count):
+    """
+    Returns:
+      (list) : the shard of each configuration given their costs
+    """
+    order = sorted(range(len(costs)), key=lambda flat: (-costs[flat], flat))
+    heap = [(0.0, shard) for shard in range(count)]
+    shards = [0] * len(costs)
+    for flat in order:
+      load, shard = heapq.heappop(heap)
+      shards[flat] = shard
+      heapq.heappush(heap, (load + costs[flat], shard))
+    return shards
+
+  def load(self, costs, write=True):
+    """
+    This reads the plan, or creates it from the cost of each configuration
+    (a function of the flat index) if no other job did
+
+    Args:
+      costs        : function returning the cost of a configuration
+      write        : write the created plan for the other jobs (a dry run
+                     only creates it in memory)
+    """
+    if not os.path.isfile(self._filename):
+      shards = self.assign([costs(flat) for flat in range(self._size)],
+                           self._count)
+      if not write:
+        self._shards = shards
+        return
+      tmp = '{0}.{1}.tmp'.format(self._filename, os.getpid())
+      with open(tmp, 'w') as fd_plan:
+        json.dump({'count': self._count, 'size': self._size,
+                   'key': self._key, 'shards': shards}, fd_plan,
+                  separators=(',', ':'))
+      try:
+        # only the first job creates the plan
+        os.link(tmp, self._filename)
+      except FileExistsError:
+        pass
+      os.remove(tmp)
+    with open(self._filename, 'r') as fd_plan:
+      plan = json.load(fd_plan)
+    assert (plan['count'] == self._count and plan['size'] == self._size and
+            plan.get('key') == self._key), \
+      '{0} is for another sweep, remove it'.format(self._filename)
+    self._shards = plan['shards']
+
+  def owned(self, shard):
+    """
+    Returns:
+      (bytearray) : 1 for each configuration of the shard
+    """
+    assert self._shards is not None, 'load the plan first'
+    return bytearray(int(owner == shard) for owner in self._shards)
+
+class ShardMarker(taskrun.Observer):
+  """
+  This writes the marker of a shard once its tasks ran without failure. The
+  merge waits for the markers of every shard. When the tasks run in several
+  runs (waves), only the run after arm() writes it.
+  """
+
+  def __init__(self, filename):
+    """
+    Constructs a ShardMarker object, removing the marker of a previous run
+
+    Args:
+      filename     : path of the marker file
+    """
+    self._filename = filename
+    self._failed = False
+    self._armed = True
+    if os.path.isfile(self._filename):
+      os.remove(self._filename)
+
+  def arm(self, armed=True):
+    """
+    This sets whether the next run completion writes the marker
+    """
+    self._armed = armed
+
+  def task_failed(self, task, errors):
+    self._failed = True
+
+  def task_killed(self, task):
+    self._failed = True
+
+  def run_complete(self):
+    if self._armed and not self._failed:
+      with open(self._filename, 'w') as fd_mark:
+        print('done', file=fd_mark)
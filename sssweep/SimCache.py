@@ -0,0 +1,230 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import sys
+import tempfile
+
+class SimCache(object):
+  """
+  This is a content-addressed cache of simulation results shared by sweeps
+  in different output directories. An entry is keyed by a hash of the
+  simulator binary, the settings file contents and the settings overrides of
+  the generated command (not the output files). The cache is checked when
+  the task runs: a hit copies the result files to the outputs of the
+  simulation, a miss runs the simulation then stores its result files. The
+  files are copied, not hard-linked, since a simulation rerun rewrites its
+  outputs in place which would also change a linked entry.
+  The least recently used entries are evicted when the cache is larger than
+  max_bytes.
+
+  This module only uses the standard library so the tasks can run it as a
+  script.
+  """
+
+  def __init__(self, cache_dir, max_bytes=None):
+    """
+    Constructs a SimCache object
+
+    Args:
+      cache_dir    : directory of the cache
+      max_bytes    : maximum size of the cache (None is unbounded)
+    """
+    self._cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+    self._max_bytes = max_bytes
+    self._hashes = {}
+    os.makedirs(self._cache_dir, exist_ok=True)
+
+  @property
+  def cache_dir(self):
+    return self._cache_dir
+
+  def _hash_file(self, path):
+    # files are hashed once per cache object
+    if path not in self._hashes:
+      sha = hashlib.sha256()
+      with open(path, 'rb') as fd_in:
+        for block in iter(lambda: fd_in.read(1 << 20), b''):
+          sha.update(block)
+      self._hashes[path] = sha.hexdigest()
+    return self._hashes[path]
+
+  def key(self, binary, settings, overrides, codecs):
+    """
+    Returns:
+      (str) : the key of a simulation
+
+    Args:
+      binary       : path of the simulator binary
+      settings     : path of the settings file
+      overrides    : settings overrides of the command (without output files)
+      codecs       : codecs of the result files
+    """
+    sha = hashlib.sha256()
+    sha.update(json.dumps([self._hash_file(binary), self._hash_file(settings),
+                           overrides, codecs]).encode('utf-8'))
+    return sha.hexdigest()
+
+  def _entry(self, key):
+    return os.path.join(self._cache_dir, key[:2], key)
+
+  def cached(self, key):
+    """
+    Returns:
+      (list) : result files of the entry of a simulation in order, None if it
+               is not in the cache
+    """
+    entry = self._entry(key)
+    if not os.path.isdir(entry):
+      return None
+    return [os.path.join(entry, str(index))
+            for index in range(len(os.listdir(entry)))]
+
+  def command(self, sim_cmd, key, files):
+    """
+    Returns:
+      (str) : the simulation command fetching from and storing to the cache
+
+    Args:
+      sim_cmd      : simulation command
+      key          : key of the simulation
+      files        : list of result files of the simulation
+    """
+    script = '{0} {1} {{0}} {2} {3} {4}'.format(
+      shlex.quote(sys.executable), shlex.quote(os.path.abspath(__file__)),
+      shlex.quote(self._cache_dir), key,
+      ' '.join(shlex.quote(f) for f in files))
+    if self._max_bytes is not None:
+      script += ' --max_bytes {0}'.format(self._max_bytes)
+    return '{0} || ({1} && {2})'.format(
+      script.format('fetch'), sim_cmd, script.format('store'))
+
+  def fetch(self, key, files):
+    """
+    This copies the result files of an entry to files
+
+    Returns:
+      (bool) : True if the entry was in the cache
+    """
+    entry = self._entry(key)
+    if not os.path.isdir(entry):
+      return False
+    try:
+      for index, path in enumerate(files):
+        _copy(os.path.join(entry, str(index)), path)
+      os.utime(entry)
+    except OSError:
+      # evicted while fetching
+      return False
+    return True
+
+  def store(self, key, files):
+    """
+    This adds the result files of a simulation as an entry
+    """
+    entry = self._entry(key)
+    if os.path.isdir(entry):
+      return
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(entry))
+    try:
+      for index, path in enumerate(files):
+        shutil.copyfile(path, os.path.join(tmp, str(index)))
+      os.rename(tmp, entry)
+    except OSError:
+      # stored by a concurrent simulation
+      shutil.rmtree(tmp, ignore_errors=True)
+    self.evict()
+
+  def evict(self):
+    """
+    This removes the least recently used entries above max_bytes
+    """
+    if self._max_bytes is None:
+      return
+    entries = []
+    total = 0
+    for prefix in os.listdir(self._cache_dir):
+      prefix_dir = os.path.join(self._cache_dir, prefix)
+      if not os.path.isdir(prefix_dir):
+        continue
+      for key in os.listdir(prefix_dir):
+        entry = os.path.join(prefix_dir, key)
+        try:
+          size = sum(os.path.getsize(os.path.join(entry, name))
+                     for name in os.listdir(entry))
+          entries.append((os.path.getmtime(entry), size, entry))
+        except OSError:
+          continue
+        total += size
+    entries.sort()
+    while total > self._max_bytes and len(entries) > 0:
+      _, size, entry = entries.pop(0)
+      shutil.rmtree(entry, ignore_errors=True)
+      total -= size
+
+def _copy(src, dst):
+  # a copy renamed over dst, a reader never sees a partial file
+  tmp = '{0}.{1}.tmp'.format(dst, os.getpid())
+  try:
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+  except OSError:
+    if os.path.lexists(tmp):
+      os.remove(tmp)
+    raise
+
+def main():
+  ap = argparse.ArgumentParser(description='simulation result cache')
+  ap.add_argument('action', choices=['fetch', 'store'],
+                  help='fetch or store the result files')
+  ap.add_argument('cache_dir', help='directory of the cache')
+  ap.add_argument('key', help='key of the simulation')
+  ap.add_argument('files', nargs='+', help='result files')
+  ap.add_argument('--max_bytes', type=int, default=None,
+                  help='maximum size of the cache')
+  args = ap.parse_args()
+
+  cache = SimCache(args.cache_dir, args.max_bytes)
+  if args.action == 'fetch':
+    if cache.fetch(args.key, args.files):
+      print('fetched {0} from {1}'.format(args.key, cache.cache_dir))
+      return 0
+    return 1
+  cache.store(args.key, args.files)
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -30,20 +30,58 @@
 """
 import os
 import stat
+import bisect
+import contextlib
 import copy
+import functools
+import glob
+import hashlib
+import itertools
+import shlex
+import sys
 import numpy
 import ssplot
 import taskrun
 
 #from .Analysis import Analysis
+from .AdaptiveLoads import AdaptiveLoads
+from .BuildReport import BuildReport
+from .CommandCondition import CommandCondition, CommandRecorder
+from .ConfigSpace import ConfigSpace
+from .CostEstimate import CostEstimate
+from .DiskBudget import DiskBudget
+from .Manifest import Manifest
+from .PlotServer import PlotServer
+from .RuntimeHistory import RuntimeHistory
+from .ShardPlan import ShardMarker, ShardPlan
+from .SimCache import SimCache
+from .TaskGraph import TaskGraph
+from .TaskTable import TaskTable
+from . import compare_fields
+from . import designs
+from . import fanout
+from . import load_plots
 from .web_viewer_gen import *
 
+# task types of the plots over the loads of a configuration
+LOAD_PLOTS = ['loadpermin', 'loadlat', 'loadrateper', 'loadavehops',
+              'loadrate', 'loadlatcomp']
+
+# sims per CPU in each wave of stream_tasks by default
+WAVE_SIMS_PER_CPU = 4
+
 class Sweeper(object):
   def __init__(
       self, supersim_path, settings_path, ssparse_path, transient_path,
       create_task_func, out_dir, compress=True, check_paths=True,
       latency_scalar=None, latency_units=None, load_units=None, sim=True,
-      viewer='prod', viewer_style='ss', readme=None, wanted_plots=[]):
+      viewer='prod', viewer_style='ss', readme=None, wanted_plots=[],
+      profile=False, profile_json=False, incremental=False, sim_cache=None,
+      sim_cache_size=None, cmd_hash=False, plot_server=False,
+      fuse_compare=False, group_parsings=False, stream_messages=False,
+      keep_messages=True, codecs=None, disk_budget=None, disk_archive=None,
+      disk_log_size=None, runtime_priorities=False, export_graph=False,
+      shard=None, merge_shards=None, priority_levels=16):
     """
     Constructs a Sweeper object
 
@@ -64,6 +102,45 @@ class Sweeper(object):
       viewer_style     : style name of viewer
       readme           : text for readme file
       wanted_plots     : name of compare plot to get cmd
+      profile          : measure each phase of create_tasks (BuildReport)
+      profile_json     : write the BuildReport next to all_cmds.txt
+      incremental      : only create tasks that changed since the last sweep
+      sim_cache        : directory of a simulation result cache (SimCache)
+      sim_cache_size   : maximum size of the sim cache in bytes
+      cmd_hash         : also rerun tasks whose command changed (off by
+                         default: only the file times are checked as before),
+                         the first sweep with it reruns the tasks whose
+                         outputs have no recorded command
+      plot_server      : render plots in a long-lived server (PlotServer),
+                         its socket is in a private directory of the user
+      fuse_compare     : one load-latency-compare task plots all fields
+      group_parsings   : parse every filter (ssparse and transient) in one
+                         pass over the messages
+      stream_messages  : sims stream the messages to the parsings through a
+                         named pipe (FIFO)
+      keep_messages    : also write the messages file when streaming
+      codecs           : codec of each artifact class overriding compress,
+                         messages (none, gz, zstd, lz4), sim_csv and
+                         parse_csv (none, gz)
+      disk_budget      : bytes of message logs kept on disk, each log is
+                         reclaimed once it is parsed (DiskBudget)
+      disk_archive     : directory the reclaimed logs are moved to
+      disk_log_size    : bytes of a typical message log, sizes the disk budget
+                         until previous sweeps measured the logs (needed by
+                         the first sweep with a disk budget)
+      runtime_priorities : order the sims and parsings longest first from
+                         the runtimes of previous sweeps (RuntimeHistory)
+      export_graph     : write the task graph to task_graph.json (TaskGraph,
+                         run by graph_runner.py), not with a disk budget nor
+                         adaptive loads whose conditions depend on the state
+                         of the Sweeper
+      shard            : (index, count) only create the sims, parsings and
+                         plots of one configuration of a slice of the
+                         configurations (ShardPlan)
+      merge_shards     : number of shards whose outputs make the plots over
+                         the loads (and the viewer)
+      priority_levels  : priority levels of the task manager the tasks are
+                         created in (runtime_priorities)
     """
     # mandatory
     self._supersim_path = os.path.abspath(os.path.expanduser(supersim_path))
@@ -74,6 +151,21 @@ class Sweeper(object):
     self._out_dir = os.path.abspath(os.path.expanduser(out_dir))
     self._compress = compress
 
+    # codecs of the data files
+    codec = 'gz' if compress else 'none'
+    self._codecs = {'messages': codec, 'sim_csv': codec, 'parse_csv': codec}
+    if codecs is not None:
+      for artifact in codecs:
+        assert artifact in self._codecs, \
+          'Invalid artifact class: {0}'.format(artifact)
+        self._codecs[artifact] = codecs[artifact]
+    assert self._codecs['messages'] in fanout.CODECS, \
+      'Invalid messages codec: {0}'.format(self._codecs['messages'])
+    # supersim, ssparse and ssplot only read and write gzip
+    for artifact in ['sim_csv', 'parse_csv']:
+      assert self._codecs[artifact] in ['none', 'gz'], \
+        'Invalid {0} codec: {1}'.format(artifact, self._codecs[artifact])
+
     # settings
     self._latency_scalar = latency_scalar
     self._latency_units = latency_units
@@ -81,6 +173,54 @@ class Sweeper(object):
     self._sim = sim
     self._viewer = viewer.lower()
     self._readme = readme
+    self._profile = profile or profile_json
+    self._profile_json = profile_json
+    self._report = None
+    self._report_file = 'create_tasks_profile.json'
+    self._incremental = incremental
+    self._manifest = None
+    self._manifest_file = 'manifest.json'
+    self._cmd_hash = cmd_hash
+    self._cmd_recorder = None
+    self._sim_cache = None
+    if sim_cache is not None:
+      self._sim_cache = SimCache(sim_cache, sim_cache_size)
+    self._fuse_compare = fuse_compare
+    self._group_parsings = group_parsings
+    self._stream_messages = stream_messages
+    self._keep_messages = keep_messages
+    if stream_messages:
+      assert sim, 'streaming the messages needs the sims'
+      assert sim_cache is None, 'the sim cache needs the messages file'
+    self._plot_server = None
+    if plot_server:
+      # unix socket paths are short, one server per output directory
+      socket_name = 'plot_{0}.sock'.format(
+        hashlib.sha1(self._out_dir.encode('utf-8')).hexdigest()[:12])
+      try:
+        socket_dir = PlotServer.socket_dir()
+      except OSError as error:
+        self._error(str(error))
+      self._plot_server = PlotServer(os.path.join(socket_dir, socket_name))
+    self._runtime_priorities = runtime_priorities
+    self._runtimes = None
+    self._priority_levels = priority_levels
+    if runtime_priorities:
+      assert priority_levels >= 3, \
+        'runtime_priorities needs at least 3 priority levels'
+    self._runtimes_file = 'runtimes.json'
+    self._prioritize = []
+    self._resources = {'sim': None, 'parse': None, 'tparse': None,
+                       'plot': None}
+    self._graph = None
+    self._graph_file = 'task_graph.json'
+    if export_graph:
+      assert disk_budget is None, \
+        'the disk budget can\'t be exported in the task graph'
+      self._graph = TaskGraph()
+    self._disk_budget = None
+    if disk_budget is not None:
+      self._disk_budget = DiskBudget(disk_budget, disk_archive, disk_log_size)
 
     # load sweep values
     self._start = None
@@ -98,14 +238,51 @@ class Sweeper(object):
     self._created = False
     self._load_variable = None
     self._load_name = None
+    self._adaptive_loads = (None, None, None)
+    self._adaptive = None
+    self._adaptive_filter = None
+    self._refine = None
+    self._saturation_file = 'saturation.csv'
+    self._space = None
+    self._wave = None
+    self._sparse_tables = False
+    self._estimate = None
+    self._design = None
+    self._constraints = []
+    self._exclusions = []
+    self._active = None
+    self._positions = None
+
+    # sharding
+    self._shard = shard
+    self._merge_shards = merge_shards
+    self._shard_marker = None
+    self._owned = None
+    assert shard is None or merge_shards is None, \
+      'a sweeper is either a shard or the merge'
+    if shard is not None:
+      assert 0 <= shard[0] < shard[1], 'Invalid shard: {0}'.format(shard)
+      self._shard_plan_file = 'shard_plan_{0}.json'.format(shard[1])
+      # the merge makes the viewer
+      self._viewer = 'off'
+      # the bookkeeping files of each shard are separate
+      suffix = '_shard{0}of{1}'.format(shard[0], shard[1])
+      for attr in ['_report_file', '_manifest_file', '_runtimes_file',
+                   '_graph_file', '_all_cmds_file', '_plot_cmds_file',
+                   '_saturation_file']:
+        base, ext = os.path.splitext(getattr(self, attr))
+        setattr(self, attr, base + suffix + ext)
+    if merge_shards is not None:
+      assert merge_shards > 0, 'Invalid shard count: {0}'.format(merge_shards)
+      self._shard_plan_file = 'shard_plan_{0}.json'.format(merge_shards)
 
     # variables for javascript
     self._id_cmp = "Cmp"
     self._id_lat_dist = "LatDist"
     self._comp_var_count = 0
 
-    # store tasks
-    self._sim_tasks = {}
+    # store tasks (tables indexed by configuration)
+    self._sim_tasks = None
     self._ssparse_tasks = {}
     self._tparse_tasks = {}
 
@@ -189,7 +366,9 @@ class Sweeper(object):
       except:
         self._error('couldn\'t create {0}'.format(viewer_f))
 
-  def add_loads(self, name, short_name, start, stop, step, set_command):
+  def add_loads(self, name, short_name, start, stop, step, set_command,
+                adaptive=None, threshold=None, adaptive_filter=None,
+                refine=None):
     """
     This creates and adds the load sweep variable to _load_variable
 
@@ -198,6 +377,17 @@ class Sweeper(object):
       shortname         : acronym of sweep variable for filename
       start, stop, step : load sweep start stop and step
       set_command       : pointer to command function
+      adaptive          : stop the loads of a configuration at saturation,
+                          detected on the latency or rate (AdaptiveLoads).
+                          The loads run independently, lowest first: a
+                          load is cancelled if a lower load saturated when
+                          it's dispatched, the loads already running past
+                          saturation (at most one per free CPU) still finish
+      threshold         : saturation threshold of the criterion
+      adaptive_filter   : ssparse filter of the latency criterion (default
+                          the first one)
+      refine            : resolution of the saturation point found by
+                          refine_loads (needs adaptive)
     """
     # build the variable
     assert start <= stop, 'start must be <= stop'
@@ -212,6 +402,16 @@ class Sweeper(object):
     self._start = start
     self._stop = stop
     self._step = step
+    if adaptive is not None:
+      assert adaptive in AdaptiveLoads.CRITERIA, \
+        'Invalid saturation criterion: {0}'.format(adaptive)
+      assert self._graph is None, \
+        'adaptive loads can\'t be exported in the task graph'
+    self._adaptive_loads = (adaptive, threshold, adaptive_filter)
+    if refine is not None:
+      assert adaptive is not None, 'refine needs a saturation criterion'
+      assert refine > 0, 'refine must be > 0'
+    self._refine = refine
 
   def add_plot(self, plot_type, filter_name, filters = [],
                title_format='short-equal', latency_mode='packet',
@@ -357,104 +557,103 @@ class Sweeper(object):
     # add the variable
     self._variables.append(configall)
 
-  def _dim_iter(self, do_vars=None, dont=None):
+  def set_resources(self, stage, resources):
     """
-    This function creates the config files with the permutations of the sweep
-    variables
+    This declares the resources each task of a stage needs in the task
+    manager (e.g. {'cpus': 1, 'mem': 8} with taskrun's standard task manager,
+    memory in GiB). A task only starts when its resources are free, so each
+    stage runs as wide as the machine allows.
 
     Args:
-      do_vars           : variables to iterate through
-      dont         : variables to remove from iteration
+      stage         : sim, parse, tparse or plot
+      resources     : dict of resource amounts, or a function of the config
+                      of a task returning one
     """
-    tmp_vars = []
-    # All variables
-    if do_vars is None:
-      tmp_vars = copy.deepcopy(self._variables) #Adds all
-    else:
-      for var in copy.deepcopy(self._variables):
-        if var['name'] in do_vars: # add only dos
-          tmp_vars.append(var)
-
-    # remove variables
-    vars_all = []
-    for var in tmp_vars:
-      if dont is None or var['name'] not in dont:
-        vars_all.append(var) # add only variables not in dont
-
-    # reverse the order
-    vars_all = list(reversed(vars_all))
-
-    # find value lengths
-    widths = []
-    for var in vars_all:
-      widths.append(len(var['values']))
-
-    # find top non-single value variable
-    top_non_one = None
-    for dim in reversed(range(len(widths))):
-      if widths[dim] != 1:
-        top_non_one = dim
-        break
+    assert stage in self._resources, 'Invalid stage: {0}'.format(stage)
+    self._resources[stage] = resources
 
-    # generate all indices
-    cur = [0] * len(widths)
-    more = True
-    while more:
-      # yield the configuration
-      config = []
-      for dim in reversed(range(len(cur))):
-        variable = vars_all[dim]
-        config.append({
-          'name': variable['name'],
-          'short_name': variable['short_name'],
-          'value': variable['values'][cur[dim]],
-          'command': variable['command'],
-          'compare': variable['compare']
-        })
-      yield config
-
-      # detect only one config
-      if top_non_one is None:
-        more = False
-        break
+  def set_design(self, design, samples=None, seed=0, baseline=None):
+    """
+    This simulates a fraction of the configurations without the load instead
+    of all of them (their loads are all simulated so the load-* plots are
+    whole). The viewer shows which configurations are in the design.
 
-      # advance the generator
-      for dim in range(len(widths)):
-        if cur[dim] == widths[dim] - 1:
-          if dim == top_non_one:
-            more = False
-            break
-          else:
-            cur[dim] = 0
+    Args:
+      design        : full, lhs (latin hypercube), orthogonal (strength 2
+                      orthogonal array), ofat (one factor at a time around
+                      the baseline) or random (see designs)
+      samples       : number of configurations of lhs and random
+      seed          : seed of lhs and random
+      baseline      : dict of the baseline value of the variables of ofat
+                      (the first value of the others)
+    """
+    assert design in designs.DESIGNS, 'Invalid design: {0}'.format(design)
+    assert design not in ['lhs', 'random'] or samples is not None, \
+      '{0} needs samples'.format(design)
+    self._design = (design, samples, seed, baseline)
 
-        else:
-          cur[dim] += 1
-          break
+  def add_constraint(self, predicate):
+    """
+    This drops the configurations without the load for which predicate is
+    False before any task is created (every load of the others is
+    simulated). The plots and the viewer only show the configurations left.
+
+    Args:
+      predicate     : function of a config (variable dicts, see
+                      config_get_value) returning True to keep it
+    """
+    assert callable(predicate), 'the constraint must be a function'
+    self._constraints.append(predicate)
+
+  def add_exclusion(self, rule):
+    """
+    This drops the configurations matching every variable of a rule, e.g.
+    {'Topology': 'torus', 'Routing': ['val', 'ugal']}, like add_constraint
+
+    Args:
+      rule          : dict of variable name (or short name) to a value or a
+                      list of values
+    """
+    assert len(rule) > 0, 'the rule needs a variable'
+    self._exclusions.append({
+      name: list(values) if isinstance(values, (list, tuple, set))
+      else [values] for name, values in rule.items()})
 
   def _error(self, msg, code=-1):
     if msg:
       print('ERROR: {0}'.format(msg))
     exit(code)
 
-  def _make_id(self, config, f_name=None, extra=None):
+  def _make_id(self, dims, idx, f_name=None, extra=None):
     """
     This creates id for task
 
     Args:
-      config   : input config to iterate
-      extra    : extra values to append at the end (list or string)
+      dims     : dimensions of the sub-configuration
+      idx      : value indices of the dimensions
+      f_name   : filter name to insert at the front
+      extra    : extra value to append at the end
     """
-    values = [y_var['value'] for y_var in config]
+    values = []
     if f_name != None:
-      values.insert(0, f_name)
+      values.append(f_name)
+    if len(dims) > 0:
+      values.append(self._space.partial_id(dims, idx))
     if extra:
-      if isinstance(extra, str):
-        values.append(extra)
-      elif isinstance(extra, list):
-        values.extend(extra)
-      else:
-        assert False
-    return '_'.join([str(x_values) for x_values in values])
+      values.append(extra)
+    return '_'.join(values)
+
+  def _make_flat_id(self, flat, f_name=None):
+    """
+    This creates id for task of a full configuration
+
+    Args:
+      flat     : flat index of the configuration
+      f_name   : filter name to insert at the front
+    """
+    if f_name != None:
+      return '{0}_{1}'.format(f_name, self._space.make_id(flat))
+    return self._space.make_id(flat)
 
   def _make_title(self, config, plot_info, lat=None):
     # plot name
@@ -512,27 +711,6 @@ class Sweeper(object):
     assert len(title) > 0
     return title
 
-  def _create_config(self, *args):
-    """
-    This creates ordered config from multiple sub-configs
-
-    Args:
-      *   : configs to combine
-    """
-    # vars to return
-    combined = []
-    for var in copy.deepcopy(self._variables):
-      for config in args:
-        found = False
-        for var2 in config:
-          if var2['name'] == var['name']:
-            found = True
-            combined.append(copy.deepcopy(var2))
-            break
-        if found:
-          break
-    return combined
-
   def _cmd_clean(self, cmd):
     """
     This adds leading space to input commands
@@ -551,7 +729,8 @@ class Sweeper(object):
     This creates sim file names for a given id_task
     """
     dir_var = self._out_dir
-    compress = '.gz' if self._compress else ''
+    compress = fanout.CODECS[self._codecs['sim_csv']]
+    compress_mpf = fanout.CODECS[self._codecs['messages']]
     return {
       # generated by sim
       'info_csv': os.path.join(
@@ -559,7 +738,7 @@ class Sweeper(object):
           id_task, compress)),
       'messages_mpf' : os.path.join(
         dir_var, self._data_folder, 'messages_{0}.mpf{1}'.format(
-          id_task, compress)),
+          id_task, compress_mpf)),
       'rates_csv' : os.path.join(
         dir_var, self._data_folder, 'rates_{0}.csv{1}'.format(
           id_task, compress)),
@@ -574,7 +753,7 @@ class Sweeper(object):
     This creates ssparse file names for a given id_task
     """
     dir_var = self._out_dir
-    compress = '.gz' if self._compress else ''
+    compress = fanout.CODECS[self._codecs['parse_csv']]
     return {
       # generated by ssparse
       'samples_csv' : os.path.join(
@@ -593,7 +772,7 @@ class Sweeper(object):
     This creates tparse file names for a given id_task
     """
     dir_var = self._out_dir
-    compress = '.gz' if self._compress else ''
+    compress = fanout.CODECS[self._codecs['parse_csv']]
     return {
       # generated by transient parse
       'trans_csv' : os.path.join(
@@ -656,7 +835,301 @@ class Sweeper(object):
 
   def create_tasks(self, tm_var):
     """
-    This creates all the tasks
+    This creates all the tasks. When incremental, only the tasks that changed
+    since the last sweep are created, and the manifest is updated by the
+    task manager as they finish.
+
+    Returns:
+      (BuildReport) : measurements of each phase when profiling, else None
+    """
+    self._prepare_tasks()
+    self._observe_tasks(tm_var)
+    self._create_graph(tm_var, verbose=True)
+
+    # viewer
+    if  self._viewer != 'off':
+      print("Creating viewer")
+      with self._phase('viewer'):
+        self._create_viewer_task()
+
+    # all cmds
+    with self._phase('cmds'):
+      if len(self._all_cmds) != 0:
+        cmd_f = os.path.join(self._out_dir, self._all_cmds_file)
+        with open(cmd_f, 'w') as fd_cmd:
+          fd_cmd.write('\n'.join(str(line) for line in self._all_cmds))
+
+      self._write_plot_cmds()
+
+    self._write_report()
+    return self._report
+
+  def stream_tasks(self, tm_var, wave_size=None):
+    """
+    This creates and runs the tasks in waves instead of building the whole
+    graph up front. Each wave holds wave_size outer configurations (all
+    variables except the load) with their sims, parsings and plots. A
+    load-latency-compare plot is created in the wave of the last
+    configuration it compares, when all its inputs have been generated. The
+    tasks, ids and files of a wave are released once the wave has run, only
+    one byte per configuration is kept for the whole sweep.
+
+    A wave runs to completion before the next one is created (the task
+    manager can't take new tasks while it runs), so the cores idle while
+    the last tasks of each wave drain. The default wave_size gives every wave
+    about WAVE_SIMS_PER_CPU sims per CPU to keep that tail short.
+
+    Args:
+      tm_var       : task manager used to run each wave
+      wave_size    : number of outer configurations per wave (None sizes the
+                     waves to the CPUs of the machine)
+
+    Returns:
+      (bool) : True if all waves succeeded
+    """
+    if wave_size is None:
+      nloads = len(self._load_variable['values'])
+      cpus = os.cpu_count() or 1
+      wave_size = -(-WAVE_SIMS_PER_CPU * cpus // nloads)
+    assert wave_size > 0, 'wave_size must be > 0'
+    self._sparse_tables = True
+    self._prepare_tasks()
+    self._observe_tasks(tm_var)
+
+    # the viewer only depends on the variables and plots
+    if  self._viewer != 'off':
+      print("Creating viewer")
+      with self._phase('viewer'):
+        self._create_viewer_task()
+
+    outer_dims = self._space.dims(dont=self._load_name)
+    load_dims = self._space.dims(do_vars=self._load_name)
+    outer = (self._outer_idx(pos) for pos in self._positions)
+    count = len(self._positions)
+    waves = -(-count // wave_size)
+    # only the last wave marks the shard as done
+    if self._shard_marker is not None:
+      self._shard_marker.arm(False)
+    cmd_f = os.path.join(self._out_dir, self._all_cmds_file)
+    success = True
+    with open(cmd_f, 'w') as fd_cmd:
+      for wave_idx in range(waves):
+        self._wave = list(itertools.islice(outer, wave_size))
+        print("Running wave {0}/{1}".format(wave_idx + 1, waves))
+        self._create_graph(tm_var, verbose=False)
+
+        # all cmds of this wave
+        if len(self._all_cmds) != 0:
+          if wave_idx > 0:
+            fd_cmd.write('\n')
+          fd_cmd.write('\n'.join(str(line) for line in self._all_cmds))
+          fd_cmd.flush()
+          self._all_cmds = []
+
+        if self._shard_marker is not None and wave_idx == waves - 1:
+          self._shard_marker.arm()
+        success = tm_var.run_tasks()
+
+        # release the tasks of this wave
+        flats = [flat for idx in self._wave
+                 for flat in self._space.select(outer_dims, idx, load_dims)]
+        for table in self._task_tables():
+          table.clear(flats)
+        if not success:
+          break
+    self._wave = None
+
+    self._write_plot_cmds()
+    self._write_report()
+    return success
+
+  def estimate_cost(self):
+    """
+    This creates the tasks of the sweep in a dry run, without the task
+    manager and without running or writing anything, and estimates what the
+    sweep costs from the previous sweeps in the output directory and the sim
+    cache. The sweeper is left as is, so the tasks can be created after. A
+    merge reports the shards that have not finished instead of exiting. The
+    manifest (incremental) and the command hashes (cmd_hash) are read, not
+    written: the tasks the sweep wouldn't create are left out and the tasks
+    whose command changed run.
+
+    Returns:
+      (CostEstimate) : tasks, edges and CPU hours of each stage and disk
+                       footprint of each artifact class
+    """
+    assert not self._created, 'estimate the cost before creating the tasks'
+    # everything the creation of the tasks builds or changes is copied
+    dry = copy.deepcopy(self)
+    dry._profile = False
+    dry._graph = None
+    dry._estimate = CostEstimate(self._artifact_class,
+                                 self._runtime_histories())
+    # no task manager observes them, nothing is recorded
+    if self._cmd_hash:
+      dry._cmd_recorder = CommandRecorder()
+    if self._incremental:
+      dry._manifest = Manifest(os.path.join(self._out_dir,
+                                            self._manifest_file))
+    dry._prepare_tasks()
+    dry._create_graph(None, verbose=False)
+    return dry._estimate
+
+  def _artifact_class(self, path):
+    """
+    This returns the artifact class of an output file (as in codecs), the
+    plots and logs by their folder
+    """
+    folder = os.path.basename(os.path.dirname(path))
+    if folder != self._data_folder:
+      return folder
+    prefix = os.path.basename(path).split('_')[0]
+    if prefix == 'messages':
+      return 'messages'
+    if prefix in ['info', 'rates', 'channels']:
+      return 'sim_csv'
+    return 'parse_csv'
+
+  def refine_loads(self, tm_var):
+    """
+    This refines the saturation point of every configuration once its load
+    sweep ran (after create_tasks and run_tasks, or after stream_tasks). Each
+    round adds a sim (and the parsing of the checked stats) in the middle of
+    the interval between the highest stable load and the lowest saturated
+    load of each configuration, then runs them, until every interval is
+    within the refine resolution. The refined loads are not in the load-*
+    plots. The intervals are written to saturation.csv.
+
+    Args:
+      tm_var       : task manager used to run each round
+
+    Returns:
+      (bool) : True if all rounds succeeded
+    """
+    assert self._created, 'create the tasks first'
+    assert self._refine is not None, 'add_loads needs refine'
+    outer_dims = self._space.dims(dont=self._load_name)
+    load_dims = self._space.dims(do_vars=self._load_name)
+    loads = self._load_variable['values']
+    # the checked stats of each load of every configuration
+    points = []
+    for pos in self._positions:
+      idx = self._outer_idx(pos)
+      flats = self._space.select(outer_dims, idx, load_dims)
+      points.append((idx, [(load, self._adaptive.stats(flat))
+                           for load, flat in zip(loads, flats)]))
+
+    success = True
+    rounds = 0
+    while True:
+      created = False
+      for idx, known in points:
+        stable, saturated = self._saturation(known)
+        if (stable is None or saturated is None or
+            saturated - stable <= self._refine):
+          continue
+        load = (stable + saturated) / 2
+        stats = self._create_refine_tasks(tm_var, outer_dims, idx, load)
+        bisect.insort(known, (load, stats))
+        created = True
+      if not created:
+        break
+      rounds += 1
+      if self._runtimes is not None:
+        self._set_priorities()
+      if self._graph is not None:
+        self._graph.freeze()
+      print("Running refinement round {0}".format(rounds))
+      success = tm_var.run_tasks()
+      if not success:
+        break
+
+    # saturation interval of every configuration
+    sat_f = os.path.join(self._out_dir, self._saturation_file)
+    with open(sat_f, 'w') as fd_sat:
+      names = [self._variables[dim]['name'] for dim in outer_dims]
+      print(','.join(names + ['stable', 'saturated']), file=fd_sat)
+      for idx, known in points:
+        values = [var['value'] for var in
+                  self._space.config(outer_dims, idx)]
+        values.extend('' if load is None else '{0:g}'.format(load)
+                      for load in self._saturation(known))
+        print(','.join(str(value) for value in values), file=fd_sat)
+    self._write_report()
+    return success
+
+  def _saturation(self, known):
+    """
+    This returns the highest stable load and the lowest saturated load (None
+    if unknown) of a configuration given the (load, stats file) of its
+    simulated loads in load order
+    """
+    stable = None
+    for load, stats in known:
+      if not os.path.isfile(stats):
+        continue
+      if self._adaptive.check(stats, known[0][1], load):
+        return stable, load
+      stable = load
+    return stable, None
+
+  def _create_refine_tasks(self, tm_var, outer_dims, idx, load):
+    """
+    This creates the sim of a configuration at a load off the load grid (and
+    the parsing of the filter checked for saturation) and returns the stats
+    file checked
+    """
+    load_var = self._load_variable
+    sim_config = list(self._space.config(outer_dims, idx)) + [{
+      'name': load_var['name'], 'short_name': load_var['short_name'],
+      'value': load, 'command': load_var['command'],
+      'compare': load_var['compare']}]
+    # every digit of the load, close loads get different ids
+    load_str = repr(float(load))
+    id_task = self._make_id(outer_dims, idx, extra=load_str)
+    files = self._get_sim_files(id_task)
+    piped = self._stream_messages or self._messages_piped()
+    stats = files['rates_csv']
+    parse_cmd = None
+    parse_outputs = []
+    if self._adaptive_filter is not None:
+      f_name = self._adaptive_filter
+      ssparse_files = self._get_ssparse_files(
+        self._make_id(outer_dims, idx, f_name=f_name, extra=load_str))
+      parse_outputs = [ssparse_files['samples_csv'],
+                       ssparse_files['latency_csv'],
+                       ssparse_files['hops_csv']]
+      stats = ssparse_files['latency_csv']
+      parse_cmd = self._ssparse_cmd(
+        f_name, ssparse_files, '/dev/stdin' if piped else
+        files['messages_mpf'])
+    # same commands, cache and conditions as the sims of the grid
+    consumers = []
+    if self._stream_messages and parse_cmd is not None:
+      consumers.append(parse_cmd)
+      parse_cmd = None
+    elif piped and parse_cmd is not None:
+      parse_cmd = fanout.command(files['messages_mpf'], [parse_cmd])
+    sim_task = self._create_sim_task(tm_var, id_task, files, sim_config,
+                                     consumers, parse_outputs)
+    if parse_cmd is not None:
+      parse_task = self._create_task(
+        tm_var, 'parse_{0}_{1}'.format(f_name, id_task), parse_cmd, None,
+        'parse', sim_config, sim_task is not None)
+      if parse_task is not None:
+        parse_task.priority = 1
+        self._add_dependency(parse_task, sim_task)
+        if self._disk_budget is not None:
+          self._disk_budget.add_consumer(parse_task, files['messages_mpf'])
+        parse_fmc = taskrun.FileModificationCondition(
+          [files['messages_mpf']], parse_outputs)
+        self._add_condition(parse_task, parse_cmd, parse_fmc, refined=True)
+    return stats
+
+  def _prepare_tasks(self):
+    """
+    This checks the variables and builds the configuration space and task
+    tables, once
     """
     # task created only once
     assert not self._created, "Task already created! Fail!"
@@ -671,71 +1144,466 @@ class Sweeper(object):
       y_values.append(n_var['short_name'])
     assert len(x_values) == len(set(x_values)), "Not unique names!"
     assert len(y_values) == len(set(y_values)), "Not unique short names!"
+    if self._profile:
+      self._report = BuildReport()
+    # build the configuration space and task tables once
+    with self._phase('space'):
+      self._space = ConfigSpace(self._variables)
+      self._create_task_tables()
+    # configurations of the design without the excluded ones
+    if self._design is not None:
+      self._active = self._create_design(*self._design)
+    if len(self._constraints) > 0 or len(self._exclusions) > 0:
+      valid = self._create_constraints()
+      assert sum(valid) > 0, 'every configuration is excluded'
+      if self._estimate is None:
+        print('Constraints: {0} of {1} configurations'.format(
+          sum(valid), len(valid)))
+      self._active = valid
+    # slice of the configurations of this shard
+    if self._shard is not None:
+      self._owned = self._create_shard_plan()
+    self._positions = self._create_positions()
+    if self._merge_shards is not None:
+      missing = [str(shard) for shard in range(self._merge_shards)
+                 if not os.path.isfile(self._shard_marker_file(shard))]
+      if self._estimate is not None:
+        self._estimate.set_missing_shards(missing)
+      elif len(missing) > 0:
+        self._error('shards {0} of {1} have not finished'.format(
+          ', '.join(missing), self._merge_shards))
+    # saturation of the loads
+    if self._adaptive_loads[0] is not None:
+      self._create_adaptive(*self._adaptive_loads)
+    # count compare variables (for the viewer)
+    for plot_type, filter_name in self._plots:
+      if plot_type == 'load-latency-compare':
+        self._comp_var_count += len(self._compare_variables())
+
+  def _create_design(self, design, samples, seed, baseline):
+    """
+    This returns the mask of the configurations without the load of the
+    design
+    """
+    widths = [len(var['values']) for var in self._variables[:-1]]
+    base = None
+    if baseline is not None:
+      names = [var['name'] for var in self._variables[:-1]]
+      for name in baseline:
+        assert name in names, 'Invalid baseline variable: {0}'.format(name)
+      base = []
+      for var in self._variables[:-1]:
+        if var['name'] not in baseline:
+          base.append(0)
+          continue
+        value = baseline[var['name']]
+        assert value in var['values'], \
+          'baseline value {0} not in the values of {1}: {2}'.format(
+            value, var['name'], var['values'])
+        base.append(var['values'].index(value))
+    active = designs.mask(design, widths, samples, seed, base)
+    if self._estimate is None:
+      print('Design {0}: {1} of {2} configurations'.format(
+        design, sum(active), len(active)))
+    return active
+
+  def _create_constraints(self):
+    """
+    This returns the mask of the configurations without the load that pass
+    the exclusion rules and the constraints
+    """
+    outer = self._variables[:-1]
+    widths = [len(var['values']) for var in outer]
+    keep = numpy.ones(widths, dtype=bool)
+    for rule in self._exclusions:
+      match = numpy.ones(widths, dtype=bool)
+      for name, values in rule.items():
+        dims = [dim for dim, var in enumerate(outer)
+                if name in (var['name'], var['short_name'])]
+        assert len(dims) == 1, 'Invalid rule variable: {0}'.format(name)
+        var = outer[dims[0]]
+        for value in values:
+          assert value in var['values'], \
+            'Invalid value of {0}: {1}'.format(name, value)
+        hit = numpy.array([value in values for value in var['values']])
+        shape = [1] * len(widths)
+        shape[dims[0]] = -1
+        match &= hit.reshape(shape)
+      keep &= ~match
+    keep = keep.ravel()
+    if self._active is not None:
+      keep &= numpy.frombuffer(self._active, dtype=numpy.uint8) == 1
+    if len(self._constraints) > 0:
+      outer_dims = self._space.dims(dont=self._load_name)
+      for pos in numpy.flatnonzero(keep).tolist():
+        config = self._space.config(outer_dims, self._outer_idx(pos))
+        keep[pos] = all(predicate(config) for predicate in self._constraints)
+    return bytearray(keep.astype(numpy.uint8).tobytes())
+
+  def _outer_idx(self, pos):
+    """
+    This returns the value indices of a configuration without the load given
+    its position in iteration order
+    """
+    nloads = len(self._load_variable['values'])
+    return self._space.index(pos * nloads)[:-1]
+
+  def _outer_pos(self, outer_idx):
+    """
+    This returns the position in iteration order of a configuration without
+    the load given its value indices
+    """
+    widths = [len(var['values']) for var in self._variables[:-1]]
+    return int(numpy.ravel_multi_index(tuple(outer_idx), widths))
+
+  def _group_values(self, cvar, idx):
+    """
+    This returns the value indices of the compare variable cvar of the
+    configurations of a group (value indices without the load and cvar) in
+    the design
+    """
+    values = range(len(cvar['values']))
+    if self._active is None:
+      return list(values)
+    pos = self._space.dim(cvar['name'])
+    idx = tuple(idx)
+    return [value for value in values if self._active[
+      self._outer_pos(idx[:pos] + (value,) + idx[pos:])] == 1]
+
+  def _shard_marker_file(self, shard):
+    count = self._merge_shards if self._shard is None else self._shard[1]
+    return os.path.join(self._out_dir,
+                        'shard_{0}of{1}.done'.format(shard, count))
+
+  def _create_shard_plan(self):
+    """
+    This loads (or creates) the plan splitting the configurations without the
+    load between the shards, and returns the mask of the ones of this shard.
+    The shards are balanced by the runtimes of the sims of previous sweeps
+    (sharded or not), every configuration costs the same without history.
+    """
+    count = self._shard[1]
+    histories = self._runtime_histories()
+    dims = self._space.dims()
+    nloads = len(self._load_variable['values'])
+
+    def cost(outer):
+      if not self._owns(outer):
+        return 0.0
+      total = 0.0
+      for flat in range(outer * nloads, (outer + 1) * nloads):
+        config = self._space.config(dims, self._space.index(flat))
+        name = 'sim_{0}'.format(self._sim_tasks.id(flat))
+        estimates = [history.estimate(name, 'sim', config)
+                     for history in histories]
+        estimates = [est for est in estimates if est is not None]
+        total += estimates[0] if len(estimates) > 0 else 1.0
+      return total
+
+    plan = ShardPlan(os.path.join(self._out_dir, self._shard_plan_file),
+                     count, self._space.size // nloads, self._sweep_key())
+    # a dry run doesn't write the plan
+    plan.load(cost, write=self._estimate is None)
+    owned = plan.owned(self._shard[0])
+    if self._estimate is None:
+      print('Shard {0}/{1}: {2} of {3} configurations'.format(
+        self._shard[0], count, sum(
+          1 for outer in range(len(owned))
+          if owned[outer] == 1 and self._owns(outer)), len(owned)))
+    return owned
+
+  def _sweep_key(self):
+    """
+    This returns a hash of what makes the configurations of the sweep: the
+    names and values of the variables, the design and the configurations
+    the constraints keep
+    """
+    key = hashlib.sha1()
+    for var in self._variables:
+      key.update(repr((var['name'], [str(value) for value in var['values']]))
+                 .encode('utf-8'))
+    key.update(repr(self._design).encode('utf-8'))
+    if self._active is not None:
+      key.update(bytes(self._active))
+    return key.hexdigest()
+
+  def _runtime_histories(self):
+    """
+    This loads the runtimes of the previous sweeps (sharded or not) in the
+    output directory
+    """
+    histories = []
+    pattern = os.path.join(self._out_dir, 'runtimes_shard*of*.json')
+    for filename in ([os.path.join(self._out_dir, 'runtimes.json')] +
+                     sorted(glob.glob(pattern))):
+      if os.path.isfile(filename):
+        histories.append(RuntimeHistory(filename))
+    return histories
+
+  def _create_positions(self):
+    """
+    This returns the positions in iteration order of the configurations
+    without the load in the design and the slice of this sweeper
+    """
+    count = self._space.size // len(self._load_variable['values'])
+    if self._active is None and self._owned is None:
+      return range(count)
+    keep = numpy.ones(count, dtype=bool)
+    for mask in (self._active, self._owned):
+      if mask is not None:
+        keep &= numpy.frombuffer(mask, dtype=numpy.uint8) == 1
+    return numpy.flatnonzero(keep).tolist()
+
+  def _owns(self, outer):
+    """
+    This returns True if the configuration without the load (by its position
+    in iteration order) is in the design and the slice of this sweeper
+    """
+    return ((self._active is None or self._active[outer] == 1) and
+            (self._owned is None or self._owned[outer] == 1))
 
+  def _create_adaptive(self, criterion, threshold, f_name):
+    """
+    This creates the saturation check of the loads on the rates of the sims
+    or the latency of an ssparse filter
+    """
+    loads = self._load_variable['values']
+    if criterion == 'rate':
+      self._adaptive = AdaptiveLoads(
+        loads, lambda flat: self._sim_tasks.files(flat)['rates_csv'],
+        criterion, threshold)
+      return
+    if f_name is None:
+      ssparse = [name for name in self._parsings
+                 if self._parsings[name]['parse_type'] == 'ssparse']
+      assert len(ssparse) > 0, 'the latency criterion needs an ssparse plot'
+      f_name = ssparse[0]
+    assert f_name in self._ssparse_tasks, \
+      'Invalid ssparse filter: {0}'.format(f_name)
+    table = self._ssparse_tasks[f_name]
+    self._adaptive_filter = f_name
+    self._adaptive = AdaptiveLoads(
+      loads, lambda flat: table.files(flat)['latency_csv'], criterion,
+      threshold, row=self._parsings[f_name]['latency_mode'].title())
+
+  def _observe_tasks(self, tm_var):
+    """
+    This loads the manifest and runtimes of the last sweep and lets them,
+    the command recorder, the disk budget and the shard marker watch the
+    tasks
+    """
+    if self._cmd_hash:
+      self._cmd_recorder = CommandRecorder()
+      tm_var.add_observer(self._cmd_recorder)
+    if self._incremental:
+      self._manifest = Manifest(os.path.join(self._out_dir,
+                                             self._manifest_file))
+      tm_var.add_observer(self._manifest)
+    if self._disk_budget is not None:
+      tm_var.add_observer(self._disk_budget)
+    if self._runtime_priorities:
+      self._runtimes = RuntimeHistory(os.path.join(self._out_dir,
+                                                   self._runtimes_file))
+      tm_var.add_observer(self._runtimes)
+    if self._shard is not None:
+      self._shard_marker = ShardMarker(self._shard_marker_file(
+        self._shard[0]))
+      tm_var.add_observer(self._shard_marker)
+
+  def _create_graph(self, tm_var, verbose):
+    """
+    This creates the sim, parsing and plot tasks of the current wave (all
+    configurations when not streaming)
+    """
+    # the shards generated the sims and parsings of the merge
+    merging = self._merge_shards is not None
     # sim
-    if self._sim:
-      print("Creating simulation tasks")
-      self._create_sim_tasks(tm_var)
+    if self._sim and not merging:
+      if verbose:
+        print("Creating simulation tasks")
+      with self._phase('sim'):
+        self._create_sim_tasks(tm_var)
     # parsings
-    if len(self._parsings) > 0:
+    parsings = [] if merging else list(self._parsings)
+    if len(parsings) > 0 and verbose:
       print("Creating parsing tasks")
-    for f_name in self._parsings:
+    group = self._parse_group()
+    if len(group) > 0 and not self._stream_messages and not merging:
+      with self._phase('parse [group]'):
+        self._create_group_parse_tasks(tm_var, group)
+    for f_name in parsings:
+      if f_name in group:
+        continue
       # ssparse
       if self._parsings[f_name]['parse_type'] == 'ssparse':
-        self._create_ssparse_tasks(tm_var, f_name)
+        with self._phase('ssparse [{0}]'.format(f_name)):
+          self._create_ssparse_tasks(tm_var, f_name)
       # transient
       elif self._parsings[f_name]['parse_type'] == 'transient':
-        self._create_tparse_tasks(tm_var, f_name)
+        with self._phase('tparse [{0}]'.format(f_name)):
+          self._create_tparse_tasks(tm_var, f_name)
       # none
       elif self._parsings[f_name]['parse_type'] == None:
         pass
       else:
         assert False
-    # plots
-    if len(self._plots) > 0:
+    if (self._disk_budget is not None and self._sim and
+        not self._stream_messages and not merging):
+      self._throttle_sims()
+    # plots, the plots over the loads are made by the merge of the shards
+    if len(self._plots) > 0 and verbose:
       print("Creating plotting tasks")
     for plot_type, filter_name in self._plots:
-      # none
-      if plot_type == 'load-rate':
-        self._create_loadrate_tasks(tm_var, filter_name)
-      # ssparse
-      if plot_type == 'load-percent-minimal':
-        self._create_loadpermin_tasks(tm_var, filter_name)
-      if plot_type == 'load-latency':
-        self._create_loadlat_tasks(tm_var, filter_name)
-      if plot_type == 'load-average-hops':
-        self._create_loadavehops_tasks(tm_var, filter_name)
-      if plot_type == 'load-rate-percent':
-        self._create_loadrateper_tasks(tm_var, filter_name)
-      if plot_type == 'load-latency-compare':
-        self._create_loadlatcomp_tasks(tm_var, filter_name)
-      if plot_type == 'latency-pdf':
-        self._create_latpdf_tasks(tm_var, filter_name)
-      if plot_type == 'latency-percentile':
-        self._create_latperc_tasks(tm_var, filter_name)
-      if plot_type == 'latency-cdf':
-        self._create_latcdf_tasks(tm_var, filter_name)
-      if plot_type == 'time-latency-scatter':
-        self._create_timelatscat_tasks(tm_var, filter_name)
-      # tran
-      if plot_type == 'time-percent-minimal':
-        self._create_timepermin_tasks(tm_var, filter_name)
-      if plot_type == 'time-average-hops':
-        self._create_timeavehops_tasks(tm_var, filter_name)
-      if plot_type == 'time-latency':
-        self._create_timelat_tasks(tm_var, filter_name)
-
-    # viewer
-    if  self._viewer != 'off':
-      print("Creating viewer")
-      self._create_viewer_task()
+      if self._shard is not None and plot_type.startswith('load-'):
+        continue
+      if merging and not plot_type.startswith('load-'):
+        continue
+      with self._phase('{0} [{1}]'.format(plot_type, filter_name)):
+        self._create_plot_tasks(tm_var, plot_type, filter_name)
+    if self._runtimes is not None:
+      self._set_priorities()
+    if self._graph is not None:
+      self._graph.freeze()
+
+  def _set_priorities(self):
+    """
+    This replaces the priorities of the tasks created since the last call
+    by their estimated runtimes, longest first: the sims get the lower half
+    of the priority levels of the task manager (0 to 7 of 16), the plots the
+    middle level and the parsings the upper half, so the parsings and plots
+    still run before new sims. Nothing changes without any history.
+    """
+    middle = self._priority_levels // 2
+    stages = [(['sim'], 0, middle - 1),
+              (['parse', 'tparse'], middle + 1, self._priority_levels - 1)]
+    levels = {}
+    known = False
+    for task_types, low, high in stages:
+      tasks = [(task, task_type, config)
+               for task, task_type, config in self._prioritize
+               if task_type in task_types]
+      estimates = [self._runtimes.estimate(task.name, task_type, config)
+                   for task, task_type, config in tasks]
+      known = known or any(est is not None for est in estimates)
+      for (task, _, _), level in zip(
+          tasks, RuntimeHistory.levels(estimates, low, high)):
+        levels[task.name] = level
+    if known:
+      for task, task_type, config in self._prioritize:
+        task.priority = levels.get(task.name, middle)
+    self._prioritize = []
+
+  def _throttle_sims(self):
+    """
+    This makes each sim wait for the parsings of the sim a window of sims
+    before it, so the message logs on disk stay within the disk budget. The
+    window comes from the size of the logs of previous sweeps (or
+    disk_log_size), one of them is needed: a guess would either serialize
+    the sims or overrun the budget. A dry run without them assumes a window
+    of one sim.
+    """
+    pattern = os.path.join(
+      self._out_dir, self._data_folder,
+      'messages_*.mpf{0}'.format(fanout.CODECS[self._codecs['messages']]))
+    window = self._disk_budget.window(pattern)
+    if window is None:
+      if self._estimate is None:
+        self._error('the size of the message logs is unknown (no previous '
+                    'sweep), set disk_log_size')
+      window = 1
+    tables = (list(self._ssparse_tasks.values()) +
+              list(self._tparse_tasks.values()))
+    flats = []
+    for flat, idx in self._sim_order():
+      sim_task = self._sim_tasks.task(flat)
+      if sim_task is not None and len(flats) >= window:
+        # a grouped parsing is in every table
+        consumers = {}
+        for table in tables:
+          consumer = table.task(flats[-window])
+          if consumer is not None:
+            consumers[id(consumer)] = consumer
+        for consumer in consumers.values():
+          self._add_dependency(sim_task, consumer)
+      flats.append(flat)
+
+  def _sim_order(self):
+    """
+    This returns the configurations in the creation order of the sims. With
+    adaptive loads, the lowest loads of every configuration come first, so
+    the stats of a load are known (or near) when its higher loads are
+    dispatched.
+    """
+    if self._adaptive is None:
+      return self._iter_configs()
+    nloads = len(self._load_variable['values'])
+    return sorted(self._iter_configs(), key=lambda config: config[0] % nloads)
 
-    # all cmds
-    if len(self._all_cmds) != 0:
-      cmd_f = os.path.join(self._out_dir, self._all_cmds_file)
-      with open(cmd_f, 'w') as fd_cmd:
-        fd_cmd.write('\n'.join(str(line) for line in self._all_cmds))
+  def _parse_group(self):
+    """
+    This returns the parsings (ssparse and transient) read in one pass over
+    the messages (none unless group_parsings and more than one parsing share
+    the messages). When streaming the messages, the sims run every parsing.
+    Messages in a codec the parsers can't read are always decoded once for
+    every parsing.
+    """
+    single = self._stream_messages or self._messages_piped()
+    if not self._group_parsings and not single:
+      return []
+    group = [f_name for f_name in self._parsings
+             if self._parsings[f_name]['parse_type'] in ('ssparse',
+                                                         'transient')]
+    return group if len(group) > 1 or single else []
+
+  def _messages_piped(self):
+    """
+    This returns True if the messages codec is only supported by fanout (the
+    sims write and the parsings read the messages through a pipe)
+    """
+    return self._codecs['messages'] not in ['none', 'gz']
 
+  def _create_plot_tasks(self, tm_var, plot_type, filter_name):
+    """
+    This creates the tasks of one plot
+    """
+    # none
+    if plot_type == 'load-rate':
+      self._create_loadrate_tasks(tm_var, filter_name)
+    # ssparse
+    if plot_type == 'load-percent-minimal':
+      self._create_loadpermin_tasks(tm_var, filter_name)
+    if plot_type == 'load-latency':
+      self._create_loadlat_tasks(tm_var, filter_name)
+    if plot_type == 'load-average-hops':
+      self._create_loadavehops_tasks(tm_var, filter_name)
+    if plot_type == 'load-rate-percent':
+      self._create_loadrateper_tasks(tm_var, filter_name)
+    if plot_type == 'load-latency-compare':
+      self._create_loadlatcomp_tasks(tm_var, filter_name)
+    if plot_type == 'latency-pdf':
+      self._create_latpdf_tasks(tm_var, filter_name)
+    if plot_type == 'latency-percentile':
+      self._create_latperc_tasks(tm_var, filter_name)
+    if plot_type == 'latency-cdf':
+      self._create_latcdf_tasks(tm_var, filter_name)
+    if plot_type == 'time-latency-scatter':
+      self._create_timelatscat_tasks(tm_var, filter_name)
+    # tran
+    if plot_type == 'time-percent-minimal':
+      self._create_timepermin_tasks(tm_var, filter_name)
+    if plot_type == 'time-average-hops':
+      self._create_timeavehops_tasks(tm_var, filter_name)
+    if plot_type == 'time-latency':
+      self._create_timelat_tasks(tm_var, filter_name)
+
+  def _write_report(self):
+    if self._report is not None and self._profile_json:
+      report_f = os.path.join(self._out_dir, self._report_file)
+      self._report.write(report_f)
+    if self._graph is not None:
+      self._graph.write(os.path.join(self._out_dir, self._graph_file))
+
+  def _write_plot_cmds(self):
     if len(self._plot_cmds) != 0:
       cmd_f2 = os.path.join(self._out_dir, self._plot_cmds_file)
       with open(cmd_f2, 'w') as fd_cmd2:
@@ -745,133 +1613,514 @@ class Sweeper(object):
       st = os.stat(cmd_f2)
       os.chmod(cmd_f2, st.st_mode | stat.S_IEXEC)
 
+  def _create_task_tables(self):
+    """
+    This creates the tables mapping each configuration to its sim and parse
+    ids, files, and tasks
+    """
+    size = self._space.size
+    # the waves only hold their configurations
+    sparse = self._sparse_tables
+    self._sim_tasks = TaskTable(size, self._make_flat_id, self._get_sim_files,
+                                sparse)
+    for f_name in self._parsings:
+      id_func = functools.partial(self._make_flat_id, f_name=f_name)
+      if self._parsings[f_name]['parse_type'] == 'ssparse':
+        self._ssparse_tasks[f_name] = TaskTable(size, id_func,
+                                                self._get_ssparse_files,
+                                                sparse)
+      elif self._parsings[f_name]['parse_type'] == 'transient':
+        self._tparse_tasks[f_name] = TaskTable(size, id_func,
+                                               self._get_tparse_files, sparse)
+
+  def _task_tables(self):
+    """
+    This returns all the task tables
+    """
+    return ([self._sim_tasks] + list(self._ssparse_tasks.values()) +
+            list(self._tparse_tasks.values()))
+
+  def _compare_variables(self):
+    """
+    This returns the variables compared in load-latency-compare plots
+    """
+    return [cvar for cvar in self._variables
+            if (cvar['name'] != self._load_name and cvar['compare']
+                and len(cvar['values']) > 1)]
+
+  def _iter_configs(self):
+    """
+    This yields the flat index and value indices of every full configuration
+    of the current wave
+    """
+    if self._wave is None:
+      nloads = len(self._load_variable['values'])
+      for outer in self._positions:
+        for flat in range(outer * nloads, (outer + 1) * nloads):
+          yield flat, self._space.index(flat)
+    else:
+      outer_dims = self._space.dims(dont=self._load_name)
+      load_dims = self._space.dims(do_vars=self._load_name)
+      for outer_idx in self._wave:
+        for flat in self._space.select(outer_dims, outer_idx, load_dims):
+          yield int(flat), self._space.index(flat)
+
+  def _iter_outer(self):
+    """
+    This yields the value indices of the configurations without the load of
+    the current wave
+    """
+    if self._wave is None:
+      return (self._outer_idx(pos) for pos in self._positions)
+    return iter(self._wave)
+
+  def _iter_groups(self, cvar):
+    """
+    This yields the value indices of the configurations without the load and
+    the compare variable cvar that have a configuration in the design. When
+    streaming, a group is yielded in the wave of its last configuration.
+    """
+    dims = self._space.dims(dont=[self._load_name, cvar['name']])
+    if self._wave is None:
+      for idx in self._space.iterate(dims):
+        if len(self._group_values(cvar, idx)) > 0:
+          yield idx
+    else:
+      pos = self._space.dim(cvar['name'])
+      for outer_idx in self._wave:
+        idx = outer_idx[:pos] + outer_idx[pos + 1:]
+        if outer_idx[pos] == self._group_values(cvar, idx)[-1]:
+          yield idx
+
+  def _create_task(self, tm_var, name, cmd, console_out, task_type, config,
+                   stale=False):
+    """
+    This creates a task with the user's task creation function. When
+    incremental, the task is not created (None is returned) if it finished in
+    a previous sweep with the same command and its inputs are not stale.
+
+    Args:
+      tm_var       : task manager
+      name         : name of the task
+      cmd          : command of the task
+      console_out  : file for the console output (or None)
+      task_type    : type of task (sim, parse, tparse, or plot name)
+      config       : config record of the task
+      stale        : True if a task generating an input was created
+    """
+    if self._manifest is not None:
+      if not stale and self._manifest.current(name, cmd):
+        return None
+      self._manifest.add(name, cmd)
+    if (self._adaptive is not None and task_type in LOAD_PLOTS and
+        cmd.startswith('ssplot ')):
+      # the curves of a truncated load sweep have gaps
+      cmd = load_plots.command(cmd)
+    if self._plot_server is not None and cmd.startswith('ssplot '):
+      cmd = self._plot_server.command(cmd)
+    if self._report is not None:
+      self._report.add_task(task_type)
+    if self._estimate is not None:
+      task = self._estimate.create_task(name, task_type, config, console_out)
+    else:
+      task = self._create_task_func(tm_var, name, cmd, console_out,
+                                    task_type, config)
+    resources = self._resources.get(task_type, self._resources['plot'])
+    if resources is not None:
+      if callable(resources):
+        resources = resources(config)
+      merged = dict(task.resources)
+      merged.update(resources)
+      task.resources = merged
+    if self._runtimes is not None:
+      self._runtimes.add(task, task_type, config)
+      self._prioritize.append((task, task_type, config))
+    if self._graph is not None:
+      self._graph.add_task(task, cmd, console_out, task_type)
+    return task
+
+  def _add_dependency(self, task, dependency):
+    """
+    This adds a dependency to a task if the dependency task was created
+
+    Args:
+      task         : task to add the dependency to
+      dependency   : task (or None) that must complete first
+    """
+    if dependency is not None:
+      # the disk budget and the adaptive loads may add the same dependency
+      if dependency in task.get_dependencies():
+        return
+      if self._report is not None:
+        self._report.add_edge()
+      if self._graph is not None:
+        self._graph.add_dependency(task, dependency)
+      task.add_dependency(dependency)
+
+  def _add_condition(self, task, cmd, condition, flat=None, refined=False):
+    """
+    This adds a file modification condition to a task. With cmd_hash, the
+    task also runs when its command changed since its outputs were generated.
+    With adaptive loads, the task of a configuration is cancelled past
+    saturation and a task over the loads ignores the cancelled inputs.
+
+    Args:
+      task         : task to add the condition to
+      cmd          : command generating the outputs
+      condition    : FileModificationCondition of the task
+      flat         : flat index of the configuration of the task (None for
+                     a task over the loads)
+      refined      : True for a task at a refined load (neither cancelled nor
+                     over the loads)
+    """
+    if self._manifest is not None:
+      self._manifest.add_outputs(task.name, condition.outputs)
+    if self._graph is not None:
+      self._graph.add_files(task, condition.inputs, condition.outputs)
+    if self._disk_budget is not None:
+      condition = self._disk_budget.condition(condition)
+    if self._adaptive is not None and flat is None and not refined:
+      condition = self._adaptive.gaps(condition)
+    if self._cmd_recorder is not None:
+      condition = CommandCondition(condition, cmd)
+      self._cmd_recorder.add(task, condition)
+      if self._graph is not None:
+        self._graph.add_hash(task, condition.hash_file, condition.cmd_hash)
+    if self._adaptive is not None and flat is not None:
+      condition = self._adaptive.condition(flat, condition)
+    task.add_condition(condition)
+
+  def _phase(self, name):
+    """
+    This returns a context measuring a phase of the graph construction
+    """
+    if self._report is None:
+      return contextlib.nullcontext()
+    return self._report.phase(name)
+
   # ===================================================================
   def _create_sim_tasks(self, tm_var):
+    group = self._parse_group()
     # create config
-    for sim_config in self._dim_iter():
-      # make id & name
-      id_task = self._make_id(sim_config)
-      files = self._get_sim_files(id_task)
-      sim_name = 'sim_{0}'.format(id_task)
-      # sim command
-      sim_cmd = (
-        '{0} {1} '
-        '/simulator/info_log/file=string={2} '
-        '/workload/message_log/file=string={3} '
-        '/workload/applications/0/rate_log/file=string={4} '
-        '/network/channel_log/file=string={5}'
-      ).format(
-        self._supersim_path,
-        self._settings_path,
-        files['info_csv'],
-        files['messages_mpf'],
-        files['rates_csv'],
-        files['channels_csv'])
-      #loop through each variable commands to add
-      for var in sim_config:
-        tmp_cmd = var['command'](var['value'], sim_config)
-        cmd = self._cmd_clean(tmp_cmd)
-        sim_cmd += cmd
-      self._all_cmds.append(sim_cmd)
-      # sim task
-      sim_task = self._create_task_func(
-        tm_var, sim_name, sim_cmd, files['simout_log'], 'sim', sim_config)
-      sim_task.priority = 0
-      sim_task.add_condition(taskrun.FileModificationCondition(
-        [], [files['info_csv'], files['messages_mpf'], files['rates_csv'],
-             files['channels_csv']]))
-      self._sim_tasks[id_task] = sim_task
+    dims = self._space.dims()
+    for flat, idx in self._sim_order():
+      sim_config = self._space.config(dims, idx)
+      # the sim feeds every parsing when streaming
+      consumers, parse_outputs = [], []
+      if self._stream_messages:
+        consumers, parse_outputs = self._parse_consumers(flat, group)
+      sim_task = self._create_sim_task(
+        tm_var, self._sim_tasks.id(flat), self._sim_tasks.files(flat),
+        sim_config, consumers, parse_outputs, flat)
+      if sim_task is None:
+        continue
+      self._sim_tasks.set_task(flat, sim_task)
+      if self._stream_messages:
+        self._set_parse_tasks(flat, group, sim_task)
+
+  def _create_sim_task(self, tm_var, id_task, files, sim_config, consumers,
+                       parse_outputs, flat=None):
+    """
+    This creates the sim task of a configuration (None if not created)
+
+    Args:
+      tm_var        : task manager
+      id_task       : id of the sim
+      files         : sim files of the configuration
+      sim_config    : config of the sim (variable dicts)
+      consumers     : parse commands fed by the sim when streaming
+      parse_outputs : output files of the consumers
+      flat          : flat index of the configuration (None for a sim at a
+                      refined load)
+    """
+    sim_name = 'sim_{0}'.format(id_task)
+    # the message log is streamed through a named pipe
+    messages = files['messages_mpf']
+    if self._stream_messages or self._messages_piped():
+      messages = fanout.FIFO
+    # sim command
+    sim_cmd, overrides = self._sim_cmd(files, messages, sim_config)
+    # task command
+    sim_task_cmd = sim_cmd
+    sim_outputs = [files['info_csv'], files['messages_mpf'],
+                   files['rates_csv'], files['channels_csv']]
+    if self._stream_messages or self._messages_piped():
+      # the log is kept (with the messages codec) if asked
+      keep = files['messages_mpf']
+      if self._stream_messages:
+        sim_outputs.extend(parse_outputs)
+        if not self._keep_messages:
+          keep = None
+          sim_outputs.remove(files['messages_mpf'])
+      else:
+        consumers = []
+      sim_task_cmd = fanout.command(None, consumers, producer=sim_cmd,
+                                    keep=keep)
+    sim_hash_cmd = sim_task_cmd
+    self._all_cmds.append(sim_task_cmd)
+    cached = None
+    if self._sim_cache is not None:
+      # fetch from or store to the sim cache
+      sim_key = self._sim_cache.key(self._supersim_path,
+                                    self._settings_path, overrides,
+                                    sorted(self._codecs.items()))
+      result_files = [files['info_csv'], files['messages_mpf'],
+                      files['rates_csv'], files['channels_csv']]
+      sim_task_cmd = self._sim_cache.command(sim_task_cmd, sim_key,
+                                             result_files)
+      if self._estimate is not None:
+        cached = self._sim_cache.cached(sim_key)
+    # sim task
+    sim_task = self._create_task(
+      tm_var, sim_name, sim_task_cmd, files['simout_log'], 'sim',
+      sim_config)
+    if sim_task is None:
+      return None
+    if cached is not None:
+      self._estimate.add_cached(sim_task, result_files, cached)
+    if self._sim_cache is not None and self._runtimes is not None:
+      # a fetch from the cache isn't the runtime of the sim
+      self._runtimes.set_served(
+        sim_task, lambda: self._sim_cache.cached(sim_key) is not None)
+    sim_task.priority = 0
+    sim_fmc = taskrun.FileModificationCondition([], sim_outputs)
+    self._add_condition(sim_task, sim_hash_cmd, sim_fmc, flat,
+                        refined=flat is None)
+    if self._disk_budget is not None:
+      self._disk_budget.add_producer(sim_task, files['messages_mpf'])
+    return sim_task
+
+  def _sim_cmd(self, files, messages, sim_config):
+    """
+    This creates the supersim command of a configuration and returns it with
+    its settings overrides
+
+    Args:
+      files        : sim files of the configuration
+      messages     : message log file (or FIFO)
+      sim_config   : config of the sim (variable dicts)
+    """
+    sim_cmd = (
+      '{0} {1} '
+      '/simulator/info_log/file=string={2} '
+      '/workload/message_log/file=string={3} '
+      '/workload/applications/0/rate_log/file=string={4} '
+      '/network/channel_log/file=string={5}'
+    ).format(
+      self._supersim_path,
+      self._settings_path,
+      files['info_csv'],
+      messages,
+      files['rates_csv'],
+      files['channels_csv'])
+    #loop through each variable commands to add
+    overrides = ''
+    for var in sim_config:
+      tmp_cmd = var['command'](var['value'], sim_config)
+      overrides += self._cmd_clean(tmp_cmd)
+    return sim_cmd + overrides, overrides
 
   # ssparse
   def _create_ssparse_tasks(self, tm_var, f_name):
+    ssparse_table = self._ssparse_tasks[f_name]
     # loop through all variables
-    for ssparse_config in self._dim_iter():
+    dims = self._space.dims()
+    for flat, idx in self._iter_configs():
+      ssparse_config = self._space.config(dims, idx)
       # make id and name
-      id_ssparse = self._make_id(ssparse_config, f_name=f_name)
-      id_sim = self._make_id(ssparse_config)
-      ssparse_files = self._get_ssparse_files(id_ssparse)
-      sim_files = self._get_sim_files(id_sim)
+      id_ssparse = ssparse_table.id(flat)
+      ssparse_files = ssparse_table.files(flat)
+      sim_files = self._sim_tasks.files(flat)
       ssparse_name = 'parse_{0}'.format(id_ssparse)
 
-      latency_mode = self._parsings[f_name]['latency_mode']
-      header_latency = self._parsings[f_name]['header_latency']
-      filters =  self._parsings[f_name]['filters']
-
       # parse cmd
-      ssparse_cmd = '{0} -{1} {2} -l {3} -c {4} {5}'.format(
-        self._ssparse_path,
-        latency_mode[:1].lower(),
-        ssparse_files['samples_csv'],
-        ssparse_files['latency_csv'],
-        ssparse_files['hops_csv'],
-        sim_files['messages_mpf'])
-
-      if header_latency:
-        ssparse_cmd += ' --headerlatency'
-      if self._latency_scalar != None:
-        ssparse_cmd += ' -s {0}'.format(self._latency_scalar)
-      # parse filters
-      if filters != None:
-        for filter in filters:
-          ssparse_cmd += ' -f {0}'.format(filter)
-
+      ssparse_cmd = self._ssparse_cmd(f_name, ssparse_files,
+                                      sim_files['messages_mpf'])
       self._all_cmds.append(ssparse_cmd)
       # parse task
-      ssparse_task = self._create_task_func(
-        tm_var, ssparse_name, ssparse_cmd, None, 'parse', ssparse_config)
+      ssparse_task = self._create_task(
+        tm_var, ssparse_name, ssparse_cmd, None, 'parse', ssparse_config,
+        self._sim_tasks.created([flat]))
+      if ssparse_task is None:
+        continue
       ssparse_task.priority = 1
-      ssparse_task.add_dependency(self._sim_tasks[id_sim])
-      ssparse_task.add_condition(taskrun.FileModificationCondition(
+      self._add_dependency(ssparse_task, self._sim_tasks.task(flat))
+      if self._disk_budget is not None:
+        self._disk_budget.add_consumer(ssparse_task, sim_files['messages_mpf'])
+      ssparse_fmc = taskrun.FileModificationCondition(
         [sim_files['messages_mpf']],
         [ssparse_files['samples_csv'], ssparse_files['latency_csv'],
-         ssparse_files['hops_csv']]))
-      self._ssparse_tasks[id_ssparse] = ssparse_task
+         ssparse_files['hops_csv']])
+      self._add_condition(ssparse_task, ssparse_cmd, ssparse_fmc, flat)
+      ssparse_table.set_task(flat, ssparse_task)
+
+  def _ssparse_cmd(self, f_name, ssparse_files, messages):
+    """
+    This creates the ssparse command of a filter
+
+    Args:
+      f_name        : filter name
+      ssparse_files : ssparse files of the configuration
+      messages      : message log to parse
+    """
+    latency_mode = self._parsings[f_name]['latency_mode']
+    header_latency = self._parsings[f_name]['header_latency']
+    filters =  self._parsings[f_name]['filters']
+    ssparse_cmd = '{0} -{1} {2} -l {3} -c {4} {5}'.format(
+      self._ssparse_path,
+      latency_mode[:1].lower(),
+      ssparse_files['samples_csv'],
+      ssparse_files['latency_csv'],
+      ssparse_files['hops_csv'],
+      messages)
+
+    if header_latency:
+      ssparse_cmd += ' --headerlatency'
+    if self._latency_scalar != None:
+      ssparse_cmd += ' -s {0}'.format(self._latency_scalar)
+    # parse filters
+    if filters != None:
+      for filter in filters:
+        ssparse_cmd += ' -f {0}'.format(filter)
+    return ssparse_cmd
+
+  # grouped parse (every ssparse and transient filter in one pass over the
+  # messages)
+  def _create_group_parse_tasks(self, tm_var, f_names):
+    dims = self._space.dims()
+    for flat, idx in self._iter_configs():
+      parse_config = self._space.config(dims, idx)
+      id_task = self._sim_tasks.id(flat)
+      sim_files = self._sim_tasks.files(flat)
+      parse_name = 'parse_{0}'.format(id_task)
+
+      # the messages are read once and streamed to each parser
+      consumers, outputs = self._parse_consumers(flat, f_names)
+      parse_cmd = fanout.command(sim_files['messages_mpf'], consumers)
+      self._all_cmds.append(parse_cmd)
+      # parse task
+      parse_task = self._create_task(
+        tm_var, parse_name, parse_cmd, None, 'parse', parse_config,
+        self._sim_tasks.created([flat]))
+      if parse_task is None:
+        continue
+      parse_task.priority = 1
+      self._add_dependency(parse_task, self._sim_tasks.task(flat))
+      if self._disk_budget is not None:
+        self._disk_budget.add_consumer(parse_task, sim_files['messages_mpf'])
+      parse_fmc = taskrun.FileModificationCondition(
+        [sim_files['messages_mpf']], outputs)
+      self._add_condition(parse_task, parse_cmd, parse_fmc, flat)
+      self._set_parse_tasks(flat, f_names, parse_task)
+
+  def _parse_consumers(self, flat, f_names):
+    """
+    This returns the parse commands of a configuration reading the messages
+    from /dev/stdin and their output files
+
+    Args:
+      flat         : flat index of the configuration
+      f_names      : ssparse and transient filter names
+    """
+    consumers = []
+    outputs = []
+    for f_name in f_names:
+      if self._parsings[f_name]['parse_type'] == 'ssparse':
+        ssparse_files = self._ssparse_tasks[f_name].files(flat)
+        consumers.append(self._ssparse_cmd(f_name, ssparse_files,
+                                           '/dev/stdin'))
+        outputs.extend([ssparse_files['samples_csv'],
+                        ssparse_files['latency_csv'],
+                        ssparse_files['hops_csv']])
+      else:
+        tparse_files = self._tparse_tasks[f_name].files(flat)
+        consumers.append(self._tparse_cmd(f_name, tparse_files,
+                                          '/dev/stdin'))
+        outputs.append(tparse_files['trans_csv'])
+    return consumers, outputs
+
+  def _set_parse_tasks(self, flat, f_names, task):
+    """
+    This sets the task generating the parse outputs of a configuration
+    """
+    for f_name in f_names:
+      if self._parsings[f_name]['parse_type'] == 'ssparse':
+        self._ssparse_tasks[f_name].set_task(flat, task)
+      else:
+        self._tparse_tasks[f_name].set_task(flat, task)
 
   # transient parse
   def _create_tparse_tasks(self, tm_var, f_name):
+    tparse_table = self._tparse_tasks[f_name]
     # loop through all variables
-    for tparse_config in self._dim_iter():
+    dims = self._space.dims()
+    for flat, idx in self._iter_configs():
+      tparse_config = self._space.config(dims, idx)
       # make id and name
-      id_tparse = self._make_id(tparse_config, f_name=f_name)
-      id_sim = self._make_id(tparse_config)
-      tparse_files = self._get_tparse_files(id_tparse)
-      sim_files = self._get_sim_files(id_sim)
+      id_tparse = tparse_table.id(flat)
+      tparse_files = tparse_table.files(flat)
+      sim_files = self._sim_tasks.files(flat)
       tparse_name = 'tparse_{0}'.format(id_tparse)
 
       # tparse cmd
-      tparse_cmd = '{0} {1} {2} {3}'.format(
-        self._transient_path,
-        self._ssparse_path,
-        sim_files['messages_mpf'],
-        tparse_files['trans_csv'])
-
-      filters =  self._parsings[f_name]['filters']
-      extra_args = self._parsings[f_name]['transient']
-      if self._latency_scalar != None:
-        tparse_cmd += ' -s {0}'.format(self._latency_scalar)
-      if extra_args != None:
-        tparse_cmd += ' {0} '.format(extra_args)
-      if filters != None:
-        for filter in filters:
-          tparse_cmd += ' -f {0}'.format(filter)
-
+      tparse_cmd = self._tparse_cmd(f_name, tparse_files,
+                                    sim_files['messages_mpf'])
       self._all_cmds.append(tparse_cmd)
       # tparse task
-      tparse_task = self._create_task_func(
-        tm_var, tparse_name, tparse_cmd, None, 'tparse', tparse_config)
+      tparse_task = self._create_task(
+        tm_var, tparse_name, tparse_cmd, None, 'tparse', tparse_config,
+        self._sim_tasks.created([flat]))
+      if tparse_task is None:
+        continue
       tparse_task.priority = 1
-      tparse_task.add_dependency(self._sim_tasks[id_sim])
-      tparse_task.add_condition(taskrun.FileModificationCondition(
-        [sim_files['messages_mpf']],[tparse_files['trans_csv']]))
-      self._tparse_tasks[id_tparse] = tparse_task
+      self._add_dependency(tparse_task, self._sim_tasks.task(flat))
+      if self._disk_budget is not None:
+        self._disk_budget.add_consumer(tparse_task, sim_files['messages_mpf'])
+      tparse_fmc = taskrun.FileModificationCondition(
+        [sim_files['messages_mpf']],[tparse_files['trans_csv']])
+      self._add_condition(tparse_task, tparse_cmd, tparse_fmc, flat)
+      tparse_table.set_task(flat, tparse_task)
+
+  def _tparse_cmd(self, f_name, tparse_files, messages):
+    """
+    This creates the transient parse command of a filter
+
+    Args:
+      f_name        : filter name
+      tparse_files  : tparse files of the configuration
+      messages      : message log to parse
+    """
+    filters =  self._parsings[f_name]['filters']
+    extra_args = self._parsings[f_name]['transient']
+    tparse_cmd = '{0} {1} {2} {3}'.format(
+      self._transient_path,
+      self._ssparse_path,
+      messages,
+      tparse_files['trans_csv'])
+
+    if self._latency_scalar != None:
+      tparse_cmd += ' -s {0}'.format(self._latency_scalar)
+    if extra_args != None:
+      tparse_cmd += ' {0} '.format(extra_args)
+    if filters != None:
+      for filter in filters:
+        tparse_cmd += ' -f {0}'.format(filter)
+    return tparse_cmd
   # ===================================================================
   # load-percent-minimal
   def _create_loadpermin_tasks(self, tm_var, f_name):
+    ssparse_table = self._ssparse_tasks[f_name]
     # config with no load
-    for loadpermin_config in self._dim_iter(dont=self._load_name):
-      id_task1 = self._make_id(loadpermin_config, f_name = f_name)
+    dims = self._space.dims(dont=self._load_name)
+    load_dims = self._space.dims(do_vars=self._load_name)
+    for idx in self._iter_outer():
+      loadpermin_config = self._space.config(dims, idx)
+      id_task1 = self._make_id(dims, idx, f_name=f_name)
       loadpermin_name = 'loadpermin_{0}'.format(id_task1)
       files1 = self._get_plot_files(id_task1)
+      # ssparse configs of every load
+      flats = self._space.select(dims, idx, load_dims)
+      files_ssparse = [ssparse_table.files(flat) for flat in flats]
       # loadpermin cmd
       loadpermin_cmd = ('ssplot load-percent-minimal {0} {1} {2} {3} '
                    .format(files1['loadpermin_png'],
@@ -885,40 +2134,42 @@ class Sweeper(object):
         loadpermin_cmd += (' --{0} "{1}"'.format(
           key, plot_info['settings'][key]))
       # add to loadpermin_cmd the stats files
-      for loads in  self._dim_iter(do_vars=self._load_name):
-        id_ssparse = self._make_id(loadpermin_config, f_name = f_name,
-                                   extra=self._make_id(loads))
-        files_ssparse = self._get_ssparse_files(id_ssparse)
-        loadpermin_cmd += ' {0}'.format(files_ssparse['hops_csv'])
+      for files2 in files_ssparse:
+        loadpermin_cmd += ' {0}'.format(files2['hops_csv'])
 
       self._all_cmds.append(loadpermin_cmd)
       # create task
-      loadpermin_task = self._create_task_func(
+      loadpermin_task = self._create_task(
         tm_var, loadpermin_name, loadpermin_cmd, None,
-        'loadpermin', loadpermin_config)
+        'loadpermin', loadpermin_config,
+        ssparse_table.created(flats))
+      if loadpermin_task is None:
+        continue
       loadpermin_task.priority = 1
       # add dependencies
-      for loads in  self._dim_iter(do_vars=self._load_name):
-        id_task3 = self._make_id(loadpermin_config, extra=self._make_id(loads),
-                                 f_name = f_name)
-        loadpermin_task.add_dependency(self._ssparse_tasks[id_task3])
+      for flat in flats:
+        self._add_dependency(loadpermin_task, ssparse_table.task(flat))
       loadpermin_fmc = taskrun.FileModificationCondition(
         [], [files1['loadpermin_png']])
       # add input files to task
-      for loads in self._dim_iter(do_vars=self._load_name):
-        id_task4 = self._make_id(loadpermin_config, extra=self._make_id(loads),
-                                 f_name = f_name)
-        files3 = self._get_ssparse_files(id_task4)
+      for files3 in files_ssparse:
         loadpermin_fmc.add_input(files3['hops_csv'])
-      loadpermin_task.add_condition(loadpermin_fmc)
+      self._add_condition(loadpermin_task, loadpermin_cmd, loadpermin_fmc)
 
   # load-latency
   def _create_loadlat_tasks(self, tm_var, f_name):
+    ssparse_table = self._ssparse_tasks[f_name]
     # config with no load
-    for loadlat_config in self._dim_iter(dont=self._load_name):
-      id_task1 = self._make_id(loadlat_config, f_name=f_name)
+    dims = self._space.dims(dont=self._load_name)
+    load_dims = self._space.dims(do_vars=self._load_name)
+    for idx in self._iter_outer():
+      loadlat_config = self._space.config(dims, idx)
+      id_task1 = self._make_id(dims, idx, f_name=f_name)
       loadlat_name = 'loadlat_{0}'.format(id_task1)
       files1 = self._get_plot_files(id_task1)
+      # ssparse configs of every load
+      flats = self._space.select(dims, idx, load_dims)
+      files_ssparse = [ssparse_table.files(flat) for flat in flats]
       # loadlat cmd
       loadlat_cmd = ('ssplot load-latency --row {0} {1} {2} {3} {4} '
                    .format(self._parsings[f_name]['latency_mode'].title(),
@@ -937,40 +2188,41 @@ class Sweeper(object):
         loadlat_cmd += (' --{0} "{1}"'.format(
           key,plot_info['settings'][key]))
       # add stats files
-      for loads in  self._dim_iter(do_vars=self._load_name):
-        id_task2 = self._make_id(loadlat_config, extra=self._make_id(loads),
-                                 f_name=f_name)
-        files2 = self._get_ssparse_files(id_task2)
+      for files2 in files_ssparse:
         loadlat_cmd += ' {0}'.format(files2['latency_csv'])
       self._all_cmds.append(loadlat_cmd)
       # create task
-      loadlat_task = self._create_task_func(
-        tm_var, loadlat_name, loadlat_cmd, None, 'loadlat', loadlat_config)
+      loadlat_task = self._create_task(
+        tm_var, loadlat_name, loadlat_cmd, None, 'loadlat', loadlat_config,
+        ssparse_table.created(flats))
+      if loadlat_task is None:
+        continue
       loadlat_task.priority = 1
       # add dependencies
-      for loads in  self._dim_iter(do_vars=self._load_name):
-        id_task3 = self._make_id(loadlat_config, extra=self._make_id(loads),
-                                 f_name=f_name)
-        loadlat_task.add_dependency(self._ssparse_tasks[id_task3])
+      for flat in flats:
+        self._add_dependency(loadlat_task, ssparse_table.task(flat))
       loadlat_fmc = taskrun.FileModificationCondition([],
                                                       [files1['loadlat_png']])
       # add input files to task
-      for loads in self._dim_iter(do_vars=self._load_name):
-        id_task4 = self._make_id(loadlat_config, extra=self._make_id(loads),
-                                 f_name=f_name)
-        files3 = self._get_ssparse_files(id_task4)
+      for files3 in files_ssparse:
         loadlat_fmc.add_input(files3['latency_csv'])
-      loadlat_task.add_condition(loadlat_fmc)
+      self._add_condition(loadlat_task, loadlat_cmd, loadlat_fmc)
 
   # load-rate-percent
   def _create_loadrateper_tasks(self, tm_var, f_name):
+    ssparse_table = self._ssparse_tasks[f_name]
     # config with no load
-    for loadrateper_config in self._dim_iter(dont=self._load_name):
-      id_task1 = self._make_id(loadrateper_config, f_name=f_name)
-      id_sim = self._make_id(loadrateper_config)
+    dims = self._space.dims(dont=self._load_name)
+    load_dims = self._space.dims(do_vars=self._load_name)
+    for idx in self._iter_outer():
+      loadrateper_config = self._space.config(dims, idx)
+      id_task1 = self._make_id(dims, idx, f_name=f_name)
       loadrateper_name = 'loadrateper_{0}'.format(id_task1)
       plot_files1 = self._get_plot_files(id_task1)
-      sim_files1 = self._get_sim_files(id_sim)
+      # sim and ssparse configs of every load
+      flats = self._space.select(dims, idx, load_dims)
+      files_ssparse = [ssparse_table.files(flat) for flat in flats]
+      files_sim = [self._sim_tasks.files(flat) for flat in flats]
       # loadrateper cmd
       loadrateper_cmd = ('ssplot load-rate-percent {0} {1} {2} {3}'
                    .format(plot_files1['loadrateper_png'],
@@ -978,12 +2230,7 @@ class Sweeper(object):
       # add rate and hops files
       rates_files = ''
       hops_files = ''
-      for loads in self._dim_iter(do_vars=self._load_name):
-        id_task2 = self._make_id(loadrateper_config, extra=self._make_id(loads),
-                                 f_name=f_name)
-        ssparse_files2 = self._get_ssparse_files(id_task2)
-        id_sim2 = self._make_id(loadrateper_config, extra=self._make_id(loads))
-        sim_files2 = self._get_sim_files(id_sim2)
+      for ssparse_files2, sim_files2 in zip(files_ssparse, files_sim):
         rates_files += ' {0}'.format(sim_files2['rates_csv'])
         hops_files += ' {0}'.format(ssparse_files2['hops_csv'])
       loadrateper_cmd += ' --rate_stats {0}'.format(rates_files)
@@ -998,35 +2245,34 @@ class Sweeper(object):
           key, plot_info['settings'][key]))
       self._all_cmds.append(loadrateper_cmd)
       # create task
-      loadrateper_task = self._create_task_func(
+      loadrateper_task = self._create_task(
         tm_var, loadrateper_name, loadrateper_cmd, None,
-        'loadrateper', loadrateper_config)
+        'loadrateper', loadrateper_config,
+        ssparse_table.created(flats))
+      if loadrateper_task is None:
+        continue
       loadrateper_task.priority = 1
       # add dependencies
-      for loads in  self._dim_iter(do_vars=self._load_name):
-        id_task3 = self._make_id(loadrateper_config, extra=self._make_id(loads),
-                                 f_name=f_name)
-        loadrateper_task.add_dependency(self._ssparse_tasks[id_task3])
+      for flat in flats:
+        self._add_dependency(loadrateper_task, ssparse_table.task(flat))
 
       loadrateper_fmc = taskrun.FileModificationCondition(
         [], [plot_files1['loadrateper_png']])
       # add input files to task
-      for loads in self._dim_iter(do_vars=self._load_name):
-        id_task4 = self._make_id(loadrateper_config, extra=self._make_id(loads),
-                                 f_name=f_name)
-        ssparse_files3 = self._get_ssparse_files(id_task4)
-        id_sim4 = self._make_id(loadrateper_config, extra=self._make_id(loads))
-        sim_files3 = self._get_sim_files(id_sim4)
+      for ssparse_files3, sim_files3 in zip(files_ssparse, files_sim):
         loadrateper_fmc.add_input(sim_files3['rates_csv'])
         loadrateper_fmc.add_input(ssparse_files3['hops_csv'])
-      loadrateper_task.add_condition(loadrateper_fmc)
+      self._add_condition(loadrateper_task, loadrateper_cmd, loadrateper_fmc)
 
   # latency-pdf
   def _create_latpdf_tasks(self, tm_var, f_name):
+    ssparse_table = self._ssparse_tasks[f_name]
     # loop through all variables
-    for latpdf_config in self._dim_iter():
-      id_task = self._make_id(latpdf_config, f_name=f_name)
-      ssparse_files = self._get_ssparse_files(id_task)
+    dims = self._space.dims()
+    for flat, idx in self._iter_configs():
+      latpdf_config = self._space.config(dims, idx)
+      id_task = ssparse_table.id(flat)
+      ssparse_files = ssparse_table.files(flat)
       plot_files = self._get_plot_files(id_task)
       latpdf_name = 'latpdf_{0}'.format(id_task)
       latpdf_cmd = 'ssplot latency-pdf {0} {1} '.format(
@@ -1046,20 +2292,27 @@ class Sweeper(object):
 
       self._all_cmds.append(latpdf_cmd)
       # create tasks
-      latpdf_task = self._create_task_func(
-        tm_var, latpdf_name, latpdf_cmd, None, 'latpdf', latpdf_config)
+      latpdf_task = self._create_task(
+        tm_var, latpdf_name, latpdf_cmd, None, 'latpdf', latpdf_config,
+        ssparse_table.created([flat]))
+      if latpdf_task is None:
+        continue
       latpdf_task.priority = 1
-      latpdf_task.add_dependency(self._ssparse_tasks[id_task])
-      latpdf_task.add_condition(taskrun.FileModificationCondition(
+      self._add_dependency(latpdf_task, ssparse_table.task(flat))
+      latpdf_fmc = taskrun.FileModificationCondition(
         [ssparse_files['samples_csv']],
-        [plot_files['latpdf_png']]))
+        [plot_files['latpdf_png']])
+      self._add_condition(latpdf_task, latpdf_cmd, latpdf_fmc, flat)
 
   # latency-percentile
   def _create_latperc_tasks(self, tm_var, f_name):
+    ssparse_table = self._ssparse_tasks[f_name]
     # loop through all variables
-    for latperc_config in self._dim_iter():
-      id_task = self._make_id(latperc_config, f_name=f_name)
-      ssparse_files = self._get_ssparse_files(id_task)
+    dims = self._space.dims()
+    for flat, idx in self._iter_configs():
+      latperc_config = self._space.config(dims, idx)
+      id_task = ssparse_table.id(flat)
+      ssparse_files = ssparse_table.files(flat)
       plot_files = self._get_plot_files(id_task)
       latperc_name = 'latperc_{0}'.format(id_task)
       latperc_cmd = 'ssplot latency-percentile {0} {1} '.format(
@@ -1077,20 +2330,27 @@ class Sweeper(object):
           key,plot_info['settings'][key]))
       self._all_cmds.append(latperc_cmd)
       # create tasks
-      latperc_task = self._create_task_func(
-        tm_var, latperc_name, latperc_cmd, None, 'latperc', latperc_config)
+      latperc_task = self._create_task(
+        tm_var, latperc_name, latperc_cmd, None, 'latperc', latperc_config,
+        ssparse_table.created([flat]))
+      if latperc_task is None:
+        continue
       latperc_task.priority = 1
-      latperc_task.add_dependency(self._ssparse_tasks[id_task])
-      latperc_task.add_condition(taskrun.FileModificationCondition(
+      self._add_dependency(latperc_task, ssparse_table.task(flat))
+      latperc_fmc = taskrun.FileModificationCondition(
         [ssparse_files['samples_csv']],
-        [plot_files['latperc_png']]))
+        [plot_files['latperc_png']])
+      self._add_condition(latperc_task, latperc_cmd, latperc_fmc, flat)
 
   # latency-cdf
   def _create_latcdf_tasks(self, tm_var, f_name):
+    ssparse_table = self._ssparse_tasks[f_name]
     # loop through all variables
-    for latcdf_config in self._dim_iter():
-      id_task = self._make_id(latcdf_config, f_name=f_name)
-      ssparse_files = self._get_ssparse_files(id_task)
+    dims = self._space.dims()
+    for flat, idx in self._iter_configs():
+      latcdf_config = self._space.config(dims, idx)
+      id_task = ssparse_table.id(flat)
+      ssparse_files = ssparse_table.files(flat)
       plot_files = self._get_plot_files(id_task)
       latcdf_name = 'latcdf_{0}'.format(id_task)
       latcdf_cmd = 'ssplot latency-cdf {0} {1} '.format(
@@ -1109,21 +2369,32 @@ class Sweeper(object):
           key,plot_info['settings'][key]))
       self._all_cmds.append(latcdf_cmd)
       # create tasks
-      latcdf_task = self._create_task_func(
-        tm_var, latcdf_name, latcdf_cmd, None, 'latcdf', latcdf_config)
+      latcdf_task = self._create_task(
+        tm_var, latcdf_name, latcdf_cmd, None, 'latcdf', latcdf_config,
+        ssparse_table.created([flat]))
+      if latcdf_task is None:
+        continue
       latcdf_task.priority = 1
-      latcdf_task.add_dependency(self._ssparse_tasks[id_task])
-      latcdf_task.add_condition(taskrun.FileModificationCondition(
+      self._add_dependency(latcdf_task, ssparse_table.task(flat))
+      latcdf_fmc = taskrun.FileModificationCondition(
         [ssparse_files['samples_csv']],
-        [plot_files['latcdf_png']]))
+        [plot_files['latcdf_png']])
+      self._add_condition(latcdf_task, latcdf_cmd, latcdf_fmc, flat)
 
   # load-average-hops
   def _create_loadavehops_tasks(self, tm_var, f_name):
+    ssparse_table = self._ssparse_tasks[f_name]
     # config with no load
-    for loadavehops_config in self._dim_iter(dont=self._load_name):
-      id_task1 = self._make_id(loadavehops_config, f_name=f_name)
+    dims = self._space.dims(dont=self._load_name)
+    load_dims = self._space.dims(do_vars=self._load_name)
+    for idx in self._iter_outer():
+      loadavehops_config = self._space.config(dims, idx)
+      id_task1 = self._make_id(dims, idx, f_name=f_name)
       loadavehops_name = 'loadavehops_{0}'.format(id_task1)
       files1 = self._get_plot_files(id_task1)
+      # ssparse configs of every load
+      flats = self._space.select(dims, idx, load_dims)
+      files_ssparse = [ssparse_table.files(flat) for flat in flats]
       # loadavehops cmd
       loadavehops_cmd = ('ssplot load-average-hops {0} {1} {2} {3} '
                    .format(files1['loadavehops_png'],
@@ -1137,38 +2408,36 @@ class Sweeper(object):
         loadavehops_cmd += (' --{0} "{1}"'.format(
           key, plot_info['settings'][key]))
       # add the stats files
-      for loads in  self._dim_iter(do_vars=self._load_name):
-        id_task2 = self._make_id(loadavehops_config, extra=self._make_id(loads),
-                                 f_name=f_name)
-        files2 = self._get_ssparse_files(id_task2)
+      for files2 in files_ssparse:
         loadavehops_cmd += ' {0}'.format(files2['hops_csv'])
       self._all_cmds.append(loadavehops_cmd)
       # create task
-      loadavehops_task = self._create_task_func(
+      loadavehops_task = self._create_task(
         tm_var, loadavehops_name, loadavehops_cmd, None,
-        'loadavehops', loadavehops_config)
+        'loadavehops', loadavehops_config,
+        ssparse_table.created(flats))
+      if loadavehops_task is None:
+        continue
       loadavehops_task.priority = 1
       # add dependencies
-      for loads in  self._dim_iter(do_vars=self._load_name):
-        id_task3 = self._make_id(loadavehops_config, extra=self._make_id(loads),
-                                 f_name=f_name)
-        loadavehops_task.add_dependency(self._ssparse_tasks[id_task3])
+      for flat in flats:
+        self._add_dependency(loadavehops_task, ssparse_table.task(flat))
       loadavehops_fmc = taskrun.FileModificationCondition(
         [], [files1['loadavehops_png']])
       # add input files to task
-      for loads in self._dim_iter(do_vars=self._load_name):
-        id_task4 = self._make_id(loadavehops_config, extra=self._make_id(loads),
-                                 f_name=f_name)
-        files3 = self._get_ssparse_files(id_task4)
+      for files3 in files_ssparse:
         loadavehops_fmc.add_input(files3['hops_csv'])
-      loadavehops_task.add_condition(loadavehops_fmc)
+      self._add_condition(loadavehops_task, loadavehops_cmd, loadavehops_fmc)
 
   # time-latency-scatter
   def _create_timelatscat_tasks(self, tm_var, f_name):
+    ssparse_table = self._ssparse_tasks[f_name]
     # loop through all variables
-    for timelatscat_config in self._dim_iter():
-      id_task = self._make_id(timelatscat_config, f_name=f_name)
-      ssparse_files = self._get_ssparse_files(id_task)
+    dims = self._space.dims()
+    for flat, idx in self._iter_configs():
+      timelatscat_config = self._space.config(dims, idx)
+      id_task = ssparse_table.id(flat)
+      ssparse_files = ssparse_table.files(flat)
       plot_files = self._get_plot_files(id_task)
       timelatscat_name = 'timelatscat_{0}'.format(id_task)
       timelatscat_cmd = 'ssplot time-latency-scatter {0} {1} '.format(
@@ -1187,22 +2456,30 @@ class Sweeper(object):
           key, plot_info['settings'][key]))
       self._all_cmds.append(timelatscat_cmd)
       # create tasks
-      timelatscat_task = self._create_task_func(
+      timelatscat_task = self._create_task(
         tm_var, timelatscat_name, timelatscat_cmd, None,
-        'timelatscat', timelatscat_config)
+        'timelatscat', timelatscat_config,
+        ssparse_table.created([flat]))
+      if timelatscat_task is None:
+        continue
       timelatscat_task.priority = 1
-      timelatscat_task.add_dependency(self._ssparse_tasks[id_task])
-      timelatscat_task.add_condition(taskrun.FileModificationCondition(
+      self._add_dependency(timelatscat_task, ssparse_table.task(flat))
+      timelatscat_fmc = taskrun.FileModificationCondition(
         [ssparse_files['samples_csv']],
-        [plot_files['timelatscat_png']]))
+        [plot_files['timelatscat_png']])
+      self._add_condition(timelatscat_task, timelatscat_cmd, timelatscat_fmc,
+                          flat)
 
   # time-percent-minimal
   def _create_timepermin_tasks(self, tm_var, f_name):
+    tparse_table = self._tparse_tasks[f_name]
     # loop through all variables
-    for timepermin_config in self._dim_iter():
-      id_task = self._make_id(timepermin_config, f_name=f_name)
+    dims = self._space.dims()
+    for flat, idx in self._iter_configs():
+      timepermin_config = self._space.config(dims, idx)
+      id_task = tparse_table.id(flat)
       plot_files = self._get_plot_files(id_task)
-      tparse_files = self._get_tparse_files(id_task)
+      tparse_files = tparse_table.files(flat)
       timepermin_name = 'timepermin_{0}'.format(id_task)
       timepermin_cmd = 'ssplot time-percent-minimal {0} {1} '.format(
         tparse_files['trans_csv'],
@@ -1218,22 +2495,29 @@ class Sweeper(object):
           key, plot_info['settings'][key]))
       self._all_cmds.append(timepermin_cmd)
       # create tasks
-      timepermin_task = self._create_task_func(
+      timepermin_task = self._create_task(
         tm_var, timepermin_name, timepermin_cmd, None,
-        'timepermin', timepermin_config)
+        'timepermin', timepermin_config,
+        tparse_table.created([flat]))
+      if timepermin_task is None:
+        continue
       timepermin_task.priority = 1
-      timepermin_task.add_dependency(self._tparse_tasks[id_task])
-      timepermin_task.add_condition(taskrun.FileModificationCondition(
+      self._add_dependency(timepermin_task, tparse_table.task(flat))
+      timepermin_fmc = taskrun.FileModificationCondition(
         [tparse_files['trans_csv']],
-        [plot_files['timepermin_png']]))
+        [plot_files['timepermin_png']])
+      self._add_condition(timepermin_task, timepermin_cmd, timepermin_fmc, flat)
 
   # time-average-hops
   def _create_timeavehops_tasks(self, tm_var, f_name):
+    tparse_table = self._tparse_tasks[f_name]
     # loop through all variables
-    for timeavehops_config in self._dim_iter():
-      id_task = self._make_id(timeavehops_config, f_name=f_name)
+    dims = self._space.dims()
+    for flat, idx in self._iter_configs():
+      timeavehops_config = self._space.config(dims, idx)
+      id_task = tparse_table.id(flat)
       plot_files = self._get_plot_files(id_task)
-      tparse_files = self._get_tparse_files(id_task)
+      tparse_files = tparse_table.files(flat)
       timeavehops_name = 'timeavehops_{0}'.format(id_task)
       timeavehops_cmd = 'ssplot time-average-hops {0} {1} '.format(
         tparse_files['trans_csv'],
@@ -1249,22 +2533,30 @@ class Sweeper(object):
           key, plot_info['settings'][key]))
       self._all_cmds.append(timeavehops_cmd)
       # create tasks
-      timeavehops_task = self._create_task_func(
+      timeavehops_task = self._create_task(
         tm_var, timeavehops_name, timeavehops_cmd, None,
-        'timeavehops', timeavehops_config)
+        'timeavehops', timeavehops_config,
+        tparse_table.created([flat]))
+      if timeavehops_task is None:
+        continue
       timeavehops_task.priority = 1
-      timeavehops_task.add_dependency(self._tparse_tasks[id_task])
-      timeavehops_task.add_condition(taskrun.FileModificationCondition(
+      self._add_dependency(timeavehops_task, tparse_table.task(flat))
+      timeavehops_fmc = taskrun.FileModificationCondition(
         [tparse_files['trans_csv']],
-        [plot_files['timeavehops_png']]))
+        [plot_files['timeavehops_png']])
+      self._add_condition(timeavehops_task, timeavehops_cmd, timeavehops_fmc,
+                          flat)
 
   # time-latency
   def _create_timelat_tasks(self, tm_var, f_name):
+    tparse_table = self._tparse_tasks[f_name]
     # loop through all variables
-    for timelat_config in self._dim_iter():
-      id_task = self._make_id(timelat_config, f_name=f_name)
+    dims = self._space.dims()
+    for flat, idx in self._iter_configs():
+      timelat_config = self._space.config(dims, idx)
+      id_task = tparse_table.id(flat)
       plot_files = self._get_plot_files(id_task)
-      tparse_files = self._get_tparse_files(id_task)
+      tparse_files = tparse_table.files(flat)
       timelat_name = 'timelat_{0}'.format(id_task)
       timelat_cmd = 'ssplot time-latency {0} {1} '.format(
         tparse_files['trans_csv'],
@@ -1282,32 +2574,38 @@ class Sweeper(object):
           key, plot_info['settings'][key]))
       self._all_cmds.append(timelat_cmd)
       # create tasks
-      timelat_task = self._create_task_func(
+      timelat_task = self._create_task(
         tm_var, timelat_name, timelat_cmd, None,
-        'timelat', timelat_config)
+        'timelat', timelat_config,
+        tparse_table.created([flat]))
+      if timelat_task is None:
+        continue
       timelat_task.priority = 1
-      timelat_task.add_dependency(self._tparse_tasks[id_task])
-      timelat_task.add_condition(taskrun.FileModificationCondition(
+      self._add_dependency(timelat_task, tparse_table.task(flat))
+      timelat_fmc = taskrun.FileModificationCondition(
         [tparse_files['trans_csv']],
-        [plot_files['timelat_png']]))
+        [plot_files['timelat_png']])
+      self._add_condition(timelat_task, timelat_cmd, timelat_fmc, flat)
 
   # load-rate
   def _create_loadrate_tasks(self, tm_var, f_name):
     # config with no load
-    for loadrate_config in self._dim_iter(dont=self._load_name):
-      id_task1 = self._make_id(loadrate_config, f_name=f_name)
-      id_sim = self._make_id(loadrate_config)
+    dims = self._space.dims(dont=self._load_name)
+    load_dims = self._space.dims(do_vars=self._load_name)
+    for idx in self._iter_outer():
+      loadrate_config = self._space.config(dims, idx)
+      id_task1 = self._make_id(dims, idx, f_name=f_name)
       loadrate_name = 'loadrate_{0}'.format(id_task1)
       plot_files1 = self._get_plot_files(id_task1)
-      sim_files1 = self._get_sim_files(id_sim)
+      # sim configs of every load
+      flats = self._space.select(dims, idx, load_dims)
+      files_sim = [self._sim_tasks.files(flat) for flat in flats]
       # loadrate cmd
       loadrate_cmd = ('ssplot load-rate {0} {1} {2} {3}'
                    .format(plot_files1['loadrate_png'],
                            self._start, self._stop, self._step))
       # add stats
-      for loads in self._dim_iter(do_vars=self._load_name):
-        id_task2 = self._make_id(loadrate_config, extra=self._make_id(loads))
-        sim_files2 = self._get_sim_files(id_task2)
+      for sim_files2 in files_sim:
         loadrate_cmd += ' {0}'.format(sim_files2['rates_csv'])
       # plot settings
       plot_info = self._plots[('load-rate', f_name)]
@@ -1319,109 +2617,160 @@ class Sweeper(object):
           key,plot_info['settings'][key]))
       self._all_cmds.append(loadrate_cmd)
       # create task
-      loadrate_task = self._create_task_func(
-        tm_var, loadrate_name, loadrate_cmd, None, 'loadrate', loadrate_config)
+      loadrate_task = self._create_task(
+        tm_var, loadrate_name, loadrate_cmd, None, 'loadrate', loadrate_config,
+        self._sim_tasks.created(flats))
+      if loadrate_task is None:
+        continue
       loadrate_task.priority = 1
       # add dependencies
-      for loads in  self._dim_iter(do_vars=self._load_name):
-        id_task3 = self._make_id(loadrate_config, extra=self._make_id(loads))
-        loadrate_task.add_dependency(self._sim_tasks[id_task3])
+      for flat in flats:
+        self._add_dependency(loadrate_task, self._sim_tasks.task(flat))
       loadrate_fmc = taskrun.FileModificationCondition(
         [], [plot_files1['loadrate_png']])
       # add input files to task
-      for loads in self._dim_iter(do_vars=self._load_name):
-        id_task4 = self._make_id(loadrate_config, extra=self._make_id(loads))
-        sim_files3 = self._get_sim_files(id_task4)
+      for sim_files3 in files_sim:
         loadrate_fmc.add_input(sim_files3['rates_csv'])
-      loadrate_task.add_condition(loadrate_fmc)
+      self._add_condition(loadrate_task, loadrate_cmd, loadrate_fmc)
 
   # load-latency-compare
   def _create_loadlatcomp_tasks(self, tm_var, f_name):
+    ssparse_table = self._ssparse_tasks[f_name]
     # loop over all vars that should compared and have more than 1 value
-    for cvar in self._variables:
-      if (cvar['name'] != self._load_name and cvar['compare']
-          and len(cvar['values']) > 1):
-        # count number of compare variables
-        self._comp_var_count += 1
-        # iterate all configurations for this variable (no l, no cvar)
-        for loadlatcomp_config in self._dim_iter(dont=[self._load_name,
-                                                 cvar['name']]):
-          # iterate all latency distributions (9)
-          for field in ssplot.LoadLatencyStats.FIELDS:
-            field2 = field.replace('%','')
-            # make id, plot title, png file
-            id_task = self._make_id(loadlatcomp_config, extra=field2,
-                                    f_name=f_name)
-            loadlatcomp_name = 'loadlatcomp_{0}_{1}'.format(cvar['short_name'],
-                                                            id_task)
-            plot_files = self._get_plot_files(
-              ('{0}_{1}'.format(cvar['short_name'], id_task)))
-            # cmd
-            loadlatcomp_cmd = ('ssplot load-latency-compare --row {0} ' \
-                         '--field {1} {2} {3} {4} {5} '
-                         .format(self._parsings[f_name]['latency_mode'].title(),
-                                 field, plot_files['loadlatcomp_png'],
-                                 self._start, self._stop, self._step))
-            # plot settings
-            plot_info = self._plots[('load-latency-compare',f_name)]
-            if self._latency_units != None:
-              loadlatcomp_cmd += (' --latency_units {0}'.format(
-                self._latency_units))
-            if self._load_units != None:
-              loadlatcomp_cmd += (' --load_units {0}'.format(self._load_units))
-            if plot_info['title_format'] != 'off':
-              loadlatcomp_title = self._make_title(loadlatcomp_config,
-                                                   plot_info, lat=field)
-              loadlatcomp_cmd += (' --title {0} '.format(loadlatcomp_title))
-            loadlatcomp_cmd += (' --legend_title "{0}" '.format(
-              cvar['name']))
-            for key in plot_info['settings']:
-              loadlatcomp_cmd += (' --{0} "{1}"'.format(
-                key, plot_info['settings'][key]))
-
-            # loop through comp variable and loads to add agg files to cmd
-            for var_load_config in self._dim_iter(do_vars=[cvar['name'],
-                                                           self._load_name]):
-              # create ordered config with cvar and load
-              sim_config = self._create_config(loadlatcomp_config,
-                                               var_load_config)
-              id_task2 = self._make_id(sim_config, f_name=f_name)
-              ssparse_files2 = self._get_ssparse_files(id_task2)
-              loadlatcomp_cmd += ' {0}'.format(ssparse_files2['latency_csv'])
-            # loop through comp variable to create legend
-            for var_config in self._dim_iter(do_vars=cvar['name']):
-              for var in var_config:
-                loadlatcomp_cmd += ' --data_label "{0}"'.format(var['value'])
-            for w in self._wanted_plots:
-              if (w in plot_files['loadlatcomp_png']):
-                self._plot_cmds.append(loadlatcomp_cmd)
-                print("added", w)
-
-            self._all_cmds.append(loadlatcomp_cmd)
-            # create task
-            loadlatcomp_task = self._create_task_func(
-              tm_var, loadlatcomp_name, loadlatcomp_cmd, None,
-              'loadlatcomp', loadlatcomp_config)
-            loadlatcomp_task.priority = 1
-            # add dependencies (loop through load and cvar)
-            for var_load_config in self._dim_iter(do_vars=[cvar['name'],
-                                                           self._load_name]):
-              # create ordered config with cvar and load
-              sim_config = self._create_config(loadlatcomp_config,
-                                               var_load_config)
-              id_task3 = self._make_id(sim_config, f_name=f_name)
-              loadlatcomp_task.add_dependency(self._ssparse_tasks[id_task3])
-            loadlatcomp_fmc = taskrun.FileModificationCondition(
-              [], [plot_files['loadlatcomp_png']])
-            for var_load_config in self._dim_iter(do_vars=[cvar['name'],
-                                                           self._load_name]):
-              # create ordered config with cvar and load
-              sim_config = self._create_config(loadlatcomp_config,
-                                               var_load_config)
-              id_task4 = self._make_id(sim_config, f_name=f_name)
-              ssparse_files3 = self._get_ssparse_files(id_task4)
-              loadlatcomp_fmc.add_input(ssparse_files3['latency_csv'])
-            loadlatcomp_task.add_condition(loadlatcomp_fmc)
+    for cvar in self._compare_variables():
+      # iterate all configurations for this variable (no l, no cvar)
+      dims = self._space.dims(dont=[self._load_name, cvar['name']])
+      cmp_dims = self._space.dims(do_vars=[cvar['name'], self._load_name])
+      nloads = len(self._load_variable['values'])
+      for idx in self._iter_groups(cvar):
+        loadlatcomp_config = self._space.config(dims, idx)
+        # ssparse configs of every compare value (in the design) and load
+        #  (all fields)
+        values = self._group_values(cvar, idx)
+        flats = self._space.select(dims, idx, cmp_dims)
+        if len(values) < len(cvar['values']):
+          flats = flats.reshape(-1, nloads)[values].ravel()
+        labels = [cvar['values'][value] for value in values]
+        files_ssparse = [ssparse_table.files(flat) for flat in flats]
+        stale = ssparse_table.created(flats)
+        # iterate all latency distributions (9)
+        fields_png = []
+        for field in ssplot.LoadLatencyStats.FIELDS:
+          field2 = field.replace('%','')
+          # make id, plot title, png file
+          id_task = self._make_id(dims, idx, extra=field2, f_name=f_name)
+          loadlatcomp_name = 'loadlatcomp_{0}_{1}'.format(cvar['short_name'],
+                                                          id_task)
+          plot_files = self._get_plot_files(
+            ('{0}_{1}'.format(cvar['short_name'], id_task)))
+          fields_png.append((field, plot_files['loadlatcomp_png']))
+          # cmd
+          loadlatcomp_cmd = self._loadlatcomp_cmd(
+            f_name, cvar, loadlatcomp_config, files_ssparse, field,
+            plot_files['loadlatcomp_png'], labels)
+          for w in self._wanted_plots:
+            if (w in plot_files['loadlatcomp_png']):
+              self._plot_cmds.append(loadlatcomp_cmd)
+              print("added", w)
+          if self._fuse_compare:
+            continue
+
+          self._all_cmds.append(loadlatcomp_cmd)
+          # create task
+          loadlatcomp_task = self._create_task(
+            tm_var, loadlatcomp_name, loadlatcomp_cmd, None,
+            'loadlatcomp', loadlatcomp_config, stale)
+          if loadlatcomp_task is None:
+            continue
+          loadlatcomp_task.priority = 1
+          self._add_loadlatcomp_inputs(loadlatcomp_task, loadlatcomp_cmd,
+                                       ssparse_table, flats, files_ssparse,
+                                       [plot_files['loadlatcomp_png']])
+
+        # one task reads the inputs once and plots every field
+        if self._fuse_compare:
+          id_task = self._make_id(dims, idx, f_name=f_name)
+          loadlatcomp_name = 'loadlatcomp_{0}_{1}'.format(cvar['short_name'],
+                                                          id_task)
+          loadlatcomp_cmd = self._loadlatcomp_cmd(
+            f_name, cvar, loadlatcomp_config, files_ssparse, None,
+            fields_png[0][1], labels)
+          loadlatcomp_cmd = '{0} {1} {2} --fields {3}'.format(
+            shlex.quote(sys.executable), shlex.quote(compare_fields.__file__),
+            loadlatcomp_cmd[len('ssplot '):],
+            ' '.join(shlex.quote('{0}={1}'.format(field, png))
+                     for field, png in fields_png))
+          if self._adaptive is not None:
+            loadlatcomp_cmd += ' --gaps'
+          self._all_cmds.append(loadlatcomp_cmd)
+          loadlatcomp_task = self._create_task(
+            tm_var, loadlatcomp_name, loadlatcomp_cmd, None,
+            'loadlatcomp', loadlatcomp_config, stale)
+          if loadlatcomp_task is None:
+            continue
+          loadlatcomp_task.priority = 1
+          self._add_loadlatcomp_inputs(loadlatcomp_task, loadlatcomp_cmd,
+                                       ssparse_table, flats, files_ssparse,
+                                       [png for field, png in fields_png])
+
+  def _loadlatcomp_cmd(self, f_name, cvar, config, files_ssparse, field,
+                       png, labels):
+    """
+    This creates the ssplot command of a load-latency-compare plot
+
+    Args:
+      f_name        : filter name
+      cvar          : compared variable
+      config        : config of the group (no load, no cvar)
+      files_ssparse : ssparse files of every compare value and load
+      field         : latency field (None for a title template of the
+                      fields, see compare_fields)
+      png           : plot file
+      labels        : compare values of files_ssparse
+    """
+    loadlatcomp_cmd = 'ssplot load-latency-compare --row {0} '.format(
+      self._parsings[f_name]['latency_mode'].title())
+    if field is not None:
+      loadlatcomp_cmd += '--field {0} '.format(field)
+    loadlatcomp_cmd += '{0} {1} {2} {3} '.format(
+      png, self._start, self._stop, self._step)
+    # plot settings
+    plot_info = self._plots[('load-latency-compare',f_name)]
+    if self._latency_units != None:
+      loadlatcomp_cmd += (' --latency_units {0}'.format(
+        self._latency_units))
+    if self._load_units != None:
+      loadlatcomp_cmd += (' --load_units {0}'.format(self._load_units))
+    if plot_info['title_format'] != 'off':
+      loadlatcomp_title = self._make_title(
+        config, plot_info, lat=field if field is not None else '{field}')
+      loadlatcomp_cmd += (' --title {0} '.format(loadlatcomp_title))
+    loadlatcomp_cmd += (' --legend_title "{0}" '.format(
+      cvar['name']))
+    for key in plot_info['settings']:
+      loadlatcomp_cmd += (' --{0} "{1}"'.format(
+        key, plot_info['settings'][key]))
+
+    # loop through comp variable and loads to add agg files to cmd
+    for ssparse_files2 in files_ssparse:
+      loadlatcomp_cmd += ' {0}'.format(ssparse_files2['latency_csv'])
+    # loop through comp variable to create legend
+    for value in labels:
+      loadlatcomp_cmd += ' --data_label "{0}"'.format(value)
+    return loadlatcomp_cmd
+
+  def _add_loadlatcomp_inputs(self, loadlatcomp_task, loadlatcomp_cmd,
+                              ssparse_table, flats, files_ssparse, pngs):
+    """
+    This adds the dependencies and condition of a load-latency-compare task
+    """
+    # add dependencies (loop through load and cvar)
+    for flat in flats:
+      self._add_dependency(loadlatcomp_task, ssparse_table.task(flat))
+    loadlatcomp_fmc = taskrun.FileModificationCondition([], list(pngs))
+    for ssparse_files3 in files_ssparse:
+      loadlatcomp_fmc.add_input(ssparse_files3['latency_csv'])
+    self._add_condition(loadlatcomp_task, loadlatcomp_cmd, loadlatcomp_fmc)
 
   def _create_viewer_task(self):
     files = self._get_viewer_files()
@@ -1458,8 +2807,9 @@ class Sweeper(object):
     cplot_divs = get_cplot_divs(self)
     create_name = get_create_name(self)
     compose_name = get_compose_name(self)
+    design = get_design(self)
 
     js_all = load_params + get_params + show_div + cplot_divs + \
-    create_name + get_log + compose_name + add_params
+    create_name + get_log + compose_name + add_params + design
     with open(files['javascript'], 'w') as fd_js:
       print(js_all, file=fd_js)
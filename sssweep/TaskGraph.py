@@ -0,0 +1,110 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import json
+
+class TaskGraph(object):
+  """
+  This records the task graph built by the Sweeper (commands, stages,
+  priorities, resources, dependencies, input and output files) to export it
+  as JSON, which graph_runner.py executes without taskrun or the Sweeper.
+  The priority and resources of the tasks are read when the graph is frozen
+  since they are set after the tasks are created.
+
+  Only the conditions graph_runner.py can check from the files are exported:
+  the file modification times and the command hash. The disk budget and
+  adaptive loads decide from the state of the running Sweeper, so the Sweeper
+  refuses to export a graph with them.
+  """
+
+  def __init__(self):
+    """
+    Constructs an empty TaskGraph object
+    """
+    self._nodes = {}
+    self._tasks = {}
+
+  def add_task(self, task, cmd, console_out, task_type):
+    """
+    This adds a created task with its final command
+    """
+    self._nodes[task.name] = {
+      'name': task.name,
+      'cmd': cmd,
+      'log': console_out,
+      'stage': task_type,
+      'priority': 0,
+      'resources': {},
+      'deps': [],
+      'inputs': [],
+      'outputs': [],
+      'cmdhash': None
+    }
+    self._tasks[task.name] = task
+
+  def add_dependency(self, task, dependency):
+    """
+    This adds a dependency of a task
+    """
+    self._nodes[task.name]['deps'].append(dependency.name)
+
+  def add_files(self, task, inputs, outputs):
+    """
+    This adds the input and output files of a task
+    """
+    self._nodes[task.name]['inputs'].extend(inputs)
+    self._nodes[task.name]['outputs'].extend(outputs)
+
+  def add_hash(self, task, hash_file, cmd_hash):
+    """
+    This adds the command hash of a task and the file it is stored in
+    """
+    self._nodes[task.name]['cmdhash'] = {'file': hash_file, 'hash': cmd_hash}
+
+  def freeze(self):
+    """
+    This reads the priority and resources of the tasks added since the last
+    call and releases them
+    """
+    for name, task in self._tasks.items():
+      self._nodes[name]['priority'] = getattr(task, 'priority', 0)
+      self._nodes[name]['resources'] = dict(getattr(task, 'resources', {}))
+    self._tasks = {}
+
+  def __len__(self):
+    return len(self._nodes)
+
+  def write(self, filename):
+    """
+    This writes the graph as JSON (tasks in creation order)
+    """
+    self.freeze()
+    with open(filename, 'w') as fd_json:
+      json.dump({'tasks': list(self._nodes.values())}, fd_json, indent=1)
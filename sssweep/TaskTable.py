@@ -0,0 +1,129 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+class _Sparse(dict):
+  """
+  This is a dict returning None for the missing keys (without adding them)
+  """
+
+  def __missing__(self, key):
+    return None
+
+class TaskTable(object):
+  """
+  This maps the flat index of a configuration to the id, task, and files of
+  one stage (the simulations or the parsing of one filter). It is built once
+  and shared by every stage that consumes the outputs, so dependent stages
+  never rebuild ids or file names. A sparse table only holds the
+  configurations in use (e.g. one wave), the others take one byte each.
+  """
+
+  def __init__(self, size, id_func, files_func, sparse=False):
+    """
+    Constructs a TaskTable object
+
+    Args:
+      size         : number of configurations in the space
+      id_func      : function returning the id of a flat index
+      files_func   : function returning the files dict of an id
+      sparse       : only hold the configurations in use
+    """
+    self._id_func = id_func
+    self._files_func = files_func
+    self._sparse = sparse
+    if sparse:
+      self._ids = _Sparse()
+      self._files = _Sparse()
+      self._tasks = _Sparse()
+    else:
+      self._ids = [None] * size
+      self._files = [None] * size
+      self._tasks = [None] * size
+    self._created = bytearray(size)
+
+  def id(self, flat):
+    """
+    Returns:
+      (str) : the id of the configuration
+    """
+    id_task = self._ids[flat]
+    if id_task is None:
+      id_task = self._id_func(flat)
+      self._ids[flat] = id_task
+    return id_task
+
+  def files(self, flat):
+    """
+    Returns:
+      (dict) : the files of the configuration
+    """
+    files = self._files[flat]
+    if files is None:
+      files = self._files_func(self.id(flat))
+      self._files[flat] = files
+    return files
+
+  def task(self, flat):
+    """
+    Returns:
+      (Task) : the task of the configuration, None if it wasn't created
+    """
+    return self._tasks[flat]
+
+  def set_task(self, flat, task):
+    """
+    This sets the task of the configuration
+    """
+    self._tasks[flat] = task
+    if task is not None:
+      self._created[flat] = 1
+
+  def created(self, flats):
+    """
+    Returns:
+      (bool) : True if a task was created for any of the configurations
+    """
+    return any(self._created[flat] for flat in flats)
+
+  def clear(self, flats):
+    """
+    This releases the tasks and cached files of configurations (whether
+    they were created is kept)
+    """
+    for flat in flats:
+      if self._sparse:
+        self._ids.pop(flat, None)
+        self._files.pop(flat, None)
+        self._tasks.pop(flat, None)
+      else:
+        self._ids[flat] = None
+        self._files[flat] = None
+        self._tasks[flat] = None
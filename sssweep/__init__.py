@@ -30,6 +30,9 @@
 """
 
 from .Sweeper import Sweeper
+from .Config import Config
+from .BuildReport import BuildReport
+from .CostEstimate import CostEstimate
 from .web_viewer_gen import *
 from .util import *
 
@@ -0,0 +1,92 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import argparse
+import sys
+
+import handycsv
+
+def read_once(read):
+  """
+  This wraps a stats file reader to read (and decompress) each file once
+  """
+  cache = {}
+  def cached_read(filename):
+    if filename not in cache:
+      cache[filename] = read(filename)
+    return cache[filename]
+  return cached_read
+
+def main(argv=None):
+  """
+  This plots every field of a load-latency-compare plot from one read of the
+  stats files. The arguments are the ones of 'ssplot load-latency-compare'
+  without --field, where '{field}' in the title is replaced by each field,
+  followed by --fields FIELD=PLOTFILE ... With --gaps, missing stats files
+  are plotted as gaps (see load_plots).
+  """
+  import matplotlib
+  matplotlib.use('Agg')
+  import matplotlib.pyplot as plt
+  import ssplot
+
+  ap = argparse.ArgumentParser(prog='ssplot')
+  sp = ap.add_subparsers(dest='cmd')
+  sp.required = True
+  ssplot.LoadLatencyCompare.create_parser(sp)
+  sp.choices[ssplot.LoadLatencyCompare.NAME].add_argument(
+    '--fields', nargs='+', required=True,
+    help='FIELD=PLOTFILE of each plot')
+  sp.choices[ssplot.LoadLatencyCompare.NAME].add_argument(
+    '--gaps', action='store_true',
+    help='plot missing stats files as gaps')
+  args = ap.parse_args(argv)
+
+  read = handycsv.GridStats.read
+  if args.gaps:
+    # run as a script next to load_plots
+    import load_plots
+    read = load_plots.read_gaps(read)
+  handycsv.GridStats.read = staticmethod(read_once(read))
+  title = args.title
+  for field_png in args.fields:
+    field, png = field_png.split('=', 1)
+    args.field = field
+    args.plotfile = png
+    if title is not None:
+      args.title = title.replace('{field}', field)
+    code = args.func(args, plt)
+    plt.close('all')
+    if code != 0:
+      return code
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main())
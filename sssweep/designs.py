@@ -0,0 +1,143 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import numpy
+
+# designs of the configurations without the load (see Sweeper.set_design)
+DESIGNS = ['full', 'lhs', 'orthogonal', 'ofat', 'random']
+
+def _mask(widths, rows):
+  mask = bytearray(int(numpy.prod(widths, dtype=numpy.int64)))
+  if len(rows) > 0:
+    flats = numpy.ravel_multi_index(numpy.asarray(rows, dtype=numpy.int64).T,
+                                    widths)
+    for flat in flats.tolist():
+      mask[flat] = 1
+  return mask
+
+def full(widths):
+  """
+  Returns:
+    (bytearray) : every configuration of the product of widths
+  """
+  return bytearray([1]) * int(numpy.prod(widths, dtype=numpy.int64))
+
+def latin_hypercube(widths, samples, seed=0):
+  """
+  Returns:
+    (bytearray) : up to samples configurations where the values of each
+                  variable are spread evenly (one sample per stratum of
+                  each variable, duplicates are merged)
+  """
+  assert samples > 0, 'the number of samples must be > 0'
+  rng = numpy.random.default_rng(seed)
+  rows = []
+  for width in widths:
+    strata = rng.permutation(samples) + rng.random(samples)
+    rows.append(numpy.floor(strata * width / samples).astype(numpy.int64))
+  return _mask(widths, numpy.array(rows).T)
+
+def _prime(low):
+  num = max(2, low)
+  while any(num % div == 0 for div in range(2, int(num ** 0.5) + 1)):
+    num += 1
+  return num
+
+def orthogonal_array(widths):
+  """
+  Returns:
+    (bytearray) : the rows of a strength 2 orthogonal array (Bose
+                  construction) over the smallest prime s of at least the
+                  width of every variable with s + 1 columns for the
+                  variables, its levels folded onto the values of each
+                  variable. Every pair of values of any two variables is in
+                  one of the s * s configurations.
+  """
+  s = _prime(max(max(widths), len(widths) - 1))
+  rows = []
+  for a in range(s):
+    for b in range(s):
+      levels = [a, b] + [(a + mult * b) % s for mult in range(1, s)]
+      rows.append([level % width for level, width in zip(levels, widths)])
+  return _mask(widths, rows)
+
+def one_factor(widths, baseline):
+  """
+  Returns:
+    (bytearray) : the baseline configuration (value indices) and every
+                  configuration that differs from it by one variable
+  """
+  assert len(baseline) == len(widths), 'the baseline needs every variable'
+  rows = [list(baseline)]
+  for dim, width in enumerate(widths):
+    for value in range(width):
+      row = list(baseline)
+      row[dim] = value
+      rows.append(row)
+  return _mask(widths, rows)
+
+def random_subset(widths, samples, seed=0):
+  """
+  Returns:
+    (bytearray) : samples configurations drawn uniformly without replacement
+  """
+  assert samples > 0, 'the number of samples must be > 0'
+  size = int(numpy.prod(widths, dtype=numpy.int64))
+  rng = numpy.random.default_rng(seed)
+  flats = rng.choice(size, min(samples, size), replace=False)
+  return _mask(widths, numpy.array(numpy.unravel_index(flats, widths)).T)
+
+def mask(design, widths, samples=None, seed=0, baseline=None):
+  """
+  Returns:
+    (bytearray) : 1 for each configuration of a design over the product of
+                  widths, in C order
+
+  Args:
+    design       : one of DESIGNS
+    widths       : number of values of each variable
+    samples      : number of configurations (lhs and random)
+    seed         : seed of the random designs
+    baseline     : value indices of the baseline (ofat, None for the first
+                   values)
+  """
+  assert design in DESIGNS, 'Invalid design: {0}'.format(design)
+  widths = tuple(widths)
+  if design == 'full':
+    return full(widths)
+  if design == 'lhs':
+    return latin_hypercube(widths, samples, seed)
+  if design == 'orthogonal':
+    return orthogonal_array(widths)
+  if design == 'ofat':
+    if baseline is None:
+      baseline = [0] * len(widths)
+    return one_factor(widths, baseline)
+  return random_subset(widths, samples, seed)
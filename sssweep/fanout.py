@@ -0,0 +1,221 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import argparse
+import gzip
+import os
+import select
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+
+BLOCK = 1 << 20
+FIFO = '{fifo}'
+
+# file extension of each codec, zstd and lz4 use their command line tools
+CODECS = {'none': '', 'gz': '.gz', 'zstd': '.zst', 'lz4': '.lz4'}
+_READERS = {'.zst': ['zstd', '-dcq'], '.lz4': ['lz4', '-dcq']}
+_WRITERS = {'.zst': ['zstd', '-qf', '-', '-o'], '.lz4': ['lz4', '-qf', '-']}
+
+class _ToolFile(object):
+  """
+  This is a binary file read from or written to a compression tool
+  """
+
+  def __init__(self, args, mode):
+    if mode == 'rb':
+      self._proc = subprocess.Popen(args, stdout=subprocess.PIPE)
+      self._fd = self._proc.stdout
+    else:
+      self._proc = subprocess.Popen(args, stdin=subprocess.PIPE)
+      self._fd = self._proc.stdin
+
+  def read(self, size):
+    return self._fd.read(size)
+
+  def write(self, data):
+    return self._fd.write(data)
+
+  def close(self):
+    self._fd.close()
+    if self._proc.wait() != 0:
+      raise IOError('{0} failed'.format(self._proc.args[0]))
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+def open_codec(filename, mode):
+  """
+  This opens a binary file ('rb' or 'wb') with the codec of its extension
+  """
+  ext = os.path.splitext(filename)[1]
+  if ext == '.gz':
+    return gzip.open(filename, mode, compresslevel=6) if mode == 'wb' \
+      else gzip.open(filename, mode)
+  if ext in _READERS:
+    if mode == 'rb':
+      return _ToolFile(_READERS[ext] + [filename], mode)
+    return _ToolFile(_WRITERS[ext] + [filename], mode)
+  return open(filename, mode)
+
+def command(input_file, consumers, producer=None, keep=None):
+  """
+  Returns:
+    (str) : the command streaming a message log once to every consumer
+
+  Args:
+    input_file   : file read once (decoded by its extension, see CODECS),
+                   None with a producer
+    consumers    : shell commands reading the stream from /dev/stdin
+    producer     : shell command writing the stream to '{fifo}'
+    keep         : file the stream is also written to (encoded by its
+                   extension)
+  """
+  cmd = '{0} {1}'.format(shlex.quote(sys.executable), shlex.quote(__file__))
+  if input_file is not None:
+    cmd += ' --input {0}'.format(shlex.quote(input_file))
+  if producer is not None:
+    cmd += ' --producer {0}'.format(shlex.quote(producer))
+  if keep is not None:
+    cmd += ' --keep {0}'.format(shlex.quote(keep))
+  for consumer in consumers:
+    cmd += ' --consumer {0}'.format(shlex.quote(consumer))
+  return cmd
+
+def read_file(input_file):
+  """
+  This yields the blocks of a file (decoded by its extension)
+  """
+  with open_codec(input_file, 'rb') as fd_in:
+    for block in iter(lambda: fd_in.read(BLOCK), b''):
+      yield block
+
+def read_producer(producer, status):
+  """
+  This runs the producer writing to a named pipe and yields the blocks it
+  writes. The exit code of the producer is appended to status.
+  """
+  tmp = tempfile.mkdtemp(prefix='sssweep_fifo_')
+  fifo = os.path.join(tmp, 'messages.mpf')
+  os.mkfifo(fifo)
+  proc = subprocess.Popen(producer.replace(FIFO, fifo), shell=True)
+  # the extra writer keeps the pipe open until the producer exits, even if it
+  #  exits before opening it
+  rfd = os.open(fifo, os.O_RDONLY | os.O_NONBLOCK)
+  wfd = os.open(fifo, os.O_WRONLY | os.O_NONBLOCK)
+  try:
+    while True:
+      ready, _, _ = select.select([rfd], [], [], 0.1)
+      if ready:
+        try:
+          block = os.read(rfd, BLOCK)
+        except BlockingIOError:
+          continue
+        if not block:
+          break
+        yield block
+      elif wfd is not None and proc.poll() is not None:
+        os.close(wfd)
+        wfd = None
+  finally:
+    if wfd is not None:
+      os.close(wfd)
+    os.close(rfd)
+    shutil.rmtree(tmp, ignore_errors=True)
+    status.append(proc.wait())
+
+def fanout(blocks, consumers, keep=None, drain=False):
+  """
+  This writes the blocks to the stdin of every consumer (and to keep). A
+  consumer that exits early doesn't stop the others. With drain, every block
+  is read even if no one uses it (the producer must not block).
+
+  Returns:
+    (int) : 0 if every consumer succeeded
+  """
+  procs = [subprocess.Popen(consumer, shell=True, stdin=subprocess.PIPE)
+           for consumer in consumers]
+  alive = list(procs)
+  fd_keep = None
+  if keep is not None:
+    fd_keep = open_codec(keep, 'wb')
+  for block in blocks:
+    if fd_keep is not None:
+      fd_keep.write(block)
+    for proc in list(alive):
+      try:
+        proc.stdin.write(block)
+      except BrokenPipeError:
+        alive.remove(proc)
+    if len(alive) == 0 and fd_keep is None and not drain:
+      break
+  if fd_keep is not None:
+    fd_keep.close()
+  code = 0
+  for proc in procs:
+    try:
+      proc.stdin.close()
+    except BrokenPipeError:
+      pass
+    if proc.wait() != 0:
+      code = 1
+  return code
+
+def main():
+  ap = argparse.ArgumentParser(
+    description='read a message log once for several consumers')
+  ap.add_argument('--input', default=None,
+                  help='message log (decoded by its extension)')
+  ap.add_argument('--producer', default=None,
+                  help='shell command writing the log to {0}'.format(FIFO))
+  ap.add_argument('--keep', default=None,
+                  help='also write the log to this file')
+  ap.add_argument('--consumer', action='append', default=[],
+                  help='shell command reading the log from /dev/stdin')
+  args = ap.parse_args()
+  assert (args.input is None) != (args.producer is None), \
+    'use either --input or --producer'
+
+  if args.input is not None:
+    return fanout(read_file(args.input), args.consumer, args.keep)
+  status = []
+  code = fanout(read_producer(args.producer, status), args.consumer,
+                args.keep, drain=True)
+  if len(status) == 0 or status[0] != 0:
+    code = 1
+  return code
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,534 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import argparse
+import fnmatch
+import hashlib
+import heapq
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+# task states, one marker file per task in the state directory
+CLAIM = '.claim'
+DONE = '.done'
+FAILED = '.failed'
+
+def load(graph_file):
+  """
+  This loads a task graph exported by the Sweeper (TaskGraph)
+
+  Returns:
+    (list) : the tasks
+  """
+  with open(graph_file, 'r') as fd_graph:
+    return json.load(fd_graph)['tasks']
+
+def select(tasks, stages=None, patterns=None, shard=None):
+  """
+  This returns the tasks of a subset of the graph
+
+  Args:
+    tasks        : tasks of the graph
+    stages       : stages to keep (None for all)
+    patterns     : glob patterns of task names to keep (None for all)
+    shard        : (index, count) keeps every count-th task from index
+  """
+  subset = []
+  for pos, task in enumerate(tasks):
+    if stages is not None and task['stage'] not in stages:
+      continue
+    if patterns is not None and not any(
+        fnmatch.fnmatchcase(task['name'], pattern) for pattern in patterns):
+      continue
+    if shard is not None and pos % shard[1] != shard[0]:
+      continue
+    subset.append(task)
+  return subset
+
+def up_to_date(task):
+  """
+  Returns:
+    (bool) : True if the outputs of a task exist and are newer than its
+             inputs (as taskrun's FileModificationCondition) and were
+             generated by the same command (as CommandCondition)
+  """
+  if len(task['outputs']) == 0:
+    return False
+  try:
+    mtime = min(os.path.getmtime(output) for output in task['outputs'])
+    if not all(os.path.getmtime(input_file) < mtime
+               for input_file in task['inputs']):
+      return False
+  except OSError:
+    return False
+  return not _hash_changed(task)
+
+def _stored_hash(task):
+  try:
+    with open(task['cmdhash']['file'], 'r') as fd_hash:
+      return fd_hash.read().strip()
+  except OSError:
+    return None
+
+def _hash_changed(task):
+  # as CommandCondition, outputs without a hash come from an unknown command
+  if task.get('cmdhash') is None:
+    return False
+  stored = _stored_hash(task)
+  if stored is None:
+    return os.path.isfile(task['outputs'][0])
+  return stored != task['cmdhash']['hash']
+
+def record_hash(task):
+  """
+  This writes the hash of the command of a task next to its first output
+  (if the task generated it)
+  """
+  cmdhash = task.get('cmdhash')
+  if cmdhash is None or not os.path.isfile(task['outputs'][0]):
+    return
+  if _stored_hash(task) != cmdhash['hash']:
+    with open(cmdhash['file'], 'w') as fd_hash:
+      print(cmdhash['hash'], file=fd_hash)
+
+def stamp(task):
+  """
+  Returns:
+    (str) : hash of the command of a task, kept in its done marker
+  """
+  if task.get('cmdhash') is not None:
+    return task['cmdhash']['hash']
+  return hashlib.sha1(task['cmd'].encode('utf-8')).hexdigest()
+
+class Worker(object):
+  """
+  This runs the tasks of a subset of a graph. Workers on any number of nodes
+  sharing the file system coordinate through marker files in the state
+  directory: a worker claims a task by creating its claim file, then writes
+  its done (with the hash of the command) or failed file. Each worker also
+  registers its subset in a node file it touches while it runs (heartbeat),
+  so the others know which dependencies some node will run and which claims
+  were left by a crashed worker.
+
+  A task runs once all its dependencies are done. A dependency outside of
+  the subset is done when its done marker appears, or from the start if
+  nobody claimed it and its outputs are up to date (e.g. from a previous
+  sweep). The worker waits for the dependencies of other nodes, it only
+  gives up on the ones in no registered subset (after a grace period for
+  the other nodes to start) or when it waited longer than the timeout.
+
+  The markers of a previous run are discarded when a worker starts (the
+  markers of workers that aren't running anymore, done markers of another
+  command or with out of date outputs), so the state directory can be reused
+  after the graph is exported again: the tasks run again, or are bypassed if
+  their outputs are up to date. The claims of a worker that stopped touching
+  its node file for longer than expire seconds are taken over.
+  """
+
+  NODES = 'nodes'
+
+  def __init__(self, tasks, subset, state_dir, poll=1.0, force=False,
+               timeout=None, grace=10.0, expire=60.0):
+    """
+    Constructs a Worker object
+
+    Args:
+      tasks        : tasks of the graph
+      subset       : tasks this worker runs
+      state_dir    : directory of the marker files (shared)
+      poll         : seconds between checks while waiting for other workers
+      force        : run tasks even if their outputs are up to date
+      timeout      : seconds of waiting without progress before giving up
+                     (None waits for the other nodes as long as they run)
+      grace        : seconds the other nodes have to register their subset
+      expire       : seconds without heartbeat after which a worker is
+                     considered dead (its claims are taken over)
+    """
+    assert expire > 0, 'expire must be > 0'
+    self._tasks = {task['name']: task for task in tasks}
+    self._subset = list(subset)
+    self._names = set(task['name'] for task in subset)
+    self._state_dir = state_dir
+    self._poll = poll
+    self._force = force
+    self._timeout = timeout
+    self._grace = grace
+    self._expire = expire
+    self._id = '{0}:{1}'.format(socket.gethostname(), os.getpid())
+    self._stop = threading.Event()
+    self._heartbeat = None
+
+  def _marker(self, name, state):
+    return os.path.join(self._state_dir, name + state)
+
+  def _has(self, name, state):
+    return os.path.exists(self._marker(name, state))
+
+  def _read(self, name, state):
+    try:
+      with open(self._marker(name, state), 'r') as fd_mark:
+        return fd_mark.read().split()
+    except OSError:
+      return None
+
+  def _claim(self, name):
+    try:
+      fd_claim = os.open(self._marker(name, CLAIM),
+                         os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+      return False
+    os.write(fd_claim, self._id.encode('utf-8'))
+    os.close(fd_claim)
+    return True
+
+  def _mark(self, name, state):
+    with open(self._marker(name, state), 'w') as fd_mark:
+      print(self._id, stamp(self._tasks[name]), file=fd_mark)
+
+  def _discard(self, name, state):
+    # only one worker discards a marker (the one whose rename succeeds)
+    marker = self._marker(name, state)
+    stale = '{0}.{1}.stale'.format(marker, os.getpid())
+    try:
+      os.rename(marker, stale)
+    except OSError:
+      return False
+    os.remove(stale)
+    return True
+
+  def _state(self, name):
+    # True when done, False when failed, None while unfinished
+    if self._has(name, DONE):
+      return True
+    if self._has(name, FAILED):
+      return False
+    return None
+
+  def _node_file(self, worker):
+    return os.path.join(self._state_dir, self.NODES,
+                        worker.replace(':', '_'))
+
+  def _alive(self, worker):
+    if worker == self._id:
+      return True
+    try:
+      beat = os.path.getmtime(self._node_file(worker))
+    except OSError:
+      return False
+    return time.time() - beat < self._expire
+
+  def _expired(self, name):
+    # a claim of a worker that isn't running anymore
+    content = self._read(name, CLAIM)
+    return (content is not None and len(content) > 0 and
+            not self._alive(content[0]))
+
+  def _beat(self):
+    filename = self._node_file(self._id)
+    while not self._stop.wait(self._expire / 4):
+      try:
+        os.utime(filename)
+      except OSError:
+        pass
+
+  def _register(self):
+    os.makedirs(os.path.join(self._state_dir, self.NODES), exist_ok=True)
+    filename = self._node_file(self._id)
+    with open(filename + '.tmp', 'w') as fd_nodes:
+      fd_nodes.write('\n'.join(sorted(self._names)))
+    os.replace(filename + '.tmp', filename)
+    self._heartbeat = threading.Thread(target=self._beat, daemon=True)
+    self._heartbeat.start()
+
+  def _unregister(self):
+    self._stop.set()
+    self._heartbeat.join()
+    os.remove(self._node_file(self._id))
+
+  def _covered(self):
+    # the tasks some running worker runs
+    covered = set()
+    nodes = os.path.join(self._state_dir, self.NODES)
+    for filename in os.listdir(nodes):
+      path = os.path.join(nodes, filename)
+      try:
+        if (filename.endswith('.tmp') or
+            time.time() - os.path.getmtime(path) >= self._expire):
+          continue
+        with open(path, 'r') as fd_nodes:
+          covered.update(fd_nodes.read().split())
+      except OSError:
+        continue
+    return covered
+
+  def _validate(self, names):
+    """
+    This discards the markers of a previous run that don't hold anymore
+    """
+    for name in names:
+      task = self._tasks[name]
+      done = self._read(name, DONE)
+      if done is not None:
+        # the outputs of a previous run are checked again when it runs
+        if (len(done) < 2 or not self._alive(done[0]) or
+            done[1] != stamp(task) or
+            (len(task['outputs']) > 0 and not up_to_date(task))):
+          if self._discard(name, DONE):
+            self._discard(name, CLAIM)
+        continue
+      failed = self._read(name, FAILED)
+      if failed is not None:
+        if len(failed) == 0 or not self._alive(failed[0]):
+          if self._discard(name, FAILED):
+            self._discard(name, CLAIM)
+        continue
+      if self._expired(name):
+        self._discard(name, CLAIM)
+
+  def _execute(self, task):
+    if not self._force and up_to_date(task):
+      print('bypassed {0}'.format(task['name']))
+      return True
+    print('running {0}'.format(task['name']))
+    if task['log'] is not None:
+      with open(task['log'], 'w') as fd_log:
+        proc = subprocess.run(task['cmd'], shell=True, stdout=fd_log,
+                              stderr=subprocess.STDOUT)
+    else:
+      proc = subprocess.run(task['cmd'], shell=True)
+    if proc.returncode == 0:
+      record_hash(task)
+    return proc.returncode == 0
+
+  def run(self):
+    """
+    This runs the subset until every task of it finished or can't run
+
+    Returns:
+      (bool) : True if no task failed
+    """
+    self._register()
+    try:
+      return self._run()
+    finally:
+      self._unregister()
+
+  def _run(self):
+    order = {task['name']: pos for pos, task in enumerate(self._subset)}
+    waiting = {}
+    dependents = {}
+    ready = []
+    watch = set()
+    results = {}
+    for task in self._subset:
+      name = task['name']
+      waiting[name] = set(task['deps'])
+      for dep in task['deps']:
+        dependents.setdefault(dep, []).append(name)
+    self._validate(set(self._names) | set(dependents))
+    # the dependencies of other nodes up to date from the start
+    for dep in dependents:
+      if dep in self._names:
+        continue
+      state = self._state(dep)
+      if (state is None and not self._has(dep, CLAIM) and
+          up_to_date(self._tasks[dep])):
+        state = True
+      if state is None:
+        watch.add(dep)
+      else:
+        results[dep] = state
+    for name in waiting:
+      waiting[name] = set(dep for dep in waiting[name] if dep not in results)
+    for name in self._names:
+      if len(waiting[name]) == 0:
+        heapq.heappush(ready, (-self._tasks[name]['priority'], order[name],
+                               name))
+
+    pending = set(self._names)
+    success = True
+    failed = [dep for dep, state in results.items() if state is False]
+    last_progress = time.monotonic()
+    started = last_progress
+
+    def finish(name, state):
+      # the result of a task is known, its dependents may be ready
+      nonlocal success
+      stack = [(name, state)]
+      while len(stack) > 0:
+        name, state = stack.pop()
+        results[name] = state
+        if name in pending:
+          pending.discard(name)
+          success = success and state
+        for dependent in dependents.get(name, []):
+          if dependent not in pending:
+            continue
+          if not state:
+            # the failure propagates to the dependent tasks
+            if self._claim(dependent):
+              self._mark(dependent, FAILED)
+              stack.append((dependent, False))
+            else:
+              watch.add(dependent)
+            continue
+          waiting[dependent].discard(name)
+          if len(waiting[dependent]) == 0:
+            heapq.heappush(ready, (-self._tasks[dependent]['priority'],
+                                   order[dependent], dependent))
+
+    for dep in failed:
+      finish(dep, False)
+    while len(pending) > 0:
+      if len(ready) > 0:
+        _, _, name = heapq.heappop(ready)
+        if name not in pending:
+          continue
+        state = self._state(name)
+        if state is not None:
+          finish(name, state)
+        elif self._claim(name):
+          state = self._execute(self._tasks[name])
+          if not state:
+            print('failed {0}'.format(name))
+          self._mark(name, DONE if state else FAILED)
+          finish(name, state)
+        else:
+          # another worker runs it
+          watch.add(name)
+        last_progress = time.monotonic()
+        continue
+      # nothing to run here, check the tasks of the other workers
+      for name in list(watch):
+        state = self._state(name)
+        if state is not None:
+          watch.discard(name)
+          finish(name, state)
+          last_progress = time.monotonic()
+        elif self._expired(name) and self._discard(name, CLAIM):
+          # its worker crashed, a task of the subset is run here
+          print('expired claim of {0}'.format(name))
+          if name in pending:
+            watch.discard(name)
+            heapq.heappush(ready, (-self._tasks[name]['priority'],
+                                   order[name], name))
+          last_progress = time.monotonic()
+      if len(ready) > 0 or len(pending) == 0:
+        continue
+      now = time.monotonic()
+      if self._timeout is not None and now - last_progress > self._timeout:
+        print('timeout: {0}'.format(' '.join(sorted(pending))))
+        return False
+      if now - started > self._grace:
+        covered = self._covered()
+        orphans = [name for name in watch if name not in covered and
+                   not self._has(name, CLAIM)]
+        # as from the start, up to date outputs nobody runs are done
+        for name in [name for name in orphans
+                     if up_to_date(self._tasks[name])]:
+          orphans.remove(name)
+          watch.discard(name)
+          finish(name, True)
+        if len(orphans) > 0:
+          print('blocked: {0} depend on {1} that no worker runs'.format(
+            ' '.join(sorted(pending)), ' '.join(sorted(orphans))))
+          return False
+      time.sleep(self._poll)
+    return success
+
+def _work(graph_file, args):
+  tasks = load(graph_file)
+  subset = select(tasks, args.stage, args.match, args.shard)
+  worker = Worker(tasks, subset, args.state, poll=args.poll,
+                  force=args.force, timeout=args.timeout, grace=args.grace,
+                  expire=args.expire)
+  sys.exit(0 if worker.run() else 1)
+
+def main():
+  ap = argparse.ArgumentParser(
+    description='run (a subset of) an exported sweep task graph')
+  ap.add_argument('graph', help='task graph JSON file (Sweeper export)')
+  ap.add_argument('--state', default=None,
+                  help='shared state directory (default GRAPH.state)')
+  ap.add_argument('--jobs', type=int, default=1,
+                  help='worker processes on this node')
+  ap.add_argument('--stage', nargs='+', default=None,
+                  help='only run these stages (sim, parse, tparse, ...)')
+  ap.add_argument('--match', nargs='+', default=None,
+                  help='only run the tasks matching these name patterns')
+  ap.add_argument('--shard', default=None,
+                  help='I/N runs every N-th task starting at I')
+  ap.add_argument('--poll', type=float, default=1.0,
+                  help='seconds between scans while waiting')
+  ap.add_argument('--timeout', type=float, default=None,
+                  help='give up after waiting this long without progress')
+  ap.add_argument('--grace', type=float, default=10.0,
+                  help='seconds the other nodes have to start')
+  ap.add_argument('--expire', type=float, default=60.0,
+                  help='seconds without heartbeat before the claims of a '
+                  'worker are taken over')
+  ap.add_argument('--force', action='store_true',
+                  help='run up to date tasks')
+  ap.add_argument('--reset', action='store_true',
+                  help='remove the markers of a previous run first')
+  args = ap.parse_args()
+  if args.state is None:
+    args.state = args.graph + '.state'
+  if args.shard is not None:
+    index, count = args.shard.split('/')
+    args.shard = (int(index), int(count))
+    assert 0 <= args.shard[0] < args.shard[1], 'Invalid shard'
+  assert args.jobs > 0, 'jobs must be > 0'
+
+  if args.reset and os.path.isdir(args.state):
+    shutil.rmtree(args.state)
+  os.makedirs(args.state, exist_ok=True)
+
+  # one process per job, each is a worker like the ones of other nodes
+  procs = [multiprocessing.Process(target=_work, args=(args.graph, args))
+           for _ in range(args.jobs)]
+  for proc in procs:
+    proc.start()
+  code = 0
+  for proc in procs:
+    proc.join()
+    if proc.exitcode != 0:
+      code = 1
+  return code
+
+if __name__ == '__main__':
+  sys.exit(main())
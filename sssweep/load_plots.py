@@ -0,0 +1,88 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import argparse
+import os
+import shlex
+import sys
+
+import handycsv
+
+def read_gaps(read):
+  """
+  This wraps a stats file reader so a missing file (a load that wasn't
+  simulated) reads as the last file read with every value set to NaN, which
+  leaves a gap in the curves
+  """
+  last = []
+  def gaps_read(filename, *args, **kwargs):
+    if os.path.isfile(filename):
+      last[:] = [(filename, args, kwargs)]
+      return read(filename, *args, **kwargs)
+    assert len(last) > 0, '{0} does not exist'.format(filename)
+    grid = read(last[0][0], *last[0][1], **last[0][2])
+    for row in grid.row_names():
+      for column in grid.column_names():
+        grid.set(row, column, float('nan'))
+    return grid
+  return gaps_read
+
+def command(plot_cmd):
+  """
+  Returns:
+    (str) : the command running an 'ssplot ...' plot over a truncated load
+            sweep
+  """
+  assert plot_cmd.startswith('ssplot ')
+  return '{0} {1} {2}'.format(shlex.quote(sys.executable),
+                              shlex.quote(__file__), plot_cmd[len('ssplot '):])
+
+def main(argv=None):
+  """
+  This runs an ssplot command (same arguments) where missing stats files are
+  plotted as gaps
+  """
+  import matplotlib
+  matplotlib.use('Agg')
+  import matplotlib.pyplot as plt
+  import ssplot
+
+  ap = argparse.ArgumentParser(prog='ssplot')
+  sp = ap.add_subparsers(title='plotting commands', dest='cmd')
+  sp.required = True
+  for cls in ssplot.CommandLine.command_lines():
+    cls.create_parser(sp)
+  args = ap.parse_args(argv)
+
+  handycsv.GridStats.read = staticmethod(read_gaps(handycsv.GridStats.read))
+  return args.func(args, plt)
+
+if __name__ == '__main__':
+  sys.exit(main())
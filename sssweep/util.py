@@ -29,7 +29,11 @@
  * POSSIBILITY OF SUCH DAMAGE.
 """
 
+from .Config import Config
+
 def config_get_value(config, name):
+  if isinstance(config, Config):
+    return config.value(name)
   for variable in config:
-    if variable['name'] == name or variable['short-name'] == name:
+    if variable['name'] == name or variable['short_name'] == name:
       return variable['value']
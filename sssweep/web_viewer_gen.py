@@ -28,6 +28,8 @@
  * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
  * POSSIBILITY OF SUCH DAMAGE.
 """
+import json
+import numpy
 import ssplot
 import pkg_resources
 
@@ -491,6 +493,12 @@ function createName() {{
   document.getElementById("plot").style.display="block";
   document.getElementById("plot_name").innerHTML = composeName();
   document.getElementById("plot_name").style.color = "white";
+  if (!inDesign()) {{
+    document.getElementById("plot_name").innerHTML += " (not simulated)";
+    noImgFile();
+    addURLparams();
+    return;
+  }}
 
   if ($('#cachingOff').is(':checked')) {{
     document.getElementById('plot').src = '../plots/' + composeName() + '?time='+ new Date().getTime();
@@ -515,6 +523,68 @@ function createName() {{
   return create_name+ create_name_dyn
 
 
+def get_design(sweeper):
+  top = """\
+function inDesign() {
+  // configurations left out by the design or the constraints aren't
+  //  simulated, a compare plot is if one of its curves is
+  if (design == null) {
+    return true;
+  }
+  if (design.set === undefined) {
+    design.set = new Set(design.pos);
+  }
+  var m = document.getElementById("mode_sel").value;
+  var cmp_var = "";
+  if (m == "loadlatcomp") {
+    cmp_var = document.getElementById("{0}_sel").value;
+  }
+  // positions of the selected configurations in iteration order
+  var positions = [0];
+  for (var i = 0; i < design_vars.length; i++) {
+    var width = design_values[i].length;
+    var values = [];
+    if (design_vars[i] == cmp_var) {
+      for (var v = 0; v < width; v++) {
+        values.push(v);
+      }
+    } else {
+      values.push(design_values[i].indexOf(
+        document.getElementById(design_vars[i] + '_sel').value));
+    }
+    var next = [];
+    positions.forEach(function(pos) {
+      values.forEach(function(v) {
+        next.push(pos * width + v);
+      });
+    });
+    positions = next;
+  }
+  return positions.some(function(pos) {
+    return design.set.has(pos) == design.keep;
+  });
+}
+""".replace('{0}', sweeper._id_cmp)
+  # only a design or constraints leave configurations without the load out,
+  #  the positions of the simulated ones (or of the others when fewer) are
+  #  listed
+  outer = [var for var in sweeper._variables
+           if var['name'] != sweeper._load_name]
+  design_vars = [var['short_name'] for var in outer]
+  design_values = [[str(value) for value in var['values']] for var in outer]
+  design = 'null'
+  if sweeper._active is not None:
+    mask = numpy.frombuffer(sweeper._active, dtype=numpy.uint8)
+    keep = 2 * int(mask.sum()) <= len(mask)
+    pos = numpy.flatnonzero(mask == (1 if keep else 0)).tolist()
+    design = json.dumps({'keep': keep, 'pos': pos}, separators=(',', ':'))
+  dyn = """\
+var design_vars = {0};
+var design_values = {1};
+var design = {2};
+""".format(json.dumps(design_vars), json.dumps(design_values), design)
+  return dyn + top
+
 def get_sim_log(sweeper):
   top = """\
 function getSimLog() {
@@ -0,0 +1,136 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import taskrun
+
+from sssweep.AdaptiveLoads import AdaptiveLoads
+
+LOADS = [10, 20, 30, 40]
+
+class AdaptiveLoadsTestCase(unittest.TestCase):
+
+  def setUp(self):
+    self._dir = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self._dir)
+
+  def _stats(self, flat):
+    return os.path.join(self._dir, 'stats_{0}.csv'.format(flat))
+
+  def _latency(self, flat, mean):
+    with open(self._stats(flat), 'w') as fd_stats:
+      fd_stats.write('x,Minimum,Mean,Maximum\n')
+      fd_stats.write('Packet,1,{0},100\n'.format(mean))
+
+  def _rate(self, flat, delivered):
+    with open(self._stats(flat), 'w') as fd_stats:
+      fd_stats.write('term,delivered\n')
+      for term in ['0', '1', 'all']:
+        fd_stats.write('{0},{1}\n'.format(term, delivered))
+
+  def test_latency(self):
+    adaptive = AdaptiveLoads(LOADS, self._stats, 'latency')
+    self._latency(0, 10.0)
+    self._latency(1, 25.0)
+    self._latency(2, 40.0)
+    self.assertFalse(adaptive.saturated(0))
+    self.assertFalse(adaptive.saturated(1))
+    self.assertTrue(adaptive.saturated(2))
+
+  def test_latency_threshold(self):
+    adaptive = AdaptiveLoads(LOADS, self._stats, 'latency', threshold=2.0)
+    self._latency(0, 10.0)
+    self._latency(1, 25.0)
+    self.assertTrue(adaptive.saturated(1))
+
+  def test_rate(self):
+    adaptive = AdaptiveLoads(LOADS, self._stats, 'rate')
+    self._rate(0, 0.1)
+    self._rate(1, 0.19)
+    self._rate(2, 0.2)
+    self.assertFalse(adaptive.saturated(0))
+    self.assertFalse(adaptive.saturated(1))
+    self.assertTrue(adaptive.saturated(2))
+
+  def test_invalid_criterion(self):
+    with self.assertRaises(AssertionError):
+      AdaptiveLoads(LOADS, self._stats, 'hops')
+
+  def test_cancel_above_saturation(self):
+    adaptive = AdaptiveLoads(LOADS, self._stats, 'latency')
+    self._latency(0, 10.0)
+    self._latency(1, 50.0)
+    self.assertFalse(adaptive.cancelled(0))
+    self.assertFalse(adaptive.cancelled(1))
+    self.assertTrue(adaptive.cancelled(2))
+    self.assertTrue(adaptive.cancelled(3))
+    # the loads of the next configuration are independent
+    self.assertFalse(adaptive.cancelled(4))
+
+  def test_cancel_pending_loads(self):
+    # a load dispatched before the stats of the lower loads exist runs, the
+    #  loads dispatched once the saturation is known are cancelled
+    adaptive = AdaptiveLoads(LOADS, self._stats, 'latency')
+    self._latency(0, 10.0)
+    self.assertFalse(adaptive.cancelled(2))
+    self._latency(1, 50.0)
+    self.assertTrue(adaptive.cancelled(3))
+    self.assertFalse(adaptive.cancelled(2))
+
+  def test_condition(self):
+    adaptive = AdaptiveLoads(LOADS, self._stats, 'latency')
+    self._latency(0, 10.0)
+    self._latency(1, 50.0)
+    outputs = [os.path.join(self._dir, 'output')]
+    condition = adaptive.condition(
+      2, taskrun.FileModificationCondition([], outputs))
+    self.assertFalse(condition.check())
+    condition = adaptive.condition(
+      1, taskrun.FileModificationCondition([], outputs))
+    self.assertTrue(condition.check())
+
+  def test_gaps(self):
+    self._latency(0, 10.0)
+    output = os.path.join(self._dir, 'output')
+    with open(output, 'w') as fd_out:
+      fd_out.write('output')
+    os.utime(output, (os.path.getmtime(self._stats(0)) + 1,) * 2)
+    condition = AdaptiveLoads.gaps(taskrun.FileModificationCondition(
+      [self._stats(0), self._stats(1)], [output]))
+    self.assertFalse(condition.check())
+
+if __name__ == '__main__':
+  unittest.main()
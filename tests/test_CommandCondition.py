@@ -0,0 +1,101 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import taskrun
+
+from sssweep.CommandCondition import CommandCondition, CommandRecorder
+
+class _Task(object):
+
+  def __init__(self, name):
+    self.name = name
+
+class CommandConditionTestCase(unittest.TestCase):
+
+  def setUp(self):
+    self._dir = tempfile.mkdtemp()
+    self._input = os.path.join(self._dir, 'input')
+    self._output = os.path.join(self._dir, 'output')
+    with open(self._input, 'w') as fd_in:
+      fd_in.write('input')
+
+  def tearDown(self):
+    shutil.rmtree(self._dir)
+
+  def _condition(self, cmd):
+    return CommandCondition(
+      taskrun.FileModificationCondition([self._input], [self._output]), cmd)
+
+  def _generate(self):
+    with open(self._output, 'w') as fd_out:
+      fd_out.write('output')
+    os.utime(self._output, (os.path.getmtime(self._input) + 1,) * 2)
+
+  def test_missing_output(self):
+    self.assertTrue(self._condition('sim 1').check())
+
+  def test_output_without_hash(self):
+    # outputs of an unknown command are generated again
+    self._generate()
+    condition = self._condition('sim 1')
+    self.assertTrue(condition.changed())
+    self.assertTrue(condition.check())
+
+  def test_recorded_hash(self):
+    self._generate()
+    condition = self._condition('sim 1')
+    condition.record()
+    self.assertFalse(self._condition('sim 1').check())
+    self.assertTrue(self._condition('sim 2').check())
+
+  def test_bypass_without_hash(self):
+    # a bypassed task doesn't stamp outputs of an unknown command
+    self._generate()
+    recorder = CommandRecorder()
+    task = _Task('sim')
+    recorder.add(task, self._condition('sim 1'))
+    recorder.task_bypassed(task)
+    self.assertTrue(self._condition('sim 1').check())
+
+  def test_completed(self):
+    self._generate()
+    recorder = CommandRecorder()
+    task = _Task('sim')
+    recorder.add(task, self._condition('sim 1'))
+    recorder.task_completed(task)
+    self.assertFalse(self._condition('sim 1').check())
+
+if __name__ == '__main__':
+  unittest.main()
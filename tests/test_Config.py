@@ -0,0 +1,90 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import unittest
+
+from sssweep.Config import Config
+from sssweep.util import config_get_value
+
+def _command(value, config):
+  return '/x=uint={0}'.format(value)
+
+class ConfigTestCase(unittest.TestCase):
+
+  def setUp(self):
+    self._variables = [
+      {'name': 'Alpha', 'short_name': 'a', 'values': [1, 2, 3],
+       'command': _command, 'compare': True},
+      {'name': 'Beta', 'short_name': 'b', 'values': ['x', 'y'],
+       'command': _command, 'compare': False},
+      {'name': 'Load', 'short_name': 'l', 'values': [0.1, 0.5],
+       'command': _command, 'compare': False}]
+    self._config = Config(self._variables, (0, 2), (2, 1))
+
+  def test_entries(self):
+    self.assertEqual(len(self._config), 2)
+    self.assertEqual(list(self._config), [
+      {'name': 'Alpha', 'short_name': 'a', 'value': 3, 'command': _command,
+       'compare': True},
+      {'name': 'Load', 'short_name': 'l', 'value': 0.5, 'command': _command,
+       'compare': False}])
+    self.assertEqual(self._config[1]['value'], 0.5)
+    self.assertEqual([var['value'] for var in self._config[:1]], [3])
+
+  def test_set_command(self):
+    self.assertEqual([var['command'](var['value'], self._config)
+                      for var in self._config],
+                     ['/x=uint=3', '/x=uint=0.5'])
+
+  def test_value(self):
+    self.assertEqual(self._config.value('Alpha'), 3)
+    self.assertEqual(self._config.value('l'), 0.5)
+    self.assertIsNone(self._config.value('Beta'))
+    self.assertEqual(config_get_value(self._config, 'Load'), 0.5)
+    self.assertEqual(config_get_value(list(self._config), 'a'), 3)
+
+  def test_immutable(self):
+    with self.assertRaises(AttributeError):
+      self._config.foo = 1
+    # the entries are copies, the variable table is untouched
+    self._config[0]['value'] = 10
+    self.assertEqual(self._config.value('Alpha'), 3)
+
+  def test_equality(self):
+    same = Config(self._variables, (0, 2), (2, 1))
+    self.assertEqual(self._config, same)
+    self.assertEqual(hash(self._config), hash(same))
+    self.assertNotEqual(self._config, Config(self._variables, (0, 2), (2, 0)))
+    self.assertEqual(self._config.dims, (0, 2))
+    self.assertEqual(self._config.idx, (2, 1))
+    self.assertEqual(repr(self._config), 'Config(a=3, l=0.5)')
+
+if __name__ == '__main__':
+  unittest.main()
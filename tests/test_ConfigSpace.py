@@ -0,0 +1,90 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import itertools
+import unittest
+
+from sssweep.ConfigSpace import ConfigSpace
+
+def _variable(name, short_name, values):
+  return {'name': name, 'short_name': short_name, 'values': values,
+          'command': None, 'compare': True}
+
+class ConfigSpaceTestCase(unittest.TestCase):
+
+  def setUp(self):
+    self._variables = [_variable('Alpha', 'a', [1, 2, 3]),
+                       _variable('Beta', 'b', ['x', 'y']),
+                       _variable('Load', 'l', [0.1, 0.5, 0.9, 1.3])]
+    self._space = ConfigSpace(self._variables)
+
+  def test_size(self):
+    self.assertEqual(self._space.size, 24)
+    self.assertEqual(self._space.width(1), 2)
+    self.assertEqual(self._space.dim('Load'), 2)
+
+  def test_round_trip(self):
+    # the last variable varies the fastest
+    dims = self._space.dims()
+    products = itertools.product(*[range(len(var['values']))
+                                   for var in self._variables])
+    for flat, idx in enumerate(products):
+      self.assertEqual(self._space.index(flat), idx)
+      self.assertEqual(self._space.flat(dims, idx), flat)
+
+  def test_make_id(self):
+    self.assertEqual(self._space.make_id(0), '1_x_0.1')
+    self.assertEqual(self._space.make_id(23), '3_y_1.3')
+    self.assertEqual(self._space.partial_id((0, 2), (1, 3)), '2_1.3')
+
+  def test_dims(self):
+    self.assertEqual(self._space.dims(), (0, 1, 2))
+    self.assertEqual(self._space.dims(dont='Load'), (0, 1))
+    self.assertEqual(self._space.dims(do_vars=['Load', 'Alpha']), (0, 2))
+
+  def test_iterate(self):
+    self.assertEqual(list(self._space.iterate((0, 1))),
+                     [(a, b) for a in range(3) for b in range(2)])
+
+  def test_select(self):
+    # the loads of a configuration are consecutive
+    flats = self._space.select((0, 1), (2, 1), (2,))
+    self.assertEqual(list(flats), [20, 21, 22, 23])
+    flats = self._space.select((1, 2), (0, 3), (0,))
+    self.assertEqual(list(flats), [3, 11, 19])
+    for flat in flats:
+      self.assertEqual(self._space.index(flat)[1:], (0, 3))
+
+  def test_config(self):
+    config = self._space.config(self._space.dims(), self._space.index(9))
+    self.assertEqual([var['value'] for var in config], [2, 'x', 0.5])
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,115 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from sssweep.DiskBudget import DiskBudget
+from sssweep.Manifest import Manifest
+
+class _Task(object):
+
+  def __init__(self, name):
+    self.name = name
+
+class ManifestTestCase(unittest.TestCase):
+
+  def setUp(self):
+    self._dir = tempfile.mkdtemp()
+    self._filename = os.path.join(self._dir, 'manifest.json')
+    self._output = os.path.join(self._dir, 'data', 'info_1.csv')
+    os.mkdir(os.path.dirname(self._output))
+
+  def tearDown(self):
+    shutil.rmtree(self._dir)
+
+  def _generate(self):
+    with open(self._output, 'w') as fd_out:
+      fd_out.write('output')
+
+  def _sweep(self, cmd, finish='task_completed'):
+    # one sweep running the task sim_1
+    manifest = Manifest(self._filename)
+    current = manifest.current('sim_1', cmd)
+    if not current:
+      manifest.add('sim_1', cmd)
+      manifest.add_outputs('sim_1', [self._output])
+      task = _Task('sim_1')
+      if finish == 'task_failed':
+        getattr(manifest, finish)(task, [])
+      else:
+        getattr(manifest, finish)(task)
+    manifest.run_complete()
+    return current
+
+  def test_skip(self):
+    self._generate()
+    self.assertFalse(self._sweep('sim 1'))
+    self.assertTrue(self._sweep('sim 1'))
+    self.assertTrue(self._sweep('sim 1'))
+
+  def test_command_changed(self):
+    self._generate()
+    self._sweep('sim 1')
+    self.assertFalse(self._sweep('sim 2'))
+    self.assertFalse(Manifest(self._filename).current('sim_1', 'sim 1'))
+    self.assertTrue(self._sweep('sim 2'))
+
+  def test_failed(self):
+    self._generate()
+    self._sweep('sim 1', 'task_failed')
+    self.assertFalse(self._sweep('sim 1'))
+
+  def test_killed(self):
+    self._generate()
+    self._sweep('sim 1', 'task_killed')
+    self.assertFalse(self._sweep('sim 1'))
+
+  def test_bypassed_without_outputs(self):
+    # a cancelled load is created again next time
+    self._sweep('sim 1', 'task_bypassed')
+    self.assertFalse(self._sweep('sim 1'))
+
+  def test_bypassed(self):
+    self._generate()
+    self._sweep('sim 1', 'task_bypassed')
+    self.assertTrue(self._sweep('sim 1'))
+
+  def test_reclaimed(self):
+    # a log reclaimed by the disk budget still counts as generated
+    with open(self._output + DiskBudget.TOMBSTONE, 'w') as fd_tomb:
+      fd_tomb.write('6')
+    self._sweep('sim 1')
+    self.assertTrue(self._sweep('sim 1'))
+
+if __name__ == '__main__':
+  unittest.main()
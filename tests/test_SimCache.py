@@ -0,0 +1,81 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from sssweep.SimCache import SimCache
+
+class SimCacheTestCase(unittest.TestCase):
+
+  def setUp(self):
+    self._dir = tempfile.mkdtemp()
+    self._cache = SimCache(os.path.join(self._dir, 'cache'))
+    self._key = 'ab' * 32
+
+  def tearDown(self):
+    shutil.rmtree(self._dir)
+
+  def _sim(self, files, data):
+    # a simulation rewrites its outputs in place
+    for path in files:
+      with open(path, 'w') as fd_out:
+        fd_out.write(data)
+
+  def _entry(self):
+    return [open(path).read() for path in self._cache.cached(self._key)]
+
+  def test_rerun_after_store(self):
+    files = [os.path.join(self._dir, name) for name in ['info', 'rates']]
+    self._sim(files, 'first')
+    self._cache.store(self._key, files)
+    self._sim(files, 'rerun')
+    self.assertEqual(self._entry(), ['first', 'first'])
+
+  def test_rerun_after_fetch(self):
+    files = [os.path.join(self._dir, name) for name in ['info', 'rates']]
+    self._sim(files, 'first')
+    self._cache.store(self._key, files)
+    other = [os.path.join(self._dir, name) for name in ['info2', 'rates2']]
+    self.assertTrue(self._cache.fetch(self._key, other))
+    self.assertEqual([open(path).read() for path in other],
+                     ['first', 'first'])
+    self._sim(other, 'rerun')
+    self.assertEqual(self._entry(), ['first', 'first'])
+
+  def test_miss(self):
+    files = [os.path.join(self._dir, 'info')]
+    self.assertFalse(self._cache.fetch(self._key, files))
+    self.assertIsNone(self._cache.cached(self._key))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,158 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import os
+import shlex
+import shutil
+import tempfile
+import unittest
+
+import sssweep
+from sssweep import fanout
+
+class _Task(object):
+
+  def __init__(self, name, cmd):
+    self.name = name
+    self.cmd = cmd
+    self.resources = {}
+    self.priority = 0
+    self.dependencies = []
+    self.conditions = []
+
+  def get_dependencies(self):
+    return self.dependencies
+
+  def add_dependency(self, task):
+    self.dependencies.append(task)
+
+  def add_condition(self, condition):
+    self.conditions.append(condition)
+
+class _TaskManager(object):
+
+  def add_observer(self, observer):
+    pass
+
+def _command(value, config):
+  return '/x=uint={0}'.format(value)
+
+class StreamMessagesTestCase(unittest.TestCase):
+
+  def setUp(self):
+    self._dir = tempfile.mkdtemp()
+    self._tasks = {}
+
+  def tearDown(self):
+    shutil.rmtree(self._dir)
+
+  def _create_task(self, tm, name, cmd, console_out, task_type, config):
+    self._tasks[name] = _Task(name, cmd)
+    return self._tasks[name]
+
+  def _sim(self, **kwargs):
+    sweeper = sssweep.Sweeper(
+      'supersim', 'settings.json', 'ssparse', 'transient.py',
+      self._create_task, self._dir, check_paths=False, viewer='off',
+      stream_messages=True, **kwargs)
+    sweeper.add_variable('Alpha', 'a', [1], _command)
+    sweeper.add_loads('Load', 'l', 0, 1, 1, _command)
+    sweeper.add_plot('latency-pdf', 'all')
+    sweeper.create_tasks(_TaskManager())
+    return self._tasks['sim_1_0']
+
+  @staticmethod
+  def _keep(task):
+    args = shlex.split(task.cmd)
+    if '--keep' not in args:
+      return None
+    return args[args.index('--keep') + 1]
+
+  def test_keep(self):
+    sim = self._sim(codecs={'messages': 'zstd'})
+    messages = os.path.join(self._dir, 'data', 'messages_1_0.mpf.zst')
+    self.assertEqual(self._keep(sim), messages)
+    self.assertIn(messages, sim.conditions[0].outputs)
+    args = shlex.split(sim.cmd)
+    self.assertIn(fanout.FIFO, args[args.index('--producer') + 1])
+
+  def test_keep_compress(self):
+    sim = self._sim()
+    self.assertEqual(self._keep(sim), os.path.join(
+      self._dir, 'data', 'messages_1_0.mpf.gz'))
+
+  def test_without_keep(self):
+    # the parsing outputs are generated by the sim, the log is not
+    sim = self._sim(keep_messages=False)
+    self.assertIsNone(self._keep(sim))
+    outputs = [os.path.basename(path) for path in sim.conditions[0].outputs]
+    self.assertNotIn('messages_1_0.mpf.gz', outputs)
+    self.assertIn('latency_all_1_0.csv.gz', outputs)
+
+class DesignTestCase(unittest.TestCase):
+
+  def setUp(self):
+    self._dir = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self._dir)
+
+  def _sweeper(self):
+    sweeper = sssweep.Sweeper(
+      'supersim', 'settings.json', 'ssparse', 'transient.py',
+      lambda *args: _Task(args[1], args[2]), self._dir, check_paths=False,
+      viewer='off')
+    sweeper.add_variable('Alpha', 'a', [1, 2, 3], _command)
+    sweeper.add_variable('Beta', 'b', ['x', 'y'], _command)
+    sweeper.add_loads('Load', 'l', 0, 1, 1, _command)
+    sweeper.add_plot('latency-pdf', 'all')
+    return sweeper
+
+  def test_ofat_baseline(self):
+    sweeper = self._sweeper()
+    sweeper.set_design('ofat', baseline={'Alpha': 2, 'Beta': 'y'})
+    estimate = sweeper.estimate_cost().to_dict()
+    # 2_y, 1_y, 3_y and 2_x
+    self.assertEqual(estimate['stages']['sim']['tasks'], 4)
+
+  def test_baseline_value(self):
+    sweeper = self._sweeper()
+    sweeper.set_design('ofat', baseline={'Alpha': 4})
+    with self.assertRaisesRegex(AssertionError, 'baseline value 4'):
+      sweeper.estimate_cost()
+
+  def test_baseline_variable(self):
+    sweeper = self._sweeper()
+    sweeper.set_design('ofat', baseline={'Gamma': 1})
+    with self.assertRaisesRegex(AssertionError, 'baseline variable'):
+      sweeper.estimate_cost()
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,80 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import unittest
+
+from sssweep.TaskTable import TaskTable
+
+class TaskTableTestCase(unittest.TestCase):
+
+  def setUp(self):
+    self._calls = []
+
+  def _id(self, flat):
+    self._calls.append(flat)
+    return 'c{0}'.format(flat)
+
+  @staticmethod
+  def _files(id_task):
+    return {'info_csv': 'info_{0}.csv'.format(id_task)}
+
+  def _check(self, table):
+    self.assertEqual(table.id(3), 'c3')
+    self.assertEqual(table.id(3), 'c3')
+    # ids are computed once
+    self.assertEqual(self._calls, [3])
+    self.assertEqual(table.files(3), {'info_csv': 'info_c3.csv'})
+    self.assertIsNone(table.task(3))
+    self.assertFalse(table.created([2, 3]))
+    task = object()
+    table.set_task(3, task)
+    self.assertIs(table.task(3), task)
+    self.assertTrue(table.created([2, 3]))
+    self.assertFalse(table.created([0, 1]))
+    # cleared configurations keep whether they were created
+    table.clear([3])
+    self.assertIsNone(table.task(3))
+    self.assertTrue(table.created([3]))
+    self.assertEqual(table.id(3), 'c3')
+    self.assertEqual(self._calls, [3, 3])
+
+  def test_dense(self):
+    self._check(TaskTable(8, self._id, self._files))
+
+  def test_sparse(self):
+    self._check(TaskTable(8, self._id, self._files, sparse=True))
+
+  def test_set_none(self):
+    table = TaskTable(4, self._id, self._files)
+    table.set_task(1, None)
+    self.assertFalse(table.created([1]))
+
+if __name__ == '__main__':
+  unittest.main()
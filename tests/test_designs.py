@@ -0,0 +1,97 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import itertools
+import unittest
+
+import numpy
+
+from sssweep import designs
+
+WIDTHS = (3, 4, 2)
+
+def _rows(mask, widths):
+  return [numpy.unravel_index(flat, widths) for flat in range(len(mask))
+          if mask[flat] == 1]
+
+class DesignsTestCase(unittest.TestCase):
+
+  def test_full(self):
+    self.assertEqual(designs.mask('full', WIDTHS), bytearray([1]) * 24)
+
+  def test_lhs(self):
+    # with as many samples as values, each value is sampled once
+    mask = designs.mask('lhs', (4, 4, 4), samples=4, seed=3)
+    rows = _rows(mask, (4, 4, 4))
+    self.assertEqual(len(rows), 4)
+    for dim in range(3):
+      self.assertEqual(sorted(int(row[dim]) for row in rows), [0, 1, 2, 3])
+
+  def test_lhs_seed(self):
+    self.assertEqual(designs.mask('lhs', WIDTHS, samples=5, seed=1),
+                     designs.mask('lhs', WIDTHS, samples=5, seed=1))
+    self.assertLessEqual(sum(designs.mask('lhs', WIDTHS, samples=5)), 5)
+
+  def test_orthogonal(self):
+    # every pair of values of any two variables is covered
+    widths = (3, 3, 2, 3)
+    rows = _rows(designs.mask('orthogonal', widths), widths)
+    self.assertLess(len(rows), int(numpy.prod(widths)))
+    for dim_a, dim_b in itertools.combinations(range(len(widths)), 2):
+      pairs = {(int(row[dim_a]), int(row[dim_b])) for row in rows}
+      self.assertEqual(len(pairs), widths[dim_a] * widths[dim_b])
+
+  def test_ofat(self):
+    baseline = (1, 2, 0)
+    rows = _rows(designs.mask('ofat', WIDTHS, baseline=baseline), WIDTHS)
+    self.assertEqual(len(rows), 1 + sum(width - 1 for width in WIDTHS))
+    for row in rows:
+      self.assertLessEqual(
+        sum(int(value) != base for value, base in zip(row, baseline)), 1)
+
+  def test_ofat_first_values(self):
+    self.assertEqual(designs.mask('ofat', WIDTHS),
+                     designs.mask('ofat', WIDTHS, baseline=(0, 0, 0)))
+
+  def test_random(self):
+    mask = designs.mask('random', WIDTHS, samples=7, seed=2)
+    self.assertEqual(sum(mask), 7)
+    self.assertEqual(mask, designs.mask('random', WIDTHS, samples=7, seed=2))
+    # no more than every configuration
+    self.assertEqual(sum(designs.mask('random', WIDTHS, samples=100)), 24)
+
+  def test_invalid(self):
+    with self.assertRaises(AssertionError):
+      designs.mask('taguchi', WIDTHS)
+    with self.assertRaises(AssertionError):
+      designs.mask('lhs', WIDTHS, samples=0)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,150 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import gzip
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from sssweep import fanout
+
+DATA = b''.join(b'message %d\n' % index for index in range(20000))
+
+class FanoutTestCase(unittest.TestCase):
+
+  def setUp(self):
+    self._dir = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self._dir)
+
+  def _path(self, name):
+    return os.path.join(self._dir, name)
+
+  def _read(self, name):
+    with fanout.open_codec(self._path(name), 'rb') as fd_in:
+      return fd_in.read(len(DATA) + 1)
+
+  def _write(self, name):
+    with fanout.open_codec(self._path(name), 'wb') as fd_out:
+      fd_out.write(DATA)
+
+  def _run(self, cmd):
+    return subprocess.call(cmd, shell=True)
+
+  def _codec_round_trip(self, codec):
+    name = 'messages.mpf' + fanout.CODECS[codec]
+    self._write(name)
+    self.assertEqual(self._read(name), DATA)
+    self.assertEqual(b''.join(fanout.read_file(self._path(name))), DATA)
+
+  def test_codec_none(self):
+    self._codec_round_trip('none')
+
+  def test_codec_gz(self):
+    self._codec_round_trip('gz')
+    with gzip.open(self._path('messages.mpf.gz'), 'rb') as fd_in:
+      self.assertEqual(fd_in.read(), DATA)
+
+  @unittest.skipIf(shutil.which('zstd') is None, 'zstd is not installed')
+  def test_codec_zstd(self):
+    self._codec_round_trip('zstd')
+
+  @unittest.skipIf(shutil.which('lz4') is None, 'lz4 is not installed')
+  def test_codec_lz4(self):
+    self._codec_round_trip('lz4')
+
+  def test_single_pass(self):
+    # every consumer reads the whole decoded log
+    self._write('messages.mpf.gz')
+    consumers = ['cat > {0}'.format(shlex.quote(self._path(name)))
+                 for name in ['a', 'b', 'c']]
+    cmd = fanout.command(self._path('messages.mpf.gz'), consumers)
+    self.assertEqual(self._run(cmd), 0)
+    for name in ['a', 'b', 'c']:
+      self.assertEqual(self._read(name), DATA)
+
+  def test_early_exit(self):
+    # a consumer exiting early doesn't stop the others
+    self._write('messages.mpf')
+    cmd = fanout.command(self._path('messages.mpf'), [
+      'head -c 10 > /dev/null',
+      'cat > {0}'.format(shlex.quote(self._path('a')))])
+    self.assertEqual(self._run(cmd), 0)
+    self.assertEqual(self._read('a'), DATA)
+
+  def test_consumer_failure(self):
+    self._write('messages.mpf')
+    cmd = fanout.command(self._path('messages.mpf'), [
+      'cat > /dev/null', 'cat > /dev/null; exit 3'])
+    self.assertNotEqual(self._run(cmd), 0)
+
+  def _producer(self, code=0):
+    # writes DATA to the named pipe
+    self._write('data')
+    return 'cat {0} > {1}; exit {2}'.format(
+      shlex.quote(self._path('data')), fanout.FIFO, code)
+
+  def test_producer_keep(self):
+    # the stream is kept encoded by the extension of the keep file
+    cmd = fanout.command(
+      None, ['cat > {0}'.format(shlex.quote(self._path('a')))],
+      producer=self._producer(), keep=self._path('messages.mpf.gz'))
+    self.assertEqual(self._run(cmd), 0)
+    self.assertEqual(self._read('a'), DATA)
+    self.assertEqual(self._read('messages.mpf.gz'), DATA)
+
+  def test_producer_without_keep(self):
+    # without a keep file the log is never written
+    cmd = fanout.command(
+      None, ['cat > {0}'.format(shlex.quote(self._path('a')))],
+      producer=self._producer())
+    self.assertEqual(self._run(cmd), 0)
+    self.assertEqual(self._read('a'), DATA)
+    self.assertEqual(sorted(os.listdir(self._dir)), ['a', 'data'])
+
+  @unittest.skipIf(shutil.which('zstd') is None, 'zstd is not installed')
+  def test_producer_only_keep(self):
+    cmd = fanout.command(None, [], producer=self._producer(),
+                         keep=self._path('messages.mpf.zst'))
+    self.assertEqual(self._run(cmd), 0)
+    self.assertEqual(self._read('messages.mpf.zst'), DATA)
+
+  def test_producer_failure(self):
+    cmd = fanout.command(None, ['cat > /dev/null'],
+                         producer=self._producer(code=2),
+                         keep=self._path('messages.mpf'))
+    self.assertNotEqual(self._run(cmd), 0)
+
+if __name__ == '__main__':
+  unittest.main()